@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+
+from .models import BeamProperties
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by the total size of its values"""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value and mark it as recently used, or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries to stay within max_bytes"""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self.bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+def _nbytes(value: Any) -> int:
+    """Memory held by cached arrays, or by the arrays inside a plain tuple of results"""
+    if hasattr(value, "nbytes"):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+def _canonical_rows(rows: Sequence[Sequence[float]], width: int) -> np.ndarray:
+    """Load rows sorted by every column so that insertion order does not change the key"""
+    rows = np.asarray(rows, dtype=float).reshape(-1, width)
+    return rows[np.lexsort(rows.T[::-1])]
+
+def analysis_key(
+    beam_properties: BeamProperties,
+    f1: Sequence[Sequence[float]],  # Point moments [[magnitude, location], ...]
+    f2: Sequence[Sequence[float]],  # Point forces [[magnitude, location], ...]
+    f3: Sequence[Sequence[float]],  # Constant force profiles [[magnitude, start, end], ...]
+    f4: Sequence[Sequence[float]],  # Triangular force profiles [[magnitude, start, end], ...]
+    **options: Any
+) -> str:
+    """
+    Canonical SHA-256 digest of a beam problem
+    Identical problems get the same key regardless of session or load order.
+    Extra keyword options (e.g. engine) are part of the key. Loads are hashed as raw float64
+    rows, so a session with thousands of loads is keyed without converting them.
+    """
+    loads = [_canonical_rows(rows, width) for rows, width in zip((f1, f2, f3, f4), (2, 2, 3, 3))]
+    problem = {
+        "beam": beam_properties.model_dump(mode="json"),
+        "loads": [len(rows) for rows in loads],
+        "options": options,
+    }
+    digest = hashlib.sha256(json.dumps(problem, sort_keys=True, separators=(",", ":")).encode())
+    for rows in loads:
+        digest.update(rows.tobytes())
+    return digest.hexdigest()
+
+def etag(key: str) -> str:
+    """Strong ETag for a rendered image; rendering is deterministic, so the input digest identifies the bytes"""
+    return f'"{key[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or tag in candidates or f"W/{tag}" in candidates
+
+# Global analysis cache, sized by BEAM_ANALYSIS_CACHE_MB (default 64 MB)
+analysis_cache = LRUCache(
+    max_bytes=int(float(os.environ.get("BEAM_ANALYSIS_CACHE_MB", "64")) * 1024 * 1024),
+    sizeof=_nbytes,
+)
+
+# Global rendered image cache (PNG bytes), sized by BEAM_IMAGE_CACHE_MB (default 32 MB)
+image_cache = LRUCache(
+    max_bytes=int(float(os.environ.get("BEAM_IMAGE_CACHE_MB", "32")) * 1024 * 1024),
+    sizeof=len,
+)
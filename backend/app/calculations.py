@@ -1,5 +1,59 @@
+import logging
+import math
+import os
 import numpy as np
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import numba
+except ImportError:  # numba is optional; the numpy kernel backend is the fallback
+    numba = None
+
+# Engines available to calculate_structural_analysis
+LOOP_ENGINE = "loop"            # Original station-walking loops
+VECTORIZED_ENGINE = "vectorized"  # Closed-form Macaulay (singularity function) terms
+ENGINES = (LOOP_ENGINE, VECTORIZED_ENGINE)
+DEFAULT_ENGINE = VECTORIZED_ENGINE
+
+# Number of evenly spaced stations along the beam
+DEFAULT_STATIONS = 1001
+
+# Rules that integrate a sampled bending moment to slope and slope to deflection (see cumulative_integral);
+# the solvers integrate the moment terms in closed form instead
+INTEGRATION_RULES = ("rectangle", "trapezoid", "simpson")
+DEFAULT_INTEGRATION_RULE = "trapezoid"
+
+class BeamSolution(NamedTuple):
+    """Analysis results as read-only arrays, one value per station"""
+    x: np.ndarray
+    shear_force: np.ndarray
+    bending_moment: np.ndarray
+    slope: np.ndarray
+    deflection: np.ndarray
+    reactions: np.ndarray  # [R1, R2] at support 1 and support 2
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self)
+
+class BatchSolution(NamedTuple):
+    """Results of many beam problems stacked row-wise, one row per problem"""
+    lengths: np.ndarray         # (problems,), stations of row i are linspace(0, lengths[i], stations)
+    shear_force: np.ndarray     # (problems, stations)
+    bending_moment: np.ndarray  # (problems, stations)
+    slope: np.ndarray           # (problems, stations)
+    deflection: np.ndarray      # (problems, stations)
+    reactions: np.ndarray       # (problems, 2)
+
+# Upper bound on Macaulay matrix elements built at once by solve_beam_batch and solve_beam_chunks
+BATCH_CHUNK_ELEMENTS = 1 << 22
+
+# Default number of stations per chunk yielded by solve_beam_chunks
+STREAM_CHUNK_STATIONS = 4096
+
+# Fewest stations per chunk when many loads shrink the chunks below the requested size
+MIN_STREAM_CHUNK_STATIONS = 256
 
 def integral(f, a: float, b: float, n: int = 10000) -> float:
     """Numerical integration using trapezoidal rule"""
@@ -9,6 +63,52 @@ def integral(f, a: float, b: float, n: int = 10000) -> float:
     y = f(x)
     return np.trapz(y, x)
 
+@lru_cache(maxsize=32)
+def _gauss_legendre_nodes(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Gauss-Legendre nodes and weights on [-1, 1]"""
+    return np.polynomial.legendre.leggauss(n)
+
+def gauss_legendre(f, a: float, b: float, n: int = 5) -> float:
+    """Numerical integration using n-point Gauss-Legendre quadrature (exact for degree 2n - 1)"""
+    if a == b:
+        return 0.0
+    nodes, weights = _gauss_legendre_nodes(n)
+    half = (b - a) / 2
+    return float(half * np.dot(weights, f((a + b) / 2 + half * nodes)))
+
+# Quadrature rules for arbitrary load shapes, called as rule(f, a, b, n)
+QUADRATURE_RULES: Dict[str, Callable[..., float]] = {
+    "trapezoid": integral,
+    "gauss-legendre": gauss_legendre,
+}
+DEFAULT_QUADRATURE = "gauss-legendre"
+
+def register_quadrature(name: str, rule: Callable[..., float]) -> None:
+    """Register a quadrature rule for distributed_load_resultant"""
+    QUADRATURE_RULES[name] = rule
+
+def constant_profile_resultant(magnitude: float, start: float, end: float) -> Tuple[float, float]:
+    """Exact resultant force and centroid of a constant force profile"""
+    return magnitude * (end - start), (start + end) / 2
+
+def triangular_profile_resultant(magnitude: float, start: float, end: float) -> Tuple[float, float]:
+    """Exact resultant force and centroid of a triangular force profile (zero at start, peak at end)"""
+    return magnitude * (end - start) / 2, start + 2 * (end - start) / 3
+
+def distributed_load_resultant(f, start: float, end: float,
+                               quadrature: Optional[str] = None, n: Optional[int] = None) -> Tuple[float, float]:
+    """
+    Resultant force and centroid of an arbitrary load intensity f(x) over [start, end]
+    quadrature names a rule in QUADRATURE_RULES, n is passed through to the rule
+    """
+    rule = QUADRATURE_RULES[quadrature or DEFAULT_QUADRATURE]
+    args = () if n is None else (n,)
+    force = rule(f, start, end, *args)
+    if force == 0:
+        return 0.0, (start + end) / 2
+    first_moment = rule(lambda x: f(x) * x, start, end, *args)
+    return force, first_moment / force
+
 def square(x):
     """Fixed square function - returns x^2"""
     return x ** 2
@@ -28,45 +128,22 @@ def calculate_structural_analysis(
     b: float,  # Support 2 location
     length: float,  # Beam length
     G: float = 1.0,  # Modulus of elasticity
-    I: float = 1.0   # Second moment of area
+    I: float = 1.0,  # Second moment of area
+    engine: Optional[str] = None,  # One of ENGINES, defaults to DEFAULT_ENGINE
+    kernel: Optional[str] = None  # Loop engine kernel backend, one of KERNEL_BACKENDS
 ) -> Tuple[List[float], List[float], List[float], List[float], List[List[float]]]:
     """
     Calculate shear force, bending moment, slope, and deflection for a beam
     Returns: (V, BM, slope, deflection, reaction_forces)
     """
-    
-    # Initialize variables
-    p = 0  # Sum of moments about support 1
-    q = 0  # Sum of vertical forces
-    
-    # Process point moments
-    for moment in f1:
-        p += moment[0]
-    
-    # Process point forces
-    for force in f2:
-        p += force[0] * (force[1] - a)
-        q += force[0]
-    
-    # Process constant force profiles
-    for profile in f3:
-        def f(x):
-            return profile[0] * np.ones_like(x)
-        p += moment_calculation(f, a, profile[1], profile[2], n=10000)
-        q += integral(f, profile[1], profile[2], n=10000)
-    
-    # Process triangular force profiles
-    for profile in f4:
-        def f(x):
-            return profile[0] / (profile[2] - profile[1]) * (x - profile[1])
-        p += moment_calculation(f, a, profile[1], profile[2], n=10000)
-        q += integral(f, profile[1], profile[2], n=10000)
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown calculation engine '{engine}'. Use one of: {', '.join(ENGINES)}")
     
     # Calculate reaction forces
     f2c = [force[:] for force in f2]  # Copy of original point forces
     
-    r2 = p / (a - b)  # Reaction at support 2
-    r1 = -q - r2      # Reaction at support 1
+    r1, r2 = support_reactions(f1, f2, f3, f4, a, b)
     
     # Add reactions to point forces for calculation
     f2.extend([[r1, a], [r2, b]])
@@ -78,19 +155,512 @@ def calculate_structural_analysis(
     f4.sort(key=lambda x: x[1])
     
     # Create position array
-    l = np.linspace(0, length, 1001)
+    l = np.linspace(0, length, DEFAULT_STATIONS)
     dl = l[1] - l[0]
     
-    # Calculate shear force
-    V = calculate_shear_force(f2, f3, f4, l, dl)
+    if engine == LOOP_ENGINE:
+        kernels = KERNEL_BACKENDS.get(kernel or _kernel_backend)
+        if kernels is None:
+            raise ValueError(f"Unknown kernel backend '{kernel}'. Use one of: {', '.join(KERNEL_BACKENDS)}")
+
+        # Calculate shear force
+        V = kernels.shear_force(f2, f3, f4, l, dl)
+        
+        # Calculate bending moment
+        BM = kernels.bending_moment(f1, f2, f3, f4, l, dl)
+    else:
+        # Evaluate closed-form shear force and bending moment at every station at once
+        V = vectorized_shear_force(f2, f3, f4, l).tolist()
+        BM = vectorized_bending_moment(f1, f2, f3, f4, l).tolist()
+    
+    # Slope and deflection in closed form, exact at every station even across point moment jumps
+    slope, deflection = slope_and_deflection(singularity_terms(f1, f2, f3, f4), a, b, G * I, l)
+    
+    return V, BM, slope.tolist(), deflection.tolist(), f2c
+
+def support_reactions(f1: List[List[float]], f2: List[List[float]],
+                      f3: List[List[float]], f4: List[List[float]],
+                      a: float, b: float) -> Tuple[float, float]:
+    """
+    Calculate the reactions at support 1 (a) and support 2 (b) from equilibrium
+    Loads may be lists or arrays of rows. Returns: (r1, r2)
+    """
+    m = np.asarray(f1, dtype=float).reshape(-1, 2)
+    p = np.asarray(f2, dtype=float).reshape(-1, 2)
+    c = np.asarray(f3, dtype=float).reshape(-1, 3)
+    t = np.asarray(f4, dtype=float).reshape(-1, 3)
+    c_force, c_centroid = constant_profile_resultant(c[:, 0], c[:, 1], c[:, 2])
+    t_force, t_centroid = triangular_profile_resultant(t[:, 0], t[:, 1], t[:, 2])
+    
+    # Sum of moments about support 1 and sum of vertical forces
+    p_sum = m[:, 0].sum() + p[:, 0] @ (p[:, 1] - a) + c_force @ (c_centroid - a) + t_force @ (t_centroid - a)
+    q_sum = p[:, 0].sum() + c_force.sum() + t_force.sum()
+    
+    r2 = p_sum / (a - b)  # Reaction at support 2
+    r1 = -q_sum - r2      # Reaction at support 1
+    
+    return float(r1), float(r2)
+
+def solve_beam(
+    f1: List[List[float]], f2: List[List[float]],
+    f3: List[List[float]], f4: List[List[float]],
+    a: float, b: float, length: float,
+    G: float = 1.0, I: float = 1.0,
+    engine: Optional[str] = None, kernel: Optional[str] = None
+) -> BeamSolution:
+    """
+    Solve one beam without touching the inputs and return read-only arrays
+    The vectorized engine takes the loads as they are, lists or arrays of rows (e.g. a session's
+    load store); the loop engine works on list copies.
+    """
+    r1, r2 = support_reactions(f1, f2, f3, f4, a, b)
+    if (engine or DEFAULT_ENGINE) == VECTORIZED_ENGINE:
+        l = np.linspace(0, length, DEFAULT_STATIONS)
+        forces = _with_reactions(f2, r1, r2, a, b)
+        forces = forces[np.argsort(forces[:, 1], kind="stable")]  # Reactions in location order, as in calculate_structural_analysis
+        V, BM, slope, deflection = evaluate_beam(singularity_terms(f1, forces, f3, f4), a, b, G * I, l)
+        solution = BeamSolution(l, V, BM, slope, deflection, np.array([r1, r2]))
+    else:
+        V, BM, slope, deflection, _ = calculate_structural_analysis(
+            *(np.asarray(f, dtype=float).reshape(-1, width).tolist() for f, width in zip((f1, f2, f3, f4), (2, 2, 3, 3))),
+            a, b, length, G, I, engine=engine, kernel=kernel
+        )
+        solution = BeamSolution(
+            np.linspace(0, length, len(V)), np.asarray(V), np.asarray(BM),
+            np.asarray(slope), np.asarray(deflection), np.array([r1, r2])
+        )
+    for array in solution:
+        array.setflags(write=False)
+    return solution
+
+def singularity_terms(f1: List[List[float]], f2: List[List[float]],
+                      f3: List[List[float]], f4: List[List[float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Express the bending moment of all loads as a sum of Macaulay terms c * <x - p>^n
+    Point moments are steps (n=0), point forces ramps (n=1), constant profiles
+    parabolas (n=2) and triangular profiles cubics (n=3), each closed at its end.
+    Returns: (coefficients, positions, orders)
+    """
+    m = np.asarray(f1, dtype=float).reshape(-1, 2)
+    p = np.asarray(f2, dtype=float).reshape(-1, 2)
+    c = np.asarray(f3, dtype=float).reshape(-1, 3)
+    t = np.asarray(f4, dtype=float).reshape(-1, 3)
+    k = t[:, 0] / (t[:, 2] - t[:, 1])  # Slope of each triangular profile
+
+    coefficients = np.concatenate([
+        -m[:, 0], p[:, 0], c[:, 0] / 2, -c[:, 0] / 2, k / 6, -k / 6, -t[:, 0] / 2
+    ])
+    positions = np.concatenate([
+        m[:, 1], p[:, 1], c[:, 1], c[:, 2], t[:, 1], t[:, 2], t[:, 2]
+    ])
+    orders = np.concatenate([
+        np.zeros(len(m)), np.ones(len(p)), np.full(2 * len(c), 2.0), np.full(2 * len(t), 3.0), np.full(len(t), 2.0)
+    ])
+    return coefficients, positions, orders
+
+def macaulay(x: np.ndarray, positions: np.ndarray, orders: np.ndarray,
+             left: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Macaulay brackets <x - p>^n with one row per term and one column per station (H(0) = 1)
+    Stations flagged in left take the left-hand limit instead when they sit exactly on a position.
+    """
+    d = np.asarray(x, dtype=float)[None, :] - np.asarray(positions, dtype=float)[:, None]
+    inside = d >= 0
+    if left is not None:
+        inside &= ~(np.asarray(left, dtype=bool)[None, :] & (d == 0))
+    return np.where(inside, np.abs(d) ** np.asarray(orders, dtype=float)[:, None], 0.0)
+
+def vectorized_shear_force(f2: List[List[float]], f3: List[List[float]],
+                           f4: List[List[float]], l: np.ndarray) -> np.ndarray:
+    """Calculate shear force at all stations at once, V = -dM/dx"""
+    c, p, n = singularity_terms([], f2, f3, f4)
+    return -(c * n) @ macaulay(l, p, n - 1)
+
+def vectorized_bending_moment(f1: List[List[float]], f2: List[List[float]],
+                              f3: List[List[float]], f4: List[List[float]],
+                              l: np.ndarray) -> np.ndarray:
+    """Calculate bending moment at all stations at once"""
+    c, p, n = singularity_terms(f1, f2, f3, f4)
+    return c @ macaulay(l, p, n)
+
+# Terms are (coefficients, positions, orders) as returned by singularity_terms
+Terms = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Binomial coefficients C(n, j) for the term orders that occur up to deflection
+_BINOMIAL = np.array([[math.comb(n, j) for j in range(6)] for n in range(6)], dtype=float)
+
+def differentiate_terms(terms: Terms) -> Terms:
+    """d/dx of sum c <x - p>^n (steps differentiate to impulses and are dropped)"""
+    c, p, n = terms
+    keep = n > 0
+    return c[keep] * n[keep], p[keep], n[keep] - 1
+
+def integrate_terms(terms: Terms) -> Terms:
+    """Integral from 0 of sum c <x - p>^n"""
+    c, p, n = terms
+    return c / (n + 1), p, n + 1
+
+def singularity_sum(terms: Terms, x: np.ndarray, left: Optional[np.ndarray] = None) -> np.ndarray:
+    """Evaluate sum c <x - p>^n at stations x"""
+    c, p, n = terms
+    return c @ macaulay(x, p, n, left)
+
+def integration_constants(terms: Terms, a: float, b: float) -> Tuple[float, float]:
+    """C1, C2 in EI * deflection = double integral of M + C1 x + C2, with zero deflection at both supports"""
+    D = singularity_sum(integrate_terms(integrate_terms(terms)), np.array([a, b], dtype=float))
+    c1 = -(D[1] - D[0]) / (b - a)
+    c2 = -D[0] - c1 * a
+    return c1, c2
+
+def evaluate_beam(terms: Terms, a: float, b: float, EI: float, x: np.ndarray,
+                  left: Optional[np.ndarray] = None,
+                  constants: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Exact shear force, bending moment, slope and deflection at arbitrary stations
+    Slope and deflection integrate the bending moment terms in closed form, with the integration
+    constants for zero deflection at a and b unless constants gives C1, C2.
+    Returns: (V, BM, slope, deflection)
+    """
+    x = np.asarray(x, dtype=float)
+    V = -singularity_sum(differentiate_terms(terms), x, left)
+    BM = singularity_sum(terms, x, left)
+    slope, deflection = slope_and_deflection(terms, a, b, EI, x, constants)
+    return V, BM, slope, deflection
+
+def slope_and_deflection(terms: Terms, a: float, b: float, EI: float, x: np.ndarray,
+                         constants: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact slope and deflection at stations x, from the bending moment terms integrated in closed form"""
+    x = np.asarray(x, dtype=float)
+    c1, c2 = constants if constants is not None else integration_constants(terms, a, b)
+    slope = (singularity_sum(integrate_terms(terms), x) + c1) / EI
+    deflection = (singularity_sum(integrate_terms(integrate_terms(terms)), x) + c1 * x + c2) / EI
+    return slope, deflection
+
+def adaptive_stations(terms: Terms, a: float, b: float, length: float, EI: float,
+                      tolerance: float = 1e-3, max_stations: int = 100001) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Station grid with exact nodes at every load position, support and beam end
+    Each segment between nodes gets just enough evenly spaced stations for linear interpolation
+    between stations to stay within tolerance (relative to each diagram's peak), using the
+    bound h^2 / 8 * max|f''|. Shear force and bending moment jumps get a second station at the
+    node holding the left-hand limit.
+    Returns: (x, left) where left flags the left-hand limit stations
+    """
+    c, p, n = terms
+    nodes = np.unique(np.concatenate([[0.0, length, a, b], p[(p >= 0) & (p <= length)]]))
+    h = np.diff(nodes)
+    
+    # Sample each segment from the inside: the segment end is the left-hand limit at the next node
+    fractions = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+    samples = (nodes[:-1, None] + h[:, None] * fractions).ravel()
+    left = np.tile(fractions == 1.0, len(h))
+    shape = (len(h), len(fractions))
+    V, BM, slope, deflection = (np.abs(q).reshape(shape) for q in evaluate_beam(terms, a, b, EI, samples, left))
+    load = np.abs(singularity_sum(differentiate_terms(differentiate_terms(terms)), samples, left)).reshape(shape)
+    load_slope = np.abs(singularity_sum(differentiate_terms(differentiate_terms(differentiate_terms(terms))),
+                                        samples, left)).reshape(shape)
+    
+    # Largest step meeting the tolerance for each diagram, from a bound on its second derivative
+    steps = []
+    for values, second_derivative in ((V, load_slope), (BM, load), (slope, V / EI), (deflection, BM / EI)):
+        allowed = tolerance * values.max()
+        bound = second_derivative.max(axis=1)
+        if allowed > 0:
+            with np.errstate(divide="ignore"):
+                steps.append(np.sqrt(8 * allowed / bound))
+    step = np.min(steps, axis=0) if steps else np.full(len(h), np.inf)
+    counts = np.maximum(1, np.ceil(h / step)).astype(int)
+    if counts.sum() + 1 > max_stations:
+        counts = np.maximum(1, np.floor(counts * (max_stations - 1) / counts.sum())).astype(int)
+    
+    # Evenly spaced stations within each segment, plus the beam end
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    x = np.append(np.repeat(nodes[:-1], counts) + np.repeat(h / counts, counts) * offsets, length)
+    
+    # Second station at every jump in shear force (point forces) or bending moment (point moments)
+    jumps = np.unique(p[(n <= 1) & (c != 0) & (p > 0) & (p <= length)])
+    x = np.concatenate([x, jumps])
+    left = np.concatenate([np.zeros(len(x) - len(jumps), dtype=bool), np.ones(len(jumps), dtype=bool)])
+    order = np.lexsort((~left, x))
+    return x[order], left[order]
+
+def _segment_polynomials(terms: Terms, nodes: np.ndarray) -> np.ndarray:
+    """
+    Power series coefficients in t = x - nodes[k] of sum c <x - p>^n on each segment [nodes[k], nodes[k + 1]]
+    Returns: array of shape (segments, coefficients)
+    """
+    c, p, n = terms
+    orders = n.astype(int)
+    d = nodes[:-1, None] - p[None, :]
+    active = d >= 0
+    coefficients = np.zeros((len(nodes) - 1, max(int(orders.max(initial=0)) + 1, 2)))
+    for j in range(coefficients.shape[1]):
+        power = np.maximum(orders - j, 0)
+        weight = c * _BINOMIAL[orders, min(j, 5)] * (orders >= j)
+        coefficients[:, j] = (np.where(active, np.abs(d) ** power, 0.0) * weight).sum(axis=1)
+    return coefficients
+
+def exact_peaks(terms: Terms, a: float, b: float, EI: float, length: float) -> Dict[str, Tuple[float, float]]:
+    """
+    Location and signed value of the largest magnitude of each diagram
+    Candidates are both limits at every node and the interior roots of each diagram's derivative.
+    Returns: {"shear_force": (x, value), "bending_moment": ..., "slope": ..., "deflection": ...}
+    """
+    c, p, n = terms
+    nodes = np.unique(np.concatenate([[0.0, length], p[(p > 0) & (p < length)]]))
+    h = np.diff(nodes)
+    c1, c2 = integration_constants(terms, a, b)
+    
+    # (terms, scale, constant, linear) so that the diagram is scale * (sum + constant + linear * x)
+    diagrams = {
+        "shear_force": (differentiate_terms(terms), -1.0, 0.0, 0.0),
+        "bending_moment": (terms, 1.0, 0.0, 0.0),
+        "slope": (integrate_terms(terms), 1 / EI, c1, 0.0),
+        "deflection": (integrate_terms(integrate_terms(terms)), 1 / EI, c2, c1),
+    }
+    
+    peaks = {}
+    for field, (diagram_terms, scale, constant, linear) in diagrams.items():
+        polynomials = _segment_polynomials(diagram_terms, nodes)
+        polynomials[:, 0] += constant + linear * nodes[:-1]
+        polynomials[:, 1] += linear
+        polynomials *= scale
+        
+        best_x, best_value = 0.0, 0.0
+        for k, polynomial in enumerate(polynomials):
+            derivative = np.polynomial.polynomial.polytrim(np.polynomial.polynomial.polyder(polynomial), 0)
+            t = [0.0, h[k]]
+            if len(derivative) > 1:
+                roots = np.polynomial.polynomial.polyroots(derivative)
+                roots = roots.real[np.abs(roots.imag) <= 1e-12 * max(h[k], 1.0)]
+                t.extend(roots[(roots > 0) & (roots < h[k])])
+            values = np.polynomial.polynomial.polyval(np.array(t), polynomial)
+            i = int(np.argmax(np.abs(values)))
+            if abs(values[i]) > abs(best_value):
+                best_x, best_value = nodes[k] + t[i], float(values[i])
+        peaks[field] = (float(best_x), best_value)
+    return peaks
+
+def _with_reactions(f2: List[List[float]], r1: float, r2: float, a: float, b: float) -> np.ndarray:
+    """Point forces followed by the two support reactions"""
+    return np.concatenate([np.asarray(f2, dtype=float).reshape(-1, 2), [[r1, a], [r2, b]]])
+
+def solve_beam_adaptive(
+    f1: List[List[float]], f2: List[List[float]],
+    f3: List[List[float]], f4: List[List[float]],
+    a: float, b: float, length: float,
+    G: float = 1.0, I: float = 1.0,
+    tolerance: float = 1e-3, max_stations: int = 100001
+) -> Tuple[BeamSolution, Dict[str, Tuple[float, float]]]:
+    """
+    Solve on an adaptive, discontinuity-aware grid with exact values at every station
+    Returns: (solution, peaks) with peaks as returned by exact_peaks
+    """
+    r1, r2 = support_reactions(f1, f2, f3, f4, a, b)
+    terms = singularity_terms(f1, _with_reactions(f2, r1, r2, a, b), f3, f4)
+    x, left = adaptive_stations(terms, a, b, length, G * I, tolerance, max_stations)
+    V, BM, slope, deflection = evaluate_beam(terms, a, b, G * I, x, left)
+    solution = BeamSolution(x, V, BM, slope, deflection, np.array([r1, r2]))
+    for array in solution:
+        array.setflags(write=False)
+    return solution, exact_peaks(terms, a, b, G * I, length)
+
+def solve_beam_chunks(
+    f1: List[List[float]], f2: List[List[float]],
+    f3: List[List[float]], f4: List[List[float]],
+    a: float, b: float, length: float,
+    G: float = 1.0, I: float = 1.0,
+    stations: int = DEFAULT_STATIONS, chunk: int = STREAM_CHUNK_STATIONS
+) -> Iterator[BeamSolution]:
+    """
+    Exact results at linspace(0, length, stations), yielded as consecutive BeamSolutions of at most chunk stations
+    Working memory depends on the chunk size, not on the number of stations. Many loads shrink the
+    chunks so that the Macaulay matrices stay within BATCH_CHUNK_ELEMENTS, but not below
+    MIN_STREAM_CHUNK_STATIONS; below that, each chunk is evaluated in smaller blocks instead.
+    Every chunk carries the reactions.
+    """
+    r1, r2 = support_reactions(f1, f2, f3, f4, a, b)
+    reactions = np.array([r1, r2])
+    terms = singularity_terms(f1, _with_reactions(f2, r1, r2, a, b), f3, f4)
+    constants = integration_constants(terms, a, b)  # The same for every chunk
+    block = max(1, BATCH_CHUNK_ELEMENTS // len(terms[0]))
+    chunk = min(chunk, max(block, MIN_STREAM_CHUNK_STATIONS))
+    step = length / (stations - 1)
+    for start in range(0, stations, chunk):
+        x = np.arange(start, min(start + chunk, stations)) * step
+        if start + len(x) == stations:
+            x[-1] = length  # same end point as np.linspace
+        fields = [evaluate_beam(terms, a, b, G * I, x[i:i + block], constants=constants) for i in range(0, len(x), block)]
+        yield BeamSolution(x, *(np.concatenate(field) for field in zip(*fields)), reactions)
+
+def solve_beam_batch(problems: List[Tuple], stations: int = DEFAULT_STATIONS) -> BatchSolution:
+    """
+    Solve many beam problems together with the vectorized engine
+    problems: sequence of (f1, f2, f3, f4, a, b, length, G, I)
+    Problems with the same length share a station grid; their singularity terms are
+    stacked and evaluated in one pass per chunk of at most BATCH_CHUNK_ELEMENTS.
+    """
+    count = len(problems)
+    lengths = np.array([problem[6] for problem in problems], dtype=float)
+    a = np.array([problem[4] for problem in problems], dtype=float)
+    b = np.array([problem[5] for problem in problems], dtype=float)
+    EI = np.array([problem[7] * problem[8] for problem in problems], dtype=float)
+    
+    # Stack every load of every problem by type, remembering which problem it belongs to
+    def stack(index: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        rows = [np.asarray(problem[index], dtype=float).reshape(-1, width) for problem in problems]
+        owners = np.repeat(np.arange(count), [len(r) for r in rows])
+        return (np.concatenate(rows) if rows else np.empty((0, width))), owners
+    
+    (m, om), (p, op), (c, oc), (t, ot) = stack(0, 2), stack(1, 2), stack(2, 3), stack(3, 3)
     
-    # Calculate bending moment
-    BM = calculate_bending_moment(f1, f2, f3, f4, l, dl)
+    # Reactions of all problems from vectorized resultants
+    c_force, c_centroid = constant_profile_resultant(c[:, 0], c[:, 1], c[:, 2])
+    t_force, t_centroid = triangular_profile_resultant(t[:, 0], t[:, 1], t[:, 2])
+    moment_sum = (np.bincount(om, m[:, 0], count) + np.bincount(op, p[:, 0] * (p[:, 1] - a[op]), count)
+                  + np.bincount(oc, c_force * (c_centroid - a[oc]), count)
+                  + np.bincount(ot, t_force * (t_centroid - a[ot]), count))
+    force_sum = np.bincount(op, p[:, 0], count) + np.bincount(oc, c_force, count) + np.bincount(ot, t_force, count)
+    r2 = moment_sum / (a - b)
+    r1 = -force_sum - r2
     
-    # Calculate slope and deflection
-    slope, deflection = calculate_slope_and_deflection(BM, l, dl, a, b, G, I)
+    # Reactions become point forces, then all loads become singularity terms
+    p = np.concatenate([p, np.column_stack([r1, a]), np.column_stack([r2, b])])
+    op = np.concatenate([op, np.arange(count), np.arange(count)])
+    coefficients, positions, orders = singularity_terms(m, p, c, t)
+    owners = np.concatenate([om, op, oc, oc, ot, ot, ot])
+    order = np.argsort(owners, kind="stable")
+    coefficients, positions, orders, owners = coefficients[order], positions[order], orders[order], owners[order]
+    starts = np.searchsorted(owners, np.arange(count + 1))  # Every problem has at least its two reactions
     
-    return V, BM, slope, deflection, f2c
+    # Integration constants of every problem, from its twice integrated terms at both supports
+    c2s, p2s, n2s = integrate_terms(integrate_terms((coefficients, positions, orders)))
+    def at(x: np.ndarray) -> np.ndarray:
+        d = x[owners] - p2s
+        return np.bincount(owners, c2s * np.where(d >= 0, np.abs(d) ** n2s, 0.0), count)
+    
+    Da, Db = at(a), at(b)
+    c1 = -(Db - Da) / (b - a)
+    c2 = -Da - c1 * a
+    
+    V = np.empty((count, stations))
+    BM = np.empty((count, stations))
+    SL = np.empty((count, stations))
+    D = np.empty((count, stations))
+    for length in np.unique(lengths):
+        rows = np.flatnonzero(lengths == length)
+        l = np.linspace(0, length, stations)
+        
+        # Split the rows of this grid into chunks that keep the Macaulay matrices bounded
+        chunk: List[int] = []
+        chunk_terms = 0
+        for row in list(rows) + [None]:
+            row_terms = 0 if row is None else starts[row + 1] - starts[row]
+            if chunk and (row is None or (chunk_terms + row_terms) * stations > BATCH_CHUNK_ELEMENTS):
+                terms = np.concatenate([np.arange(starts[r], starts[r + 1]) for r in chunk])
+                segments = np.cumsum([0] + [starts[r + 1] - starts[r] for r in chunk])[:-1]
+                cs, ps, ns = coefficients[terms], positions[terms], orders[terms]
+                BM[chunk] = np.add.reduceat(cs[:, None] * macaulay(l, ps, ns), segments, axis=0)
+                V[chunk] = np.add.reduceat(-(cs * ns)[:, None] * macaulay(l, ps, np.maximum(ns - 1, 0)), segments, axis=0)
+                SL[chunk] = np.add.reduceat((cs / (ns + 1))[:, None] * macaulay(l, ps, ns + 1), segments, axis=0)
+                D[chunk] = np.add.reduceat((cs / ((ns + 1) * (ns + 2)))[:, None] * macaulay(l, ps, ns + 2), segments, axis=0)
+                chunk, chunk_terms = [], 0
+            if row is not None:
+                chunk.append(row)
+                chunk_terms += row_terms
+    
+    # Slope and deflection in closed form, exact at every station even across point moment jumps
+    x = np.linspace(0, lengths, stations, axis=-1)
+    slope = (SL + c1[:, None]) / EI[:, None]
+    deflection = (D + c1[:, None] * x + c2[:, None]) / EI[:, None]
+    return BatchSolution(lengths, V, BM, slope, deflection, np.column_stack([r1, r2]))
+
+def combine_load_cases(basis: BatchSolution, factors: np.ndarray) -> BatchSolution:
+    """
+    Superpose per-load responses: row i of the result is sum_j factors[i, j] * basis row j
+    basis holds one row per load (e.g. from solve_beam_batch), factors has shape (combinations, loads)
+    """
+    factors = np.asarray(factors, dtype=float)
+    lengths = np.full(len(factors), basis.lengths[0] if len(basis.lengths) else 0.0)
+    return BatchSolution(lengths, *(factors @ field for field in basis[1:]))
+
+def envelope(solution: BatchSolution) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Station-wise (max, min) over all rows of a stacked solution, reduced in one pass"""
+    stacked = np.stack(solution[1:5])  # (quantities, rows, stations)
+    upper, lower = stacked.max(axis=1), stacked.min(axis=1)
+    return {field: (upper[i], lower[i]) for i, field in enumerate(BatchSolution._fields[1:5])}
+
+def combination_envelope(basis: BatchSolution, factors: np.ndarray) -> Tuple[BatchSolution, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """combine_load_cases and the envelope of the combinations, as one compute task"""
+    combined = combine_load_cases(basis, factors)
+    return combined, envelope(combined)
+
+class InfluenceLines(NamedTuple):
+    """Effects of a unit upward point force, one column per force position"""
+    positions: np.ndarray       # (positions,)
+    reactions: np.ndarray       # (2, positions), R1 and R2
+    shear_force: np.ndarray     # (sections, positions)
+    bending_moment: np.ndarray  # (sections, positions)
+
+def influence_lines(a: float, b: float, sections: np.ndarray, positions: np.ndarray) -> InfluenceLines:
+    """
+    Unit-load influence lines for the reactions and for shear and moment at each section
+    Same closed form as the vectorized engine: the unit force and both reactions (from
+    support_reactions) as point force terms, evaluated at every force position at once.
+    """
+    xi = np.asarray(positions, dtype=float)
+    s = np.asarray(sections, dtype=float)[:, None]
+    r2 = (xi - a) / (a - b)
+    r1 = -1.0 - r2
+    shear = -((s >= xi) + r1 * (s >= a) + r2 * (s >= b))
+    moment = np.maximum(s - xi, 0.0) + r1 * np.maximum(s - a, 0.0) + r2 * np.maximum(s - b, 0.0)
+    return InfluenceLines(xi, np.stack([r1, r2]), shear, moment)
+
+class MovingLoadSweep(NamedTuple):
+    """Effects of an axle train at each lead axle position, one column per position"""
+    lead_positions: np.ndarray  # (positions,)
+    reactions: np.ndarray       # (2, positions)
+    shear_force: np.ndarray     # (sections, positions)
+    bending_moment: np.ndarray  # (sections, positions)
+
+def moving_load_sweep(a: float, b: float, length: float, sections: np.ndarray,
+                      magnitudes: np.ndarray, offsets: np.ndarray, positions: int = 2001) -> MovingLoadSweep:
+    """
+    Roll a train of point forces across the beam
+    Axle k of the given magnitude sits offsets[k] behind the lead axle. The lead axle runs
+    over evenly spaced positions until the whole train has crossed; axles off the beam carry
+    nothing. Each effect is the magnitude-weighted sum of the influence lines at the axle positions.
+    """
+    magnitudes = np.asarray(magnitudes, dtype=float)
+    offsets = np.asarray(offsets, dtype=float)
+    sections = np.asarray(sections, dtype=float)
+    lead = np.linspace(offsets.min(), length + offsets.max(), positions)
+    reactions = np.empty((2, positions))
+    shear = np.empty((len(sections), positions))
+    moment = np.empty((len(sections), positions))
+
+    # Evaluate (sections, positions, axles) blocks of bounded size
+    chunk = max(1, BATCH_CHUNK_ELEMENTS // (max(len(sections), 2) * len(offsets)))
+    for start in range(0, positions, chunk):
+        stop = min(start + chunk, positions)
+        xi = lead[start:stop, None] - offsets[None, :]
+        weights = np.where((xi >= 0) & (xi <= length), magnitudes, 0.0)
+        lines = influence_lines(a, b, sections, xi.ravel())
+        blocks = (lines.reactions, lines.shear_force, lines.bending_moment)
+        for target, block in zip((reactions, shear, moment), blocks):
+            target[:, start:stop] = np.einsum("rpk,pk->rp", block.reshape(len(block), stop - start, -1), weights)
+    return MovingLoadSweep(lead, reactions, shear, moment)
+
+def governing_effects(sweep: MovingLoadSweep) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Per row of each effect: (max, lead position of max, min, lead position of min)"""
+    governing = {}
+    for field in MovingLoadSweep._fields[1:]:
+        values = getattr(sweep, field)
+        upper, lower = values.argmax(axis=1), values.argmin(axis=1)
+        rows = np.arange(len(values))
+        governing[field] = (values[rows, upper], sweep.lead_positions[upper],
+                            values[rows, lower], sweep.lead_positions[lower])
+    return governing
 
 def calculate_shear_force(f2: List[List[float]], f3: List[List[float]], 
                          f4: List[List[float]], l: np.ndarray, dl: float) -> List[float]:
@@ -190,43 +760,280 @@ def calculate_bending_moment(f1: List[List[float]], f2: List[List[float]],
     BM.append(bm)
     return BM
 
+def _shear_force_loop(f2: np.ndarray, f3: np.ndarray, f4: np.ndarray, l: np.ndarray, dl: float) -> np.ndarray:
+    """calculate_shear_force over float64 arrays, step for step; compiled by Numba when it is installed"""
+    n2, n3, n4 = len(f2), len(f3), len(f4)
+    i2 = i3 = i4 = -1
+    active2 = active3 = active4 = True
+    v = 0.0
+    V = np.empty(len(l))
+    for s in range(len(l) - 1):
+        j = l[s]
+        for _ in range(1):  # One pass over the load types, so that break ends it as in the reference
+            if active2:
+                if i2 + 1 == n2:
+                    active2 = False
+                elif f2[i2 + 1, 1] <= j:
+                    v += f2[i2 + 1, 0]
+                    i2 += 1
+                    if i2 + 1 == n2:
+                        active2 = False
+                        break
+            if active3:
+                if i3 + 1 == n3:
+                    active3 = False
+                    break
+                if f3[i3 + 1, 1] <= j:
+                    v += f3[i3 + 1, 0] * dl
+                    if f3[i3 + 1, 2] < j:
+                        i3 += 1
+                    if i3 + 1 == n3:
+                        active3 = False
+                        break
+            if active4:
+                if i4 + 1 == n4:
+                    active4 = False
+                    break
+                if f4[i4 + 1, 1] <= j:
+                    v += f4[i4 + 1, 0] / (f4[i4 + 1, 2] - f4[i4 + 1, 1]) * (j - f4[i4 + 1, 1]) * dl
+                    if f4[i4 + 1, 2] < j:
+                        i4 += 1
+                    if i4 + 1 == n4:
+                        active4 = False
+                        break
+        V[s] = -v
+    V[len(l) - 1] = -v
+    return V
+
+def _bending_moment_loop(f1: np.ndarray, f2: np.ndarray, f3: np.ndarray, f4: np.ndarray,
+                         l: np.ndarray, dl: float) -> np.ndarray:
+    """calculate_bending_moment over float64 arrays, step for step; compiled by Numba when it is installed"""
+    n1, n2, n3, n4 = len(f1), len(f2), len(f3), len(f4)
+    i1 = i2 = i3 = i4 = -1
+    g2 = g3 = g4 = 0.0
+    bm = 0.0
+    BM = np.empty(len(l))
+    for s in range(len(l) - 1):
+        j = l[s]
+        if i1 + 1 != n1 and f1[i1 + 1, 1] <= j:
+            bm -= f1[i1 + 1, 0]
+            i1 += 1
+        bm += g2 * dl
+        if i2 + 1 != n2 and f2[i2 + 1, 1] <= j:
+            g2 += f2[i2 + 1, 0]
+            i2 += 1
+        bm += g3 * dl
+        if i3 + 1 != n3 and f3[i3 + 1, 1] <= j:
+            g3 += f3[i3 + 1, 0] * dl
+            if f3[i3 + 1, 2] < j:
+                i3 += 1
+        bm += g4 * dl
+        if i4 + 1 != n4 and f4[i4 + 1, 1] <= j:
+            g4 += f4[i4 + 1, 0] / (f4[i4 + 1, 2] - f4[i4 + 1, 1]) * (j - f4[i4 + 1, 1]) * dl
+            if f4[i4 + 1, 2] < j:
+                i4 += 1
+        BM[s] = bm
+    BM[len(l) - 1] = bm
+    return BM
+
+def _point_steps(walk: np.ndarray, locations: np.ndarray) -> np.ndarray:
+    """
+    Step of the walk at which each point load, in location order, is picked up
+    A load is picked up at the first station at or past it, but at most one load per step:
+    s[k] = max(first[k], s[k - 1] + 1). Steps at len(walk) or beyond are never reached.
+    """
+    k = np.arange(len(locations))
+    return k + np.maximum.accumulate(np.searchsorted(walk, locations, side="left") - k) if len(k) else k
+
+def _profile_steps(walk: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First and last step of the walk at which each profile, in start order, is applied
+    Only one profile of a type is followed at a time. It applies from the first step at or past
+    its start, after the previous one ended, up to and including the first step past its end.
+    """
+    k = np.arange(len(starts))
+    first = np.searchsorted(walk, starts, side="left")
+    last = k + np.maximum.accumulate(np.maximum(first, np.searchsorted(walk, ends, side="right")) - k)
+    return np.maximum(first, np.concatenate([[0], last[:-1] + 1])), last
+
+def _range_sum(first: np.ndarray, last: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """At every step below size, the sum of values[k] over the ranges [first[k], last[k]] that cover it"""
+    inside = first < size
+    first, last, values = first[inside], np.minimum(last[inside], size - 1), values[inside]
+    return np.cumsum(np.bincount(first, values, size + 1) - np.bincount(last + 1, values, size + 1))[:size]
+
+def _profile_rate(walk: np.ndarray, profiles: np.ndarray, triangular: bool) -> np.ndarray:
+    """Sum of the intensities of the profiles applied at each step of the walk"""
+    first, last = _profile_steps(walk, profiles[:, 1], profiles[:, 2])
+    if not triangular:
+        return _range_sum(first, last, profiles[:, 0], len(walk))
+    slope = profiles[:, 0] / (profiles[:, 2] - profiles[:, 1])
+    return walk * _range_sum(first, last, slope, len(walk)) - _range_sum(first, last, slope * profiles[:, 1], len(walk))
+
+def _shear_force_numpy(f2: np.ndarray, f3: np.ndarray, f4: np.ndarray, l: np.ndarray, dl: float) -> np.ndarray:
+    """
+    The walk of calculate_shear_force replayed with array operations
+    In the reference, the step at which a load type runs out (or, for an empty profile type, its
+    first step) ends that station's pass, so the following types skip that one station.
+    """
+    steps = np.arange(len(l) - 1)
+    increments = np.zeros(len(steps))
+    skipped = []
+
+    picked = _point_steps(l[:-1], f2[:, 1])
+    increments += np.bincount(picked[picked < len(steps)], f2[picked < len(steps), 0], len(steps))
+    if len(f2) and picked[-1] < len(steps):
+        skipped.append(picked[-1])
+
+    for profiles, triangular in ((f3, False), (f4, True)):
+        walk = np.setdiff1d(steps, skipped)
+        if not len(profiles):
+            skipped.extend(walk[:1])
+            continue
+        increments[walk] += _profile_rate(l[walk], profiles, triangular) * dl
+        _, last = _profile_steps(l[walk], profiles[:, 1], profiles[:, 2])
+        if last[-1] < len(walk):
+            skipped.append(walk[last[-1]])
+
+    V = -np.cumsum(increments)
+    return np.append(V, V[-1:])
+
+def _bending_moment_numpy(f1: np.ndarray, f2: np.ndarray, f3: np.ndarray, f4: np.ndarray,
+                          l: np.ndarray, dl: float) -> np.ndarray:
+    """
+    The walk of calculate_bending_moment replayed with array operations
+    Each step adds the force and profile totals picked up before it, times dl, to the moment.
+    """
+    steps = len(l) - 1
+    walk = l[:-1]
+    picked = _point_steps(walk, f1[:, 1])
+    increments = -np.bincount(picked[picked < steps], f1[picked < steps, 0], steps).astype(float)
+    picked = _point_steps(walk, f2[:, 1])
+    totals = [np.cumsum(np.bincount(picked[picked < steps], f2[picked < steps, 0], steps))]
+    for profiles, triangular in ((f3, False), (f4, True)):
+        if len(profiles):
+            totals.append(np.cumsum(_profile_rate(walk, profiles, triangular) * dl))
+    for total in totals:
+        increments[1:] += total[:-1] * dl
+    BM = np.cumsum(increments)
+    return np.append(BM, BM[-1:])
+
+class Kernels(NamedTuple):
+    """Station-walking kernels of the loop engine, called with the loads sorted by location"""
+    shear_force: Callable[..., List[float]]     # (f2, f3, f4, l, dl) -> V
+    bending_moment: Callable[..., List[float]]  # (f1, f2, f3, f4, l, dl) -> BM
+
+def _array_kernels(shear_force: Callable[..., np.ndarray], bending_moment: Callable[..., np.ndarray]) -> Kernels:
+    """Kernels over contiguous float64 arrays, taking and returning the loop engine's lists"""
+    def rows(f, width: int) -> np.ndarray:
+        return np.ascontiguousarray(np.asarray(f, dtype=float).reshape(-1, width))
+
+    return Kernels(
+        lambda f2, f3, f4, l, dl: shear_force(
+            rows(f2, 2), rows(f3, 3), rows(f4, 3), np.asarray(l, dtype=float), float(dl)).tolist(),
+        lambda f1, f2, f3, f4, l, dl: bending_moment(
+            rows(f1, 2), rows(f2, 2), rows(f3, 3), rows(f4, 3), np.asarray(l, dtype=float), float(dl)).tolist(),
+    )
+
+# Kernel backends of the loop engine: python (the reference loops above), numpy (the same walk
+# replayed with array operations) and numba (the reference loops compiled to machine code, when
+# numba is installed). All of them give the reference results.
+KERNEL_BACKENDS: Dict[str, Kernels] = {
+    "python": Kernels(calculate_shear_force, calculate_bending_moment),
+    "numpy": _array_kernels(_shear_force_numpy, _bending_moment_numpy),
+}
+if numba is not None:
+    KERNEL_BACKENDS["numba"] = _array_kernels(
+        numba.njit(cache=True)(_shear_force_loop), numba.njit(cache=True)(_bending_moment_loop)
+    )
+DEFAULT_KERNEL_BACKEND = "numba" if numba is not None else "numpy"
+
+def set_kernel_backend(name: str) -> None:
+    """Select the kernel backend used by the loop engine when none is given"""
+    global _kernel_backend
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{name}'. Use one of: {', '.join(KERNEL_BACKENDS)}")
+    _kernel_backend = name
+
+def kernel_backend() -> str:
+    """Name of the kernel backend used by the loop engine when none is given"""
+    return _kernel_backend
+
+# BEAM_KERNEL_BACKEND selects the backend for every process, including the compute workers. A
+# backend that isn't available here (numba without numba installed) falls back to the default.
+_kernel_backend = DEFAULT_KERNEL_BACKEND
+try:
+    set_kernel_backend(os.environ.get("BEAM_KERNEL_BACKEND") or DEFAULT_KERNEL_BACKEND)
+except ValueError as e:
+    logging.getLogger(__name__).warning("%s. Using the %s kernel backend.", e, DEFAULT_KERNEL_BACKEND)
+
 def calculate_slope_and_deflection(BM: List[float], l: np.ndarray, dl: float,
-                                 a: float, b: float, G: float, I: float) -> Tuple[List[float], List[float]]:
+                                 a: float, b: float, G: float, I: float,
+                                 rule: Optional[str] = None) -> Tuple[List[float], List[float]]:
     """Calculate slope and deflection from bending moment"""
-    # Calculate slope by integrating bending moment
-    slope = []
-    da = 0
-    for bm in BM:
-        da += bm * dl
-        slope.append(da)
-
-    # Calculate deflection by integrating slope
-    deflection = []
-    da = 0
-    for s in slope:
-        da += s * dl
-        deflection.append(da)
-
-    # Find indices for support locations
-    ai = bi = 0
-    for i in range(len(l)):
-        if abs(l[i] - a) < dl/2:
-            ai = i
-        if abs(l[i] - b) < dl/2:
-            bi = i
-
-    # Apply boundary conditions and material properties
-    for i in range(len(l)):
-        deflection[i] /= (G * I)
-        slope[i] /= (G * I)
-
-    # Apply support conditions (zero deflection at supports)
-    if ai < len(deflection) and bi < len(deflection):
-        c2 = (a * deflection[bi] - b * deflection[ai]) / (b - a) if b != a else 0
-        c1 = (deflection[ai] - deflection[bi]) / (b - a) if b != a else 0
-
-        for i in range(len(l)):
-            deflection[i] += c1 * l[i] + c2
-            slope[i] += c1
+    slope, deflection = integrate_slope_and_deflection(
+        np.asarray(BM, dtype=float)[None, :], [dl], [a], [b], [G * I], rule
+    )
+    return slope[0].tolist(), deflection[0].tolist()
 
-    return slope, deflection
+def cumulative_integral(y: np.ndarray, dx: np.ndarray, rule: Optional[str] = None) -> np.ndarray:
+    """
+    Running integral of y along its last axis on stations spaced dx apart, zero at the first station
+    trapezoid is O(dx^2). simpson integrates each interval over the cubic through its four neighbouring
+    stations (the quadratic through three at either end); it is exact for cubic bending moments, but the
+    kinks at point loads and supports keep it O(dx^2). rectangle is the original accumulation, which
+    starts at y[0] * dx and is O(dx). A jump in y between stations (a point moment) drops every rule
+    to O(dx).
+    """
+    rule = rule or DEFAULT_INTEGRATION_RULE
+    if rule not in INTEGRATION_RULES:
+        raise ValueError(f"Unknown integration rule '{rule}'. Use one of: {', '.join(INTEGRATION_RULES)}")
+    if rule == "rectangle":
+        return np.cumsum(y, axis=-1) * dx
+    
+    # Integral over each interval in units of dx
+    if rule == "simpson" and y.shape[-1] >= 4:
+        steps = np.empty(y.shape[:-1] + (y.shape[-1] - 1,))
+        steps[..., 1:-1] = (13 * (y[..., 1:-2] + y[..., 2:-1]) - y[..., :-3] - y[..., 3:]) / 24
+        steps[..., 0] = (5 * y[..., 0] + 8 * y[..., 1] - y[..., 2]) / 12
+        steps[..., -1] = (5 * y[..., -1] + 8 * y[..., -2] - y[..., -3]) / 12
+    else:
+        steps = (y[..., :-1] + y[..., 1:]) / 2
+    
+    result = np.zeros(y.shape)
+    np.cumsum(steps, axis=-1, out=result[..., 1:])
+    return result * dx
+
+def integrate_slope_and_deflection(BM: np.ndarray, dl: np.ndarray, a: np.ndarray,
+                                   b: np.ndarray, EI: np.ndarray,
+                                   rule: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Slope and deflection for stacked bending moments of shape (problems, stations)
+    dl, a, b and EI hold one value per row; row i has stations at arange(stations) * dl[i].
+    """
+    dl, a, b, EI = (np.asarray(value, dtype=float)[:, None] for value in (dl, a, b, EI))
+    stations = BM.shape[1]
+    
+    # Double integration of M / EI, before the integration constants
+    slope = cumulative_integral(BM, dl, rule)
+    deflection = cumulative_integral(slope, dl, rule)
+    
+    # Deflection at each support by cubic Hermite interpolation within the interval that holds it,
+    # so a support between stations is still a point of exactly zero deflection
+    supports = np.hstack([a, b]) / dl
+    left = np.clip(np.searchsorted(np.arange(stations), supports, side="right") - 1, 0, stations - 2)
+    t = supports - left
+    rows = np.arange(BM.shape[0])[:, None]
+    h00, h10, h01, h11 = (2 * t ** 3 - 3 * t ** 2 + 1, t ** 3 - 2 * t ** 2 + t, 3 * t ** 2 - 2 * t ** 3, t ** 3 - t ** 2)
+    at_supports = (
+        h00 * deflection[rows, left] + h01 * deflection[rows, left + 1]
+        + dl * (h10 * slope[rows, left] + h11 * slope[rows, left + 1])
+    )
+    
+    # Constants for zero deflection at both supports, applied to every station at once
+    da, db = at_supports[:, :1], at_supports[:, 1:]
+    c1 = (da - db) / (b - a)
+    c2 = (a * db - b * da) / (b - a)
+    slope += c1
+    deflection += c1 * (np.arange(stations) * dl) + c2
+    return slope / EI, deflection / EI
@@ -0,0 +1,150 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+class ExecutorError(Exception):
+    """Base class for executor failures that map to an HTTP status"""
+    status_code = 503
+    headers: Optional[Dict[str, str]] = None
+
+class ExecutorSaturated(ExecutorError):
+    """Raised when the queue of pending tasks is full"""
+    status_code = 429
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Server is busy, please retry shortly")
+        self.headers = {"Retry-After": str(retry_after)}
+
+class TaskTimeout(ExecutorError):
+    """Raised when a task does not finish within the executor's timeout"""
+    status_code = 504
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Calculation did not finish within {timeout:g} s")
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity where the platform reports it)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+class ComputeExecutor:
+    """
+    Process pool for CPU-bound solves and renders, awaited from async handlers
+    At most max_pending tasks may be queued or running; further submissions raise
+    ExecutorSaturated instead of growing the queue. A task that runs past timeout raises
+    TaskTimeout in the caller. A queued task is dropped, while a task that has already
+    started keeps its worker (and its pending slot) until it finishes, so backpressure
+    reflects the work actually in the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float,
+                 initializer: Optional[Callable[[], Any]] = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.initializer = initializer  # Run in every worker process as it starts, e.g. warmup.warm_up
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.profiler = None  # profiling.RequestProfiler, only set when profiling is enabled
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Workers start lazily and use spawn, which is safe in the threaded server process
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer
+            )
+        return self._pool
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += not future.cancelled()
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        """Queue fn(*args) on the pool, raising ExecutorSaturated when max_pending tasks are outstanding"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated()
+            pool = self._get_pool()
+            try:
+                future = pool.submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool and retry once
+                self._pool = None
+                future = self._get_pool().submit(fn, *args)
+            self.pending += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Run fn(*args) in a worker process and await its result"""
+        if self.profiler is not None:
+            # Tasks of requests being profiled are recorded or run under the profiler (profiling.py)
+            return await self.profiler.run_task(self, fn, args)
+        return await self.wait(self.submit(fn, *args))
+
+    async def wait(self, future: Future) -> Any:
+        """Await a submitted task, raising TaskTimeout after the executor's timeout"""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise TaskTimeout(self.timeout)
+
+    async def start(self) -> List[int]:
+        """
+        Start every worker now instead of on the first tasks, returning their process IDs
+        A worker only takes tasks after its initializer has run, so once every worker has answered,
+        all of them are ready.
+        """
+        deadline = time.monotonic() + self.timeout
+        pids = set()
+        while len(pids) < self.workers:
+            if time.monotonic() > deadline:
+                raise TaskTimeout(self.timeout)
+            futures = [self.submit(os.getpid) for _ in range(min(self.workers - len(pids), self.max_pending))]
+            answered = set(await asyncio.gather(*(self.wait(future) for future in futures)))
+            if answered <= pids:
+                await asyncio.sleep(0.01)  # The ready workers took every task; give the others time to start
+            pids |= answered
+        return sorted(pids)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "timeout": self.timeout,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+# Global executor, configured by BEAM_WORKERS (default: available cores),
+# BEAM_QUEUE_DEPTH (default: 4 tasks per worker) and BEAM_TASK_TIMEOUT (seconds, default 30)
+_workers = int(os.environ.get("BEAM_WORKERS", "0")) or available_cores()
+compute_executor = ComputeExecutor(
+    workers=_workers,
+    max_pending=int(os.environ.get("BEAM_QUEUE_DEPTH", "0")) or 4 * _workers,
+    timeout=float(os.environ.get("BEAM_TASK_TIMEOUT", "30")),
+)
@@ -0,0 +1,234 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from .calculations import BeamSolution, DEFAULT_STATIONS, singularity_terms, integrate_terms, singularity_sum, evaluate_beam
+
+try:
+    from scipy.linalg import solveh_banded
+except ImportError:  # scipy is optional; _solve_block_tridiagonal is the fallback
+    solveh_banded = None
+
+# Support types: pinned and roller supports restrain deflection, fixed supports also restrain slope
+PINNED = "pinned"
+ROLLER = "roller"
+FIXED = "fixed"
+SUPPORT_TYPES = (PINNED, ROLLER, FIXED)
+
+# A support as (location, type)
+Support = Tuple[float, str]
+
+def supports_error(supports: Sequence[Support]) -> Optional[str]:
+    """Check that a support list can carry load, returning an error message or None"""
+    locations = [location for location, _ in supports]
+    if len(set(locations)) != len(locations):
+        return "Support locations must be different"
+    if len(supports) < 2 and not any(kind == FIXED for _, kind in supports):
+        return "A beam needs a fixed support or at least two supports"
+    return None
+
+def element_stiffness(lengths: np.ndarray) -> np.ndarray:
+    """Euler-Bernoulli stiffness matrices of unit EI, shape (elements, 4, 4), for dofs (v1, theta1, v2, theta2)"""
+    L = np.asarray(lengths, dtype=float)[:, None, None]
+    k = np.array([
+        [12, 6, -12, 6],
+        [6, 4, -6, 2],
+        [-12, -6, 12, -6],
+        [6, 2, -6, 4],
+    ], dtype=float)
+    # Each row and column of theta carries one power of L
+    powers = np.array([0, 1, 0, 1])
+    return k * L ** (powers[:, None] + powers[None, :]) / L ** 3
+
+def shape_functions(xi: np.ndarray, L: np.ndarray) -> np.ndarray:
+    """Hermite shape functions (N1..N4) at element coordinates xi in [0, 1], shape xi.shape + (4,)"""
+    return np.stack([1 - 3 * xi ** 2 + 2 * xi ** 3, L * (xi - 2 * xi ** 2 + xi ** 3),
+                     3 * xi ** 2 - 2 * xi ** 3, L * (xi ** 3 - xi ** 2)], axis=-1)
+
+def shape_derivatives(xi: np.ndarray, L: np.ndarray) -> np.ndarray:
+    """d/dx of the Hermite shape functions, shape xi.shape + (4,)"""
+    return np.stack([6 * (xi ** 2 - xi) / L, 1 - 4 * xi + 3 * xi ** 2,
+                     6 * (xi - xi ** 2) / L, 3 * xi ** 2 - 2 * xi], axis=-1)
+
+# Three-point Gauss-Legendre rule on [-1, 1], exact for a linear load times a cubic shape function
+_GAUSS_POINTS = np.array([-np.sqrt(0.6), 0.0, np.sqrt(0.6)])
+_GAUSS_WEIGHTS = np.array([5.0, 8.0, 5.0]) / 9
+
+def _solve_block_tridiagonal(D: np.ndarray, U: np.ndarray, F: np.ndarray) -> np.ndarray:
+    """
+    Block Thomas algorithm for a symmetric matrix of 2x2 node blocks: diagonal D (nodes, 2, 2),
+    upper U (nodes - 1, 2, 2) and right-hand side F (nodes, 2). O(nodes) in plain floats.
+    """
+    nodes = len(D)
+    diagonal, upper, rhs = D.tolist(), U.tolist(), F.tolist()
+    inverses = []
+    for i in range(nodes):
+        (a, b), (c, d) = diagonal[i]
+        f, g = rhs[i]
+        if i:
+            # Eliminate the lower block U[i-1]^T with the previous pivot
+            (p, q), (r, s) = upper[i - 1]
+            (w, x), (y, z) = inverses[i - 1]
+            f0, g0 = rhs[i - 1]
+            # L = U^T P^-1 with U^T = [[p, r], [q, s]]
+            l00, l01 = p * w + r * y, p * x + r * z
+            l10, l11 = q * w + s * y, q * x + s * z
+            a -= l00 * p + l01 * r
+            b -= l00 * q + l01 * s
+            c -= l10 * p + l11 * r
+            d -= l10 * q + l11 * s
+            f -= l00 * f0 + l01 * g0
+            g -= l10 * f0 + l11 * g0
+            rhs[i] = [f, g]
+        determinant = a * d - b * c
+        if abs(determinant) <= 1e-12 * max(abs(a * d), abs(b * c), 1e-300):
+            raise ValueError("The supports do not restrain the beam")
+        inverses.append([[d / determinant, -b / determinant], [-c / determinant, a / determinant]])
+
+    u = [[0.0, 0.0] for _ in range(nodes)]
+    for i in range(nodes - 1, -1, -1):
+        f, g = rhs[i]
+        if i < nodes - 1:
+            (p, q), (r, s) = upper[i]
+            v, t = u[i + 1]
+            f -= p * v + q * t
+            g -= r * v + s * t
+        (w, x), (y, z) = inverses[i]
+        u[i] = [w * f + x * g, y * f + z * g]
+    return np.array(u)
+
+def _solve_banded(D: np.ndarray, U: np.ndarray, F: np.ndarray) -> np.ndarray:
+    """Solve the node block system with a banded Cholesky factorization (bandwidth 3 in dof order)"""
+    nodes = len(D)
+    ab = np.zeros((4, 2 * nodes))
+    ab[3, 0::2], ab[3, 1::2] = D[:, 0, 0], D[:, 1, 1]
+    ab[2, 1::2] = D[:, 0, 1]
+    ab[2, 2::2] = U[:, 1, 0]
+    ab[1, 2::2] = U[:, 0, 0]
+    ab[1, 3::2] = U[:, 1, 1]
+    ab[0, 3::2] = U[:, 0, 1]
+    try:
+        return solveh_banded(ab, F.ravel()).reshape(nodes, 2)
+    except np.linalg.LinAlgError:
+        raise ValueError("The supports do not restrain the beam")
+
+def solve_nodes(lengths: np.ndarray, restrained: np.ndarray, F: np.ndarray,
+                banded: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nodal (v, theta) times EI and the support reactions of a beam of unit EI
+    lengths holds the element lengths, restrained (nodes, 2) flags fixed dofs and F (nodes, 2)
+    holds the nodal loads. The global stiffness is assembled as 2x2 node blocks (diagonal and
+    upper), with restrained dofs replaced by identity rows, and solved in O(nodes): with scipy's
+    banded Cholesky when it is available and banded is set, otherwise a block Thomas sweep.
+    Returns: (displacements, reactions), both (nodes, 2), reactions are zero at free dofs
+    """
+    k = element_stiffness(lengths)
+    D = np.zeros((len(lengths) + 1, 2, 2))
+    D[:-1] += k[:, :2, :2]
+    D[1:] += k[:, 2:, 2:]
+    U = k[:, :2, 2:].copy()
+    stiffness = D.copy(), U.copy()
+
+    # Zero the rows and columns of restrained dofs, keeping the unit diagonal
+    D[:, :, :] *= ~restrained[:, :, None] & ~restrained[:, None, :]
+    D[:, 0, 0] += restrained[:, 0]
+    D[:, 1, 1] += restrained[:, 1]
+    U *= ~restrained[:-1, :, None] & ~restrained[1:, None, :]
+    free = np.where(restrained, 0.0, F)
+
+    if banded and solveh_banded is not None:
+        u = _solve_banded(D, U, free)
+    else:
+        u = _solve_block_tridiagonal(D, U, free)
+
+    # Reactions balance the unmodified stiffness times the displacements against the loads
+    D, U = stiffness
+    Ku = np.einsum("nij,nj->ni", D, u)
+    Ku[:-1] += np.einsum("nij,nj->ni", U, u[1:])
+    Ku[1:] += np.einsum("nji,nj->ni", U, u[:-1])
+    return u, np.where(restrained, Ku - F, 0.0)
+
+def solve_beam_fe(
+    f1: List[List[float]], f2: List[List[float]],
+    f3: List[List[float]], f4: List[List[float]],
+    supports: Sequence[Support], length: float,
+    G: float = 1.0, I: float = 1.0,
+    stations: int = DEFAULT_STATIONS
+) -> Tuple[BeamSolution, np.ndarray]:
+    """
+    Solve a beam on any number of pinned, roller and fixed supports with Hermite beam elements
+    Nodes sit at the beam ends and supports, and loads enter as consistent nodal loads, so the
+    nodal values and reactions are exact however the loads fall within the spans. The diagrams
+    are then evaluated in closed form with the reactions as point loads, like the vectorized engine.
+    Returns: (solution, reaction_moments) with solution.reactions holding one force per support
+    and reaction_moments one moment per support (zero unless fixed), in support order
+    """
+    error = supports_error(supports)
+    if error:
+        raise ValueError(error)
+
+    m = np.asarray(f1, dtype=float).reshape(-1, 2)
+    p = np.asarray(f2, dtype=float).reshape(-1, 2)
+    c = np.asarray(f3, dtype=float).reshape(-1, 3)
+    t = np.asarray(f4, dtype=float).reshape(-1, 3)
+    profiles = np.concatenate([c, t])
+    locations = np.array([location for location, _ in supports], dtype=float)
+    fixed = np.array([kind == FIXED for _, kind in supports])
+
+    nodes = np.unique(np.concatenate([[0.0, length], locations]))
+    lengths = np.diff(nodes)
+    elements = len(lengths)
+
+    def element_of(x: np.ndarray, side: str = "right") -> np.ndarray:
+        return np.clip(np.searchsorted(nodes, x, side=side) - 1, 0, elements - 1)
+
+    # Consistent nodal loads (F1, M1, F2, M2) per element: point loads through the shape functions
+    # and their slopes where they act, profiles by Gauss quadrature over each piece in an element
+    element_loads = np.zeros((elements, 4))
+    for rows, weight in ((p, shape_functions), (m, shape_derivatives)):
+        e = element_of(rows[:, 1])
+        np.add.at(element_loads, e, rows[:, :1] * weight((rows[:, 1] - nodes[e]) / lengths[e], lengths[e]))
+
+    # Intensity of each profile as alpha + k * x
+    k = np.concatenate([np.zeros(len(c)), t[:, 0] / (t[:, 2] - t[:, 1])])
+    alpha = np.concatenate([c[:, 0], -k[len(c):] * t[:, 1]])
+    first, last = element_of(profiles[:, 1]), element_of(profiles[:, 2], side="left")
+    counts = last - first + 1
+    owners = np.repeat(np.arange(len(profiles)), counts)
+    e = first[owners] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    low, high = np.maximum(profiles[owners, 1], nodes[e]), np.minimum(profiles[owners, 2], nodes[e + 1])
+    x = (low + high)[:, None] / 2 + (high - low)[:, None] / 2 * _GAUSS_POINTS
+    weights = (high - low)[:, None] / 2 * _GAUSS_WEIGHTS * (alpha[owners, None] + k[owners, None] * x)
+    N = shape_functions((x - nodes[e, None]) / lengths[e, None], lengths[e, None])
+    np.add.at(element_loads, e, np.einsum("pg,pgi->pi", weights, N))
+
+    F = np.zeros((len(nodes), 2))
+    F[:-1] += element_loads[:, :2]
+    F[1:] += element_loads[:, 2:]
+
+    support_nodes = np.searchsorted(nodes, locations)
+    restrained = np.zeros((len(nodes), 2), dtype=bool)
+    restrained[support_nodes, 0] = True
+    restrained[support_nodes[fixed], 1] = True
+    u, reactions = solve_nodes(lengths, restrained, F)
+    forces, moments = reactions[support_nodes, 0], reactions[support_nodes, 1]
+
+    # Reactions join the loads; the nodal slope and deflection at x = 0 fix the integration constants
+    terms = singularity_terms(
+        [list(moment) for moment in m] + [[moment, location] for moment, location in zip(moments[fixed], locations[fixed])],
+        [list(force) for force in p] + [[force, location] for force, location in zip(forces, locations)],
+        f3, f4
+    )
+    slope_terms = integrate_terms(terms)
+    origin = np.zeros(1)
+    constants = (
+        u[0, 1] - singularity_sum(slope_terms, origin)[0],
+        u[0, 0] - singularity_sum(integrate_terms(slope_terms), origin)[0],
+    )
+    # The last station takes left-hand limits, so a support at the end shows its reaction
+    x = np.linspace(0, length, stations)
+    V, BM, slope, deflection = evaluate_beam(terms, 0.0, length, G * I, x, left=x == length, constants=constants)
+    solution = BeamSolution(x, V, BM, slope, deflection, forces)
+    for array in solution:
+        array.setflags(write=False)
+    moments.setflags(write=False)
+    return solution, moments
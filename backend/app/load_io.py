@@ -0,0 +1,220 @@
+import codecs
+import csv
+import io
+import json
+import math
+from typing import Any, AsyncIterable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .models import LoadType
+
+# Bulk load files: one load per CSV row or NDJSON line, with these columns. Point loads use
+# location; profiles use start_location and end_location. load_id is ignored on import.
+LOAD_COLUMNS = ["load_type", "magnitude", "location", "start_location", "end_location", "group", "load_id"]
+LOAD_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+MAX_IMPORT_ROWS = 100000
+MAX_IMPORT_BYTES = 32 * 1024 * 1024
+MAX_IMPORT_ROW_LENGTH = 64 * 1024
+
+# Load kinds in the (f1, f2, f3, f4) calculation order
+KIND_BY_NAME = {load_type.value.lower(): kind for kind, load_type in enumerate(LoadType)}
+
+class LoadTable(NamedTuple):
+    """Parsed load rows as columns; position is the location of point loads and the start of profiles"""
+    lines: np.ndarray
+    kinds: np.ndarray
+    magnitudes: np.ndarray
+    positions: np.ndarray
+    ends: np.ndarray
+    groups: List[str]
+
+def _number(value: Any) -> float:
+    if value is None or value == "":
+        return math.nan
+    return float(value)
+
+class LoadTableBuilder:
+    """Collects rows one at a time, recording a parse error (line, message) for each malformed row"""
+
+    def __init__(self):
+        self.lines: List[int] = []
+        self.kinds: List[int] = []
+        self.magnitudes: List[float] = []
+        self.positions: List[float] = []
+        self.ends: List[float] = []
+        self.groups: List[str] = []
+        self.errors: List[Tuple[int, str]] = []
+
+    def add(self, line: int, row: Dict[str, Any]) -> None:
+        kind = KIND_BY_NAME.get(str(row.get("load_type", "")).strip().lower())
+        if kind is None:
+            self.errors.append((line, f"Unknown load type: {row.get('load_type')!r}"))
+            return
+        point = kind < 2
+        try:
+            magnitude = _number(row.get("magnitude"))
+            position = _number(row.get("location" if point else "start_location"))
+            end = math.nan if point else _number(row.get("end_location"))
+        except (TypeError, ValueError):
+            self.errors.append((line, "Magnitude and locations must be numbers"))
+            return
+        self.lines.append(line)
+        self.kinds.append(kind)
+        self.magnitudes.append(magnitude)
+        self.positions.append(position)
+        self.ends.append(end)
+        self.groups.append(str(row.get("group") or "default"))
+
+    def build(self) -> LoadTable:
+        return LoadTable(
+            np.array(self.lines, dtype=int), np.array(self.kinds, dtype=int),
+            np.array(self.magnitudes, dtype=float), np.array(self.positions, dtype=float),
+            np.array(self.ends, dtype=float), self.groups
+        )
+
+class LoadTableTooLarge(ValueError):
+    """The body or one of its rows is over the import size limits"""
+
+async def read_load_table(chunks: AsyncIterable[bytes], load_format: str, max_rows: int,
+                          max_bytes: int = MAX_IMPORT_BYTES, max_row_length: int = MAX_IMPORT_ROW_LENGTH) -> Tuple[LoadTable, List[Tuple[int, str]]]:
+    """
+    Parse a streamed CSV (with a header row) or NDJSON body into a LoadTable and parse errors
+    Rows are parsed as the body arrives; blank lines are skipped. A CSV row ends at the first newline
+    outside quotes, so quoted fields may span lines. Raises LoadTableTooLarge once the body passes
+    max_bytes or a row passes max_row_length characters, so that neither is buffered unbounded.
+    """
+    builder = LoadTableBuilder()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    header: Optional[List[str]] = None
+    pending = ""  # Start of a row whose end hasn't arrived yet
+    quotes = 0  # Quote characters in pending; an odd count means a newline is inside a quoted field
+    size = 0
+    line = 0
+    rows = 0
+
+    def check(text: str) -> None:
+        if len(text) > max_row_length:
+            raise LoadTableTooLarge(f"Line {line + 1}: rows are limited to {max_row_length} characters")
+
+    def split(text: str, final: bool) -> List[str]:
+        """Complete rows of the text received so far, each with its newline"""
+        nonlocal pending, quotes
+        *complete, rest = text.split("\n")
+        records = []
+        for piece in complete:
+            pending += piece + "\n"
+            check(pending)
+            if load_format == "csv":
+                quotes += piece.count('"')
+                if quotes % 2:
+                    continue
+            records.append(pending)
+            pending, quotes = "", 0
+        pending += rest
+        quotes += rest.count('"')
+        check(pending)
+        if final:
+            records.append(pending)
+            pending = ""
+        return records
+
+    def parse(records: List[str]) -> None:
+        nonlocal header, line, rows
+        reader = csv.reader(records) if load_format == "csv" else None
+        for record in records:
+            start = line + 1
+            line += record.count("\n") + (not record.endswith("\n"))
+            if reader is not None:
+                try:
+                    values = next(reader)
+                except csv.Error as e:
+                    raise ValueError(f"Line {start}: {e}")
+                if not record.strip():
+                    continue
+                if header is None:
+                    header = [name.strip() for name in values]
+                    continue
+                row = dict(zip(header, values))
+            else:
+                if not record.strip():
+                    continue
+                try:
+                    row = json.loads(record)
+                except ValueError:
+                    builder.errors.append((start, "Invalid JSON"))
+                    continue
+                if not isinstance(row, dict):
+                    builder.errors.append((start, "Each line must be a JSON object"))
+                    continue
+            rows += 1
+            if rows > max_rows:
+                raise ValueError(f"At most {max_rows} loads can be imported at once")
+            builder.add(start, row)
+
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise LoadTableTooLarge(f"Load files are limited to {max_bytes} bytes")
+        parse(split(decoder.decode(chunk), final=False))
+    parse(split(decoder.decode(b"", final=True), final=True))
+    return builder.build(), builder.errors
+
+def validate_load_table(table: LoadTable, beam_length: float) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    """
+    Check every row against the beam length in one vectorized pass
+    Returns a mask of the valid rows and (line, message) for each rejected row; messages match the
+    single-load checks of /loads/add.
+    """
+    point = table.kinds < 2
+    finite = np.isfinite(table.magnitudes) & np.isfinite(table.positions) & (point | np.isfinite(table.ends))
+    with np.errstate(invalid="ignore"):
+        checks = [
+            (~finite, "Magnitude and locations are required"),
+            (table.positions < 0, "Locations must not be negative"),
+            (point & (table.positions >= beam_length), "Load location must be within beam length"),
+            (~point & ((table.positions >= beam_length) | (table.ends > beam_length)), "Load range must be within beam length"),
+            (~point & (table.positions >= table.ends), "Start location must be less than end location"),
+        ]
+    codes = np.select([failed for failed, _ in checks], np.arange(1, len(checks) + 1), 0)
+    rejected = np.flatnonzero(codes)
+    return codes == 0, [(int(table.lines[index]), checks[codes[index] - 1][1]) for index in rejected]
+
+def table_loads(table: LoadTable, rows: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Split the given rows of an already validated table by load type
+    Returns (table rows, loads in the calculation format) for each kind in (f1, f2, f3, f4) order.
+    """
+    kinds = table.kinds[rows]
+    loads = []
+    for kind in range(len(LoadType)):
+        selected = rows[kinds == kind]
+        columns = [table.magnitudes[selected], table.positions[selected]]
+        if kind >= 2:
+            columns.append(table.ends[selected])
+        loads.append((selected, np.column_stack(columns)))
+    return loads
+
+def load_rows(session) -> Iterator[Dict[str, Any]]:
+    """Every load of a session as a flat row with LOAD_COLUMNS keys"""
+    # Snapshot the store so that edits during a streamed export don't affect it
+    loads = session.loads.copy()
+    for kind, load_type in enumerate(LoadType):
+        for record in loads.records(kind):
+            yield {"load_type": load_type.value, **record}
+
+def export_loads(session, load_format: str, batch: int = 500) -> Iterator[str]:
+    """Serialize a session's loads as CSV (with a header row) or NDJSON, in chunks of batch rows"""
+    rows = load_rows(session)
+    if load_format == "csv":
+        yield ",".join(LOAD_COLUMNS) + "\n"
+    while True:
+        chunk = [row for _, row in zip(range(batch), rows)]
+        if not chunk:
+            return
+        if load_format == "csv":
+            buffer = io.StringIO()
+            csv.DictWriter(buffer, LOAD_COLUMNS, lineterminator="\n").writerows(chunk)
+            yield buffer.getvalue()
+        else:
+            yield "".join(json.dumps(row) + "\n" for row in chunk)
@@ -0,0 +1,161 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic_core import core_schema
+
+# Loads of each type in (f1, f2, f3, f4) order: session field name and calculation-format columns
+KIND_FIELDS = ("point_moments", "point_forces", "constant_force_profiles", "triangular_force_profiles")
+KIND_COLUMNS = (
+    ("magnitude", "location"),
+    ("magnitude", "location"),
+    ("magnitude", "start_location", "end_location"),
+    ("magnitude", "start_location", "end_location"),
+)
+
+# Load IDs are uuid4().hex, kept as ASCII bytes
+LOAD_ID_DTYPE = np.dtype("S32")
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+class LoadStore:
+    """
+    A session's loads as typed columns per load type, each kept sorted by location (start for profiles)
+    values[kind] holds the rows in the [magnitude, location] or [magnitude, start, end] calculation
+    format, so solvers and renderers take them as they are. Every edit replaces the read-only arrays
+    instead of writing into them: arrays handed out earlier stay a consistent snapshot.
+    """
+
+    __slots__ = ("values", "load_ids", "groups", "group_names", "_group_codes")
+
+    def __init__(self):
+        self.values = [_frozen(np.empty((0, len(columns)))) for columns in KIND_COLUMNS]
+        self.load_ids = [_frozen(np.empty(0, dtype=LOAD_ID_DTYPE)) for _ in KIND_COLUMNS]
+        self.groups = [_frozen(np.empty(0, dtype=np.int32)) for _ in KIND_COLUMNS]  # Codes into group_names
+        self.group_names: List[str] = []
+        self._group_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for arrays in (self.values, self.load_ids, self.groups) for array in arrays)
+
+    def rows(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(f1, f2, f3, f4) for the calculation and visualization functions, without copying"""
+        return tuple(self.values)
+
+    def _codes(self, groups: Iterable[str]) -> np.ndarray:
+        codes = []
+        for group in groups:
+            code = self._group_codes.get(group)
+            if code is None:
+                code = self._group_codes[group] = len(self.group_names)
+                self.group_names.append(group)
+            codes.append(code)
+        return np.array(codes, dtype=np.int32)
+
+    def add(self, kind: int, row: Sequence[float], group: str, load_id: str) -> None:
+        """Insert one load at its sorted position, after loads at the same location"""
+        index = int(np.searchsorted(self.values[kind][:, 1], row[1], side="right"))
+        self.values[kind] = _frozen(np.insert(self.values[kind], index, row, axis=0))
+        self.load_ids[kind] = _frozen(np.insert(self.load_ids[kind], index, load_id.encode()))
+        self.groups[kind] = _frozen(np.insert(self.groups[kind], index, self._codes([group])))
+
+    def extend(self, kind: int, rows: np.ndarray, groups: Sequence[str], load_ids: Sequence[str]) -> None:
+        """Merge many loads of one type in a single pass"""
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(KIND_COLUMNS[kind]))
+        if not len(rows):
+            return
+        values = np.concatenate([self.values[kind], rows])
+        order = np.argsort(values[:, 1], kind="stable")
+        self.values[kind] = _frozen(values[order])
+        self.load_ids[kind] = _frozen(np.concatenate([
+            self.load_ids[kind], np.array([load_id.encode() for load_id in load_ids], dtype=LOAD_ID_DTYPE)
+        ])[order])
+        self.groups[kind] = _frozen(np.concatenate([self.groups[kind], self._codes(groups)])[order])
+
+    def remove(self, load_id: str) -> Optional[Tuple[int, np.ndarray, str]]:
+        """Remove a load by ID, returning its kind, row and group if it was found"""
+        key = load_id.encode()
+        for kind, load_ids in enumerate(self.load_ids):
+            found = np.flatnonzero(load_ids == key)
+            if len(found):
+                index = found[0]
+                row, group = self.values[kind][index], self.group_names[self.groups[kind][index]]
+                self.values[kind] = _frozen(np.delete(self.values[kind], index, axis=0))
+                self.load_ids[kind] = _frozen(np.delete(load_ids, index))
+                self.groups[kind] = _frozen(np.delete(self.groups[kind], index))
+                return kind, row, group
+        return None
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def copy(self) -> "LoadStore":
+        """A snapshot that later edits don't affect; the arrays themselves are shared"""
+        snapshot = LoadStore()
+        snapshot.values, snapshot.load_ids, snapshot.groups = list(self.values), list(self.load_ids), list(self.groups)
+        snapshot.group_names, snapshot._group_codes = list(self.group_names), dict(self._group_codes)
+        return snapshot
+
+    def group_labels(self) -> List[str]:
+        """Group of every load, in (f1, f2, f3, f4) and then location order"""
+        return [self.group_names[code] for groups in self.groups for code in groups.tolist()]
+
+    def records(self, kind: int) -> List[Dict[str, Any]]:
+        """Loads of one type as dicts with the fields of their load model"""
+        columns = [column.tolist() for column in self.values[kind].T]
+        groups = [self.group_names[code] for code in self.groups[kind].tolist()]
+        load_ids = self.load_ids[kind].astype(str).tolist()
+        names = KIND_COLUMNS[kind] + ("group", "load_id")
+        return [dict(zip(names, record)) for record in zip(*columns, groups, load_ids)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Columnar plain-data form, used to store sessions as JSON"""
+        data: Dict[str, Any] = {"group_names": self.group_names}
+        for kind, field in enumerate(KIND_FIELDS):
+            data[field] = {
+                "values": self.values[kind].tolist(),
+                "groups": self.groups[kind].tolist(),
+                "load_ids": self.load_ids[kind].astype(str).tolist(),
+            }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadStore":
+        store = cls()
+        store.group_names = list(data.get("group_names", []))
+        store._group_codes = {group: code for code, group in enumerate(store.group_names)}
+        for kind, field in enumerate(KIND_FIELDS):
+            columns = data.get(field)
+            if columns:
+                store.values[kind] = _frozen(np.array(columns["values"], dtype=float).reshape(-1, len(KIND_COLUMNS[kind])))
+                store.groups[kind] = _frozen(np.array(columns["groups"], dtype=np.int32))
+                store.load_ids[kind] = _frozen(np.array(columns["load_ids"], dtype=LOAD_ID_DTYPE))
+        return store
+
+    @classmethod
+    def from_records(cls, loads: Dict[str, List[Dict[str, Any]]]) -> "LoadStore":
+        """Build a store from load model dicts keyed by KIND_FIELDS, as sessions held them before"""
+        store = cls()
+        for kind, field in enumerate(KIND_FIELDS):
+            records = [dict(record) for record in loads.get(field, [])]
+            store.extend(
+                kind, [[record[column] for column in KIND_COLUMNS[kind]] for record in records],
+                [record.get("group") or "default" for record in records],
+                [record.get("load_id") or "" for record in records]
+            )
+        return store
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        # Stored as the columnar dict, so a session with thousands of loads validates without a model per load
+        def validate(value: Any) -> "LoadStore":
+            return value if isinstance(value, cls) else cls.from_dict(value)
+
+        return core_schema.no_info_plain_validator_function(
+            validate, serialization=core_schema.plain_serializer_function_ser_schema(cls.to_dict)
+        )
@@ -1,18 +1,68 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import List, Optional, Tuple
+import os
+import time
+import uuid
 import numpy as np
 
 from .models import (
-    BeamProperties, LoadRequest, LoadType, PointMoment, PointForce,
-    ConstantForceProfile, TriangularForceProfile, AnalysisResults, ErrorResponse
+    BeamProperties, BeamSession, LoadRequest, LoadType, PointMoment, PointForce,
+    ConstantForceProfile, TriangularForceProfile, AnalysisResults, ErrorResponse,
+    BeamProblem, BatchAnalysisRequest, BatchAnalysisResults,
+    CombinationRequest, CombinationResults, DiagramEnvelope, Peak, DiagramSet,
+    InfluenceLineRequest, InfluenceLineResults, MovingLoadRequest, MovingLoadResults, GoverningEffect,
+    DEFAULT_MOVING_LOAD_SECTIONS
 )
 from .session_manager import session_manager
-from .calculations import calculate_structural_analysis
-from .visualization import draw_beam, create_engineering_plot
+from .calculations import (
+    solve_beam, solve_beam_batch, solve_beam_adaptive, solve_beam_chunks, combination_envelope,
+    influence_lines, moving_load_sweep, governing_effects,
+    BeamSolution, BatchSolution, ENGINES, DEFAULT_ENGINE, DEFAULT_STATIONS, STREAM_CHUNK_STATIONS
+)
+from .visualization import (
+    render_beam_png, render_beam_svg, render_plots, png_data_url, PLOT_RENDERERS, PANEL_RENDERERS, DEFAULT_PLOT_RENDERER
+)
+from .cache import analysis_cache, analysis_key, image_cache, etag, etag_matches
+from .serialization import (
+    pack_analysis_results, pack_batch_results, stream_results, BINARY_MEDIA_TYPE, DTYPES, STREAM_FORMATS
+)
+from .executor import compute_executor, ExecutorError
+from .fem import solve_beam_fe, supports_error
+from .load_store import KIND_FIELDS
+from .load_io import (
+    read_load_table, validate_load_table, table_loads, export_loads, LoadTableTooLarge, LOAD_FORMATS,
+    MAX_IMPORT_BYTES, MAX_IMPORT_ROWS
+)
+from .metrics import (
+    MetricsMiddleware, TimedRoute, render_metrics, span, process_age, startup_seconds, METRICS_MEDIA_TYPE
+)
+from .profiling import ProfilingMiddleware, create_profiler
+from .warmup import warm_up
+
+# BEAM_WARMUP=1 starts every compute worker at startup and has it solve and render once (warmup.py)
+WARMUP = os.environ.get("BEAM_WARMUP", "") not in ("", "0")
+if WARMUP:
+    compute_executor.initializer = warm_up
 
-app = FastAPI(title="Beam Analysis API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP:
+        started = time.perf_counter()
+        await compute_executor.start()
+        startup_seconds["warmup"] = time.perf_counter() - started
+    ready = process_age()
+    if ready is not None:
+        startup_seconds["ready"] = ready
+    yield
+    compute_executor.shutdown()
+
+app = FastAPI(title="Beam Analysis API", version="1.0.0", lifespan=lifespan)
+# Every route reports its validate, handler and serialize stages to the request's timer
+app.router.route_class = TimedRoute
 
 # Enable CORS
 app.add_middleware(
@@ -21,8 +71,258 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+async def _session_problem(session_id: str) -> Optional[dict]:
+    """A session's beam and loads as a BeamProblem, which /api/analyze/batch accepts, for profiles"""
+    session = await session_manager.get_session(session_id)
+    if not session or not session.beam_properties:
+        return None
+    loads = {field: session.loads.records(kind) for kind, field in enumerate(KIND_FIELDS)}
+    return BeamProblem.model_validate({"beam_properties": session.beam_properties, **loads}).model_dump(mode="json")
+
+# Slow-request and on-demand profiling, configured by BEAM_PROFILE_*; when disabled nothing is
+# installed and compute tasks take the plain path
+profiler = create_profiler(problem=_session_problem)
+if profiler is not None:
+    compute_executor.profiler = profiler
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, executor=compute_executor)
+
+# Outermost, so that request durations include the other middleware
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(ExecutorError)
+async def executor_error_handler(request: Request, exc: ExecutorError):
+    """Busy (429) and timed out (504) calculations"""
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=exc.headers)
+
+async def _cached(cache, key: str, fn, *args):
+    """Cached value for key, running fn(*args) on the compute executor on a miss"""
+    value = cache.get(key)
+    if value is None:
+        with span("solve"):
+            value = await compute_executor.run(fn, *args)
+        cache.put(key, value)
+    return value
+
+def _session_key(session, **options) -> str:
+    """Analysis key of a session's current beam and loads"""
+    return analysis_key(session.beam_properties, *session.loads.rows(), **options)
+
+def _solver_args(problem) -> tuple:
+    """Positional arguments of solve_beam and friends for a session or BeamProblem"""
+    beam_props = problem.beam_properties
+    return (
+        *_load_lists(problem),
+        beam_props.support1, beam_props.support2, beam_props.length,
+        beam_props.modulus_of_elasticity, beam_props.second_moment_of_area
+    )
+
+def _support_list(beam_properties: BeamProperties) -> List[Tuple[float, str]]:
+    """Supports as (location, type) for solve_beam_fe"""
+    return [(support.location, support.type.value) for support in beam_properties.supports]
+
+def _fe_args(problem) -> tuple:
+    """Positional arguments of solve_beam_fe for a session or BeamProblem with a supports list"""
+    beam_props = problem.beam_properties
+    return (
+        *_load_lists(problem), _support_list(beam_props), beam_props.length,
+        beam_props.modulus_of_elasticity, beam_props.second_moment_of_area
+    )
+
+# Detail of analyses that only exist for a beam on support1 and support2
+TWO_SUPPORTS_REQUIRED = "This analysis requires a beam on support1 and support2 without a supports list"
+
+def _beam_properties_error(beam_properties: BeamProperties) -> Optional[str]:
+    """Validate support locations, returning an error message or None"""
+    if beam_properties.supports is not None:
+        # A supports list may include the far end, e.g. for fixed-end beams
+        if any(support.location > beam_properties.length for support in beam_properties.supports):
+            return "Support locations must be within beam length"
+        return supports_error(_support_list(beam_properties))
+    
+    if beam_properties.support1 >= beam_properties.length or beam_properties.support2 >= beam_properties.length:
+        return "Support locations must be within beam length"
+    
+    if beam_properties.support1 == beam_properties.support2:
+        return "Support locations must be different"
+    
+    return None
+
+def _load_error(load_data, beam_length: float) -> Optional[str]:
+    """Validate a load location/range against the beam length, returning an error message or None"""
+    if isinstance(load_data, (PointMoment, PointForce)):
+        if load_data.location >= beam_length:
+            return "Load location must be within beam length"
+    else:
+        if load_data.start_location >= beam_length or load_data.end_location > beam_length:
+            return "Load range must be within beam length"
+        if load_data.start_location >= load_data.end_location:
+            return "Start location must be less than end location"
+    
+    return None
+
+def _load_lists(problem):
+    """
+    Loads of a session or BeamProblem in the format expected by the calculation and visualization functions
+    A session's loads are the arrays of its load store, passed on without copying.
+    """
+    if isinstance(problem, BeamSession):
+        return problem.loads.rows()
+    f1 = [[m.magnitude, m.location] for m in problem.point_moments]
+    f2 = [[f.magnitude, f.location] for f in problem.point_forces]
+    f3 = [[p.magnitude, p.start_location, p.end_location] for p in problem.constant_force_profiles]
+    f4 = [[p.magnitude, p.start_location, p.end_location] for p in problem.triangular_force_profiles]
+    return f1, f2, f3, f4
+
+def _load_row(load) -> List[float]:
+    """A single load in the [magnitude, location] or [magnitude, start, end] calculation format"""
+    if isinstance(load, (PointMoment, PointForce)):
+        return [load.magnitude, load.location]
+    return [load.magnitude, load.start_location, load.end_location]
+
+# Position of each load type in the (f1, f2, f3, f4) calculation format
+LOAD_KINDS = {
+    LoadType.POINT_MOMENT: 0,
+    LoadType.POINT_FORCE: 1,
+    LoadType.CONSTANT_FORCE_PROFILE: 2,
+    LoadType.TRIANGULAR_FORCE_PROFILE: 3,
+}
+
+async def _load_responses(beam_props: BeamProperties, entries: List[Tuple[int, List[float]]]) -> List[BeamSolution]:
+    """
+    Response of each (kind, row) entry on its own, with rows in the calculation format
+    Each load's response is cached separately, so only loads not seen before are solved,
+    together in one batch.
+    """
+    singles = []
+    for kind, row in entries:
+        single = [[], [], [], []]
+        single[kind] = [row]
+        singles.append(single)
+    keys = [analysis_key(beam_props, *single, basis=True) for single in singles]
+    responses = [analysis_cache.get(key) for key in keys]
+    
+    missing = [index for index, response in enumerate(responses) if response is None]
+    if missing:
+        problems = [
+            (*singles[index],
+             beam_props.support1, beam_props.support2, beam_props.length,
+             beam_props.modulus_of_elasticity, beam_props.second_moment_of_area)
+            for index in missing
+        ]
+        with span("solve"):
+            solved = await compute_executor.run(solve_beam_batch, problems)
+        x = np.linspace(0, beam_props.length, DEFAULT_STATIONS)
+        for row, index in enumerate(missing):
+            response = BeamSolution(x, *(np.array(field[row]) for field in solved[1:]))
+            for array in response:
+                array.setflags(write=False)
+            analysis_cache.put(keys[index], response)
+            responses[index] = response
+    
+    return responses
+
+async def _load_basis(session) -> Tuple[BatchSolution, List[str]]:
+    """Response of every session load on its own (one row per load) and the load groups"""
+    beam_props = session.beam_properties
+    loads = session.loads.copy()
+    entries = [(kind, row) for kind, rows in enumerate(loads.rows()) for row in rows.tolist()]
+    responses = await _load_responses(beam_props, entries)
+    
+    def stack(field: str, width: int) -> np.ndarray:
+        rows = [getattr(response, field) for response in responses]
+        return np.stack(rows) if rows else np.empty((0, width))
+    
+    basis = BatchSolution(
+        np.full(len(entries), beam_props.length),
+        stack("shear_force", DEFAULT_STATIONS), stack("bending_moment", DEFAULT_STATIONS),
+        stack("slope", DEFAULT_STATIONS), stack("deflection", DEFAULT_STATIONS),
+        stack("reactions", 2)
+    )
+    return basis, loads.group_labels()
+
+async def _load_delta(session, load_lists) -> Optional[BeamSolution]:
+    """
+    Combined response of loads about to be added to or removed from a session, (f1, f2, f3, f4) rows
+    Solved before the session is changed, so a failed solve (busy, timed out) leaves the session as
+    it was. None when the session has no accumulated results to update. A single load's response
+    is cached on its own, so removing a load reuses the response solved when it was added.
+    """
+    beam_props = session.beam_properties
+    if session.accumulated_solution is None or beam_props is None or beam_props.supports is not None:
+        return None
+    count = sum(len(rows) for rows in load_lists)
+    if count == 1:
+        kind = next(kind for kind, rows in enumerate(load_lists) if len(rows))
+        return (await _load_responses(beam_props, [(kind, np.asarray(load_lists[kind], dtype=float)[0].tolist())]))[0]
+    with span("solve"):
+        return await compute_executor.run(
+            solve_beam, *load_lists,
+            beam_props.support1, beam_props.support2, beam_props.length,
+            beam_props.modulus_of_elasticity, beam_props.second_moment_of_area
+        )
+
+def _accumulate(session, before: str, beam_props: BeamProperties, delta: Optional[BeamSolution], sign: float = 1.0) -> None:
+    """
+    Bring a session's accumulated results up to date inside the update that edits its loads
+    before is the session's analysis key before the edit, and delta the response of the edited loads
+    on beam_props, from _load_delta. Unless the accumulated results are those of the loads before the
+    edit on that same beam, they are dropped and the next calculation solves in full.
+    """
+    accumulated = session.accumulated_solution
+    if accumulated is None:
+        return
+    if delta is None or session.accumulated_key != before or session.beam_properties != beam_props:
+        session.accumulated_solution = session.accumulated_key = None
+        return
+    # New arrays rather than in-place sums, so results already handed out don't change under their readers
+    session.accumulated_solution = BeamSolution(
+        accumulated.x, *(total + sign * change for total, change in zip(accumulated[1:], delta[1:]))
+    )
+    session.accumulated_key = _session_key(session)
+
+async def _session_solution(session, engine: Optional[str] = None) -> BeamSolution:
+    """
+    Results for a session's current loads with the default engine
+    Load edits are applied incrementally to the session's accumulated results, so the full
+    solve (through the analysis cache) only runs after beam properties change.
+    """
+    if session.beam_properties.supports is not None:
+        return (await _analyze_fe(session))[0]
+    
+    if engine not in (None, DEFAULT_ENGINE):
+        return await _analyze(session, engine)
+    
+    key = _session_key(session)
+    if session.accumulated_solution is None or session.accumulated_key != key:
+        solution = await _analyze(session)
+        # Loads edited while the solve was running are not in this solution, so it can't seed the session
+        if _session_key(session) != key:
+            return solution
+        session.accumulated_solution = BeamSolution(*(np.array(field) for field in solution))
+        session.accumulated_key = key
+    return session.accumulated_solution
+
+async def _analyze(session, engine: Optional[str] = None) -> BeamSolution:
+    """Solve the session's beam, reusing cached results for identical problems from any session"""
+    engine = engine or DEFAULT_ENGINE
+    key = _session_key(session, engine=engine)
+    return await _cached(analysis_cache, key, partial(solve_beam, engine=engine), *_solver_args(session))
+
+async def _analyze_fe(session) -> Tuple[BeamSolution, np.ndarray]:
+    """Solve the session's beam on its supports list, returning the solution and the reaction moments"""
+    key = _session_key(session, engine="fem")
+    return await _cached(analysis_cache, key, solve_beam_fe, *_fe_args(session))
+
+async def _analyze_adaptive(session, tolerance: float) -> Tuple[BeamSolution, dict]:
+    """Solve the session's beam on an adaptive grid, returning the solution and its exact peaks"""
+    key = _session_key(session, grid="adaptive", tolerance=tolerance)
+    return await _cached(
+        analysis_cache, key, partial(solve_beam_adaptive, tolerance=tolerance), *_solver_args(session)
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Beam Analysis API is running"}
@@ -30,23 +330,21 @@ async def root():
 @app.post("/api/session/create")
 async def create_session():
     """Create a new session"""
-    session_id = session_manager.create_session()
+    session_id = await session_manager.create_session()
     return {"session_id": session_id}
 
 @app.post("/api/session/{session_id}/beam-properties")
 async def set_beam_properties(session_id: str, beam_properties: BeamProperties):
     """Set beam properties for a session"""
-    if not session_manager.get_session(session_id):
+    if not await session_manager.get_session(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Validate support locations
-    if beam_properties.support1 >= beam_properties.length or beam_properties.support2 >= beam_properties.length:
-        raise HTTPException(status_code=400, detail="Support locations must be within beam length")
-    
-    if beam_properties.support1 == beam_properties.support2:
-        raise HTTPException(status_code=400, detail="Support locations must be different")
+    error = _beam_properties_error(beam_properties)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     
-    success = session_manager.update_beam_properties(session_id, beam_properties)
+    success = await session_manager.update_beam_properties(session_id, beam_properties)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -55,215 +353,762 @@ async def set_beam_properties(session_id: str, beam_properties: BeamProperties):
 @app.post("/api/session/{session_id}/loads/add")
 async def add_load(session_id: str, load_request: LoadRequest):
     """Add a load to the session"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    if not session.beam_properties:
-        raise HTTPException(status_code=400, detail="Beam properties must be set first")
-    
-    beam_length = session.beam_properties.length
-    
-    # Validate load location/range
-    if load_request.load_type == LoadType.POINT_MOMENT:
-        load_data = load_request.load_data
-        if load_data.location >= beam_length:
-            raise HTTPException(status_code=400, detail="Load location must be within beam length")
-        session.point_moments.append(load_data)
-    
-    elif load_request.load_type == LoadType.POINT_FORCE:
-        load_data = load_request.load_data
-        if load_data.location >= beam_length:
-            raise HTTPException(status_code=400, detail="Load location must be within beam length")
-        session.point_forces.append(load_data)
+    load_data = load_request.load_data
+    load_data.load_id = uuid.uuid4().hex
+    kind = LOAD_KINDS[load_request.load_type]
+    row = _load_row(load_data)
+    load_lists = [[], [], [], []]
+    load_lists[kind] = [row]
+    beam_props = session.beam_properties
+    delta = await _load_delta(session, load_lists)
     
-    elif load_request.load_type == LoadType.CONSTANT_FORCE_PROFILE:
-        load_data = load_request.load_data
-        if load_data.start_location >= beam_length or load_data.end_location > beam_length:
-            raise HTTPException(status_code=400, detail="Load range must be within beam length")
-        if load_data.start_location >= load_data.end_location:
-            raise HTTPException(status_code=400, detail="Start location must be less than end location")
-        session.constant_force_profiles.append(load_data)
+    def add(session: BeamSession) -> None:
+        if not session.beam_properties:
+            raise HTTPException(status_code=400, detail="Beam properties must be set first")
+        
+        # Validate load location/range
+        error = _load_error(load_data, session.beam_properties.length)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        
+        before = _session_key(session)
+        session.loads.add(kind, row, load_data.group, load_data.load_id)
+        _accumulate(session, before, beam_props, delta)
     
-    elif load_request.load_type == LoadType.TRIANGULAR_FORCE_PROFILE:
-        load_data = load_request.load_data
-        if load_data.start_location >= beam_length or load_data.end_location > beam_length:
-            raise HTTPException(status_code=400, detail="Load range must be within beam length")
-        if load_data.start_location >= load_data.end_location:
-            raise HTTPException(status_code=400, detail="Start location must be less than end location")
-        session.triangular_force_profiles.append(load_data)
+    if not await session_manager.update_session(session_id, add):
+        raise HTTPException(status_code=404, detail="Session not found")
     
-    return {"message": "Load added successfully"}
+    return {"message": "Load added successfully", "load_id": load_data.load_id}
 
 @app.get("/api/session/{session_id}/loads")
 async def get_loads(session_id: str):
     """Get all loads for a session"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    # Records are plain JSON types already, so they skip FastAPI's per-value encoding
+    return JSONResponse({field: session.loads.records(kind) for kind, field in enumerate(KIND_FIELDS)})
+
+def _load_format(request: Request, load_format: Optional[str]) -> str:
+    """Bulk load format from ?format= or the Content-Type header"""
+    if load_format is None:
+        content_type = request.headers.get("content-type", "")
+        load_format = next((name for name, media_type in LOAD_FORMATS.items() if media_type in content_type), None)
+    if load_format not in LOAD_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid load format. Use: {', '.join(LOAD_FORMATS)}")
+    return load_format
+
+@app.post("/api/session/{session_id}/loads/import")
+async def import_loads(
+    session_id: str,
+    request: Request,
+    load_format: Optional[str] = Query(None, alias="format", description="csv or ndjson; defaults to the Content-Type"),
+    strict: bool = Query(False, description="Import nothing if any row is rejected")
+):
+    """Append many loads from a CSV or NDJSON body in one step"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if not session.beam_properties:
+        raise HTTPException(status_code=400, detail="Beam properties must be set first")
+    
+    load_format = _load_format(request, load_format)
+    # The whole body is read before the session is changed: nothing may await inside the update
+    if int(request.headers.get("content-length") or 0) > MAX_IMPORT_BYTES:
+        raise HTTPException(status_code=413, detail=f"Load files are limited to {MAX_IMPORT_BYTES} bytes")
+    with span("validate"):
+        try:
+            table, parse_errors = await read_load_table(request.stream(), load_format, MAX_IMPORT_ROWS)
+        except LoadTableTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    def accept(beam: BeamProperties):
+        """Rows of the table accepted on this beam, their loads per type and the rejection summary"""
+        with span("validate"):
+            valid, range_errors = validate_load_table(table, beam.length)
+        errors = sorted(parse_errors + range_errors)
+        summary = {
+            "rejected": len(errors),
+            "errors": [{"line": line, "error": error} for line, error in errors[:100]],
+        }
+        if strict and errors:
+            raise HTTPException(status_code=400, detail={"message": "No loads imported", "imported": 0, **summary})
+        rows = np.flatnonzero(valid)
+        return rows, table_loads(table, rows), summary
+    
+    # The accepted loads are solved before the session changes, then merged in one step
+    beam_props = session.beam_properties
+    accepted = accept(beam_props)
+    rows, selections, _ = accepted
+    delta = None
+    if len(rows):
+        delta = await _load_delta(session, [values[np.argsort(values[:, 1], kind="stable")] for _, values in selections])
+    
+    def merge(session: BeamSession):
+        if not session.beam_properties:
+            raise HTTPException(status_code=400, detail="Beam properties must be set first")
+        
+        # Validated again only if the beam changed in the meantime
+        rows, selections, summary = accepted if session.beam_properties == beam_props else accept(session.beam_properties)
+        before = _session_key(session)
+        load_ids = np.array([uuid.uuid4().hex for _ in rows], dtype=object)
+        for kind, (selected, values) in enumerate(selections):
+            session.loads.extend(kind, values, [table.groups[index] for index in selected],
+                                 load_ids[np.searchsorted(rows, selected)])
+        if len(rows):
+            _accumulate(session, before, beam_props, delta)
+        return rows, load_ids, summary
+    
+    updated = await session_manager.update_session(session_id, merge)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Session not found")
+    rows, load_ids, summary = updated[1]
+    
     return {
-        "point_moments": session.point_moments,
-        "point_forces": session.point_forces,
-        "constant_force_profiles": session.constant_force_profiles,
-        "triangular_force_profiles": session.triangular_force_profiles
+        "message": f"Imported {len(rows)} loads",
+        "imported": len(rows),
+        "load_ids": load_ids.tolist(),
+        **summary,
     }
 
+@app.get("/api/session/{session_id}/loads/export")
+async def export_session_loads(
+    session_id: str,
+    load_format: str = Query("csv", alias="format", description="csv or ndjson")
+):
+    """Stream all loads of a session as CSV or NDJSON, in the format accepted by /loads/import"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if load_format not in LOAD_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid load format. Use: {', '.join(LOAD_FORMATS)}")
+    
+    return StreamingResponse(
+        export_loads(session, load_format), media_type=LOAD_FORMATS[load_format],
+        headers={"Content-Disposition": f'attachment; filename="loads.{load_format}"'}
+    )
+
 @app.delete("/api/session/{session_id}/loads/clear")
 async def clear_loads(session_id: str):
     """Clear all loads for a session"""
-    success = session_manager.clear_loads(session_id)
+    success = await session_manager.clear_loads(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
     
     return {"message": "All loads cleared successfully"}
 
+@app.delete("/api/session/{session_id}/loads/{load_id}")
+async def remove_load(session_id: str, load_id: str):
+    """Remove a single load by the ID returned when it was added"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # The load's response is found before the session changes, then subtracted as it is removed
+    removed = session.loads.copy().remove(load_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Load not found")
+    kind, row, _ = removed
+    load_lists = [[], [], [], []]
+    load_lists[kind] = [row.tolist()]
+    beam_props = session.beam_properties
+    delta = await _load_delta(session, load_lists)
+    
+    def remove(session: BeamSession) -> None:
+        before = _session_key(session)
+        if session.loads.remove(load_id) is None:
+            raise HTTPException(status_code=404, detail="Load not found")
+        _accumulate(session, before, beam_props, delta, -1.0)
+    
+    if not await session_manager.update_session(session_id, remove):
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return {"message": "Load removed successfully"}
+
 @app.post("/api/session/{session_id}/calculate")
-async def calculate_analysis(session_id: str):
+async def calculate_analysis(
+    session_id: str,
+    request: Request,
+    dtype: str = Query("float64", description="Binary responses only: float64 or float32"),
+    engine: Optional[str] = Query(None, description=f"Calculation engine: {', '.join(ENGINES)}"),
+    grid: str = Query("uniform", description="uniform (1001 stations) or adaptive"),
+    tolerance: float = Query(1e-3, gt=0, lt=1, description="Adaptive grid interpolation tolerance, relative to each peak")
+):
     """Perform structural analysis calculation"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     if not session.beam_properties:
         raise HTTPException(status_code=400, detail="Beam properties must be set first")
     
-    # Convert loads to the format expected by the calculation function
-    f1 = [[m.magnitude, m.location] for m in session.point_moments]
-    f2 = [[f.magnitude, f.location] for f in session.point_forces]
-    f3 = [[p.magnitude, p.start_location, p.end_location] for p in session.constant_force_profiles]
-    f4 = [[p.magnitude, p.start_location, p.end_location] for p in session.triangular_force_profiles]
+    if engine is not None and engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"Invalid engine. Use: {', '.join(ENGINES)}")
     
-    beam_props = session.beam_properties
+    if grid not in ("uniform", "adaptive"):
+        raise HTTPException(status_code=400, detail="Invalid grid. Use: uniform or adaptive")
+    
+    if grid == "adaptive" and engine not in (None, DEFAULT_ENGINE):
+        raise HTTPException(status_code=400, detail="The adaptive grid requires the vectorized engine")
+    
+    if dtype not in DTYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid dtype. Use: {', '.join(DTYPES)}")
+    
+    supported = session.beam_properties.supports is not None
+    if supported and (grid == "adaptive" or engine not in (None, DEFAULT_ENGINE)):
+        raise HTTPException(status_code=400, detail="A supports list is solved by the finite element engine on the uniform grid")
     
     try:
-        V, BM, slope, deflection, reaction_forces = calculate_structural_analysis(
-            f1, f2, f3, f4,
-            beam_props.support1, beam_props.support2, beam_props.length,
-            beam_props.modulus_of_elasticity, beam_props.second_moment_of_area
-        )
-        
-        # Create x-coordinates
-        x_coordinates = np.linspace(0, beam_props.length, len(V)).tolist()
+        peaks = reaction_moments = None
+        if grid == "adaptive":
+            solution, peaks = await _analyze_adaptive(session, tolerance)
+        elif supported:
+            solution, reaction_moments = await _analyze_fe(session)
+        else:
+            solution = await _session_solution(session, engine)
         
-        # Calculate maximum values
-        max_shear_force = max(map(abs, V)) if V else 0
-        max_bending_moment = max(map(abs, BM)) if BM else 0
-        max_deflection = max(map(abs, deflection)) if deflection else 0
-        max_slope = max(map(abs, slope)) if slope else 0
+        # Packed columns straight from the arrays when the client asks for binary
+        if BINARY_MEDIA_TYPE in request.headers.get("accept", ""):
+            with span("encode"):
+                return Response(
+                    content=pack_analysis_results(solution, peaks, dtype, reaction_moments), media_type=BINARY_MEDIA_TYPE
+                )
         
-        # Extract reaction forces from the returned reaction_forces list
-        reactions = [rf[0] for rf in reaction_forces] if reaction_forces else [0, 0]
+        with span("serialize"):
+            return AnalysisResults(
+                shear_force=solution.shear_force.tolist(),
+                bending_moment=solution.bending_moment.tolist(),
+                slope=solution.slope.tolist(),
+                deflection=solution.deflection.tolist(),
+                x_coordinates=solution.x.tolist(),
+                max_shear_force=float(np.abs(solution.shear_force).max()),
+                max_bending_moment=float(np.abs(solution.bending_moment).max()),
+                max_deflection=float(np.abs(solution.deflection).max()),
+                max_slope=float(np.abs(solution.slope).max()),
+                reaction_forces=solution.reactions.tolist(),
+                reaction_moments=None if reaction_moments is None else reaction_moments.tolist(),
+                peaks={
+                    field: Peak(location=location, value=value) for field, (location, value) in peaks.items()
+                } if peaks else None
+            )
+    
+    except ExecutorError:
+        raise
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
+
+# Most stations a streamed calculation may request
+MAX_STREAM_STATIONS = 10_000_001
+
+@app.post("/api/session/{session_id}/calculate/stream")
+async def stream_analysis(
+    session_id: str,
+    stations: int = Query(100001, ge=2, le=MAX_STREAM_STATIONS, description="Evenly spaced stations from 0 to length"),
+    chunk: int = Query(STREAM_CHUNK_STATIONS, ge=1, le=65536, description="Stations per streamed record"),
+    stream_format: str = Query("ndjson", alias="format", description=f"Stream format: {', '.join(STREAM_FORMATS)}"),
+    dtype: str = Query("float64", description="Binary streams only: float64 or float32")
+):
+    """Stream exact results on a fine station grid, chunk by chunk as they are computed"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if not session.beam_properties:
+        raise HTTPException(status_code=400, detail="Beam properties must be set first")
+    
+    if session.beam_properties.supports is not None:
+        raise HTTPException(status_code=400, detail=TWO_SUPPORTS_REQUIRED)
+    
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid stream format. Use: {', '.join(STREAM_FORMATS)}")
+    
+    if dtype not in DTYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid dtype. Use: {', '.join(DTYPES)}")
+    
+    # The loads are captured now; chunks are computed lazily while the response is sent, in a
+    # worker thread, so memory stays bounded by the chunk size
+    chunks = solve_beam_chunks(*_solver_args(session), stations=stations, chunk=chunk)
+    return StreamingResponse(stream_results(chunks, stations, stream_format, dtype), media_type=STREAM_FORMATS[stream_format])
+
+# Plot type -> (solution field, title, y-axis label)
+PLOT_TYPES = {
+    "shear": ("shear_force", "Shear Force Diagram", "Shear Force (N)"),
+    "moment": ("bending_moment", "Bending Moment Diagram", "Bending Moment (N⋅m)"),
+    "slope": ("slope", "Slope Diagram", "Slope (rad)"),
+    "deflection": ("deflection", "Deflection Diagram", "Deflection (m)"),
+}
+
+# Layouts of the combined /plots endpoint
+PLOT_LAYOUTS = ("separate", "stacked")
+PLOT_XLABEL = "Beam Length (m)"
+
+def _plot_key(session, plot_type: str, renderer: str) -> str:
+    """Image cache key of one diagram, shared by /plot/{plot_type} and /plots"""
+    return _session_key(session, image="plot", plot_type=plot_type, engine=DEFAULT_ENGINE, renderer=renderer)
+
+# Raw image formats by ?format= value
+IMAGE_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+def _raw_image_format(request: Request, image_format: Optional[str], formats: Tuple[str, ...] = ("png",)) -> Optional[str]:
+    """
+    Raw image format named by ?format= or the Accept header, among the formats an endpoint serves
+    None means the default JSON response with a PNG data URL.
+    """
+    if image_format is not None:
+        return image_format if image_format in formats else None
+    accept = request.headers.get("accept", "")
+    return next((name for name in formats if IMAGE_MEDIA_TYPES[name] in accept), None)
+
+async def _image_response(request: Request, key: str, render, image_format: Optional[str]) -> Response:
+    """Serve a cached image, revalidating raw image requests against its ETag; render() is awaited on a miss"""
+    tag = etag(key)
+    if image_format and etag_matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers={"ETag": tag})
+    
+    image = image_cache.get(key)
+    if image is None:
+        with span("render"):
+            image = await render()
+        image_cache.put(key, image)
+    if image_format:
+        return Response(
+            content=image, media_type=IMAGE_MEDIA_TYPES[image_format],
+            headers={"ETag": tag, "Cache-Control": "no-cache"}
+        )
+    with span("encode"):
+        return JSONResponse({"image": png_data_url(image)})
+
+@app.post("/api/session/{session_id}/combinations", response_model=CombinationResults)
+async def combine_loads(session_id: str, combination_request: CombinationRequest):
+    """Evaluate factored load combinations by superposing cached per-load responses"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if not session.beam_properties:
+        raise HTTPException(status_code=400, detail="Beam properties must be set first")
+    
+    if session.beam_properties.supports is not None:
+        raise HTTPException(status_code=400, detail=TWO_SUPPORTS_REQUIRED)
+    
+    combinations = combination_request.combinations
+    
+    try:
+        basis, groups = await _load_basis(session)
+        factors = np.array(
+            [[combination.factors.get(group, 0.0) for group in groups] for combination in combinations]
+        ).reshape(len(combinations), len(groups))
+        with span("solve"):
+            combined, bounds = await compute_executor.run(combination_envelope, basis, factors)
+        fields = BatchSolution._fields[1:5]
         
-        return AnalysisResults(
-            shear_force=V,
-            bending_moment=BM,
-            slope=slope,
-            deflection=deflection,
-            x_coordinates=x_coordinates,
-            max_shear_force=max_shear_force,
-            max_bending_moment=max_bending_moment,
-            max_deflection=max_deflection,
-            max_slope=max_slope,
-            reaction_forces=reactions
+        return CombinationResults(
+            combinations=[combination.name for combination in combinations],
+            x_coordinates=np.linspace(0, session.beam_properties.length, DEFAULT_STATIONS).tolist(),
+            max_shear_force=np.abs(combined.shear_force).max(axis=1).tolist(),
+            max_bending_moment=np.abs(combined.bending_moment).max(axis=1).tolist(),
+            max_deflection=np.abs(combined.deflection).max(axis=1).tolist(),
+            max_slope=np.abs(combined.slope).max(axis=1).tolist(),
+            reaction_forces=combined.reactions.tolist(),
+            envelope={
+                field: DiagramEnvelope(max=bounds[field][0].tolist(), min=bounds[field][1].tolist())
+                for field in fields
+            },
+            diagrams={
+                field: getattr(combined, field).tolist() for field in fields
+            } if combination_request.include_diagrams else None
         )
     
+    except ExecutorError:
+        raise
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
+
+async def _beam_session(session_id: str):
+    """Session with beam properties set, or the matching HTTPException"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if not session.beam_properties:
+        raise HTTPException(status_code=400, detail="Beam properties must be set first")
+
+    return session
+
+def _sections_error(sections: List[float], beam_length: float) -> Optional[str]:
+    """Validate section locations against the beam length, returning an error message or None"""
+    if any(section < 0 or section > beam_length for section in sections):
+        return "Sections must be within beam length"
+
+    return None
+
+@app.post("/api/session/{session_id}/influence-lines", response_model=InfluenceLineResults)
+async def get_influence_lines(session_id: str, influence_request: InfluenceLineRequest):
+    """Unit-load influence lines of the reactions and of shear and moment at the given sections"""
+    session = await _beam_session(session_id)
+    beam_props = session.beam_properties
+    if beam_props.supports is not None:
+        raise HTTPException(status_code=400, detail=TWO_SUPPORTS_REQUIRED)
+    error = _sections_error(influence_request.sections, beam_props.length)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    try:
+        with span("solve"):
+            lines = await compute_executor.run(
+                influence_lines, beam_props.support1, beam_props.support2, influence_request.sections,
+                np.linspace(0, beam_props.length, influence_request.stations)
+            )
+
+        with span("serialize"):
+            return InfluenceLineResults(
+                sections=influence_request.sections,
+                positions=lines.positions.tolist(),
+                reaction_forces=lines.reactions.tolist(),
+                shear_force=lines.shear_force.tolist(),
+                bending_moment=lines.bending_moment.tolist()
+            )
+
+    except ExecutorError:
+        raise
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
+
+@app.post("/api/session/{session_id}/moving-load", response_model=MovingLoadResults)
+async def analyze_moving_load(session_id: str, moving_load: MovingLoadRequest):
+    """Roll an axle train across the beam and report the governing effects and lead axle positions"""
+    session = await _beam_session(session_id)
+    beam_props = session.beam_properties
+    if beam_props.supports is not None:
+        raise HTTPException(status_code=400, detail=TWO_SUPPORTS_REQUIRED)
+    sections = moving_load.sections
+    if sections is None:
+        sections = np.linspace(0, beam_props.length, DEFAULT_MOVING_LOAD_SECTIONS).tolist()
+    error = _sections_error(sections, beam_props.length)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    try:
+        with span("solve"):
+            sweep = await compute_executor.run(
+                moving_load_sweep, beam_props.support1, beam_props.support2, beam_props.length, sections,
+                [axle.magnitude for axle in moving_load.axles], [axle.offset for axle in moving_load.axles],
+                moving_load.positions
+            )
+        fields = {"reaction_forces": "reactions", "shear_force": "shear_force", "bending_moment": "bending_moment"}
+        governing = governing_effects(sweep)
+        bounds = {}
+        for name, field in fields.items():
+            upper, upper_at, lower, lower_at = governing[field]
+            bounds[name] = GoverningEffect(
+                max=upper.tolist(), max_position=upper_at.tolist(), min=lower.tolist(), min_position=lower_at.tolist()
+            )
+
+        return MovingLoadResults(
+            sections=sections,
+            envelope=bounds,
+            lead_positions=sweep.lead_positions.tolist() if moving_load.include_history else None,
+            history={
+                name: getattr(sweep, field).tolist() for name, field in fields.items()
+            } if moving_load.include_history else None
+        )
+
+    except ExecutorError:
+        raise
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
 
 @app.get("/api/session/{session_id}/beam-image")
-async def get_beam_image(session_id: str):
+async def get_beam_image(
+    session_id: str,
+    request: Request,
+    image_format: Optional[str] = Query(None, alias="format", description="png or svg for a raw image response")
+):
     """Generate and return beam schematic image"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     if not session.beam_properties:
         raise HTTPException(status_code=400, detail="Beam properties must be set first")
     
-    # Convert loads to the format expected by the visualization function
-    f1 = [[m.magnitude, m.location] for m in session.point_moments]
-    f2 = [[f.magnitude, f.location] for f in session.point_forces]
-    f3 = [[p.magnitude, p.start_location, p.end_location] for p in session.constant_force_profiles]
-    f4 = [[p.magnitude, p.start_location, p.end_location] for p in session.triangular_force_profiles]
-    
     beam_props = session.beam_properties
+    raw_format = _raw_image_format(request, image_format, ("png", "svg"))
+    key = _session_key(session, image="beam-svg" if raw_format == "svg" else "beam")
+    
+    async def render() -> bytes:
+        f1, f2, f3, f4 = _load_lists(session)
+        supports = None if beam_props.supports is None else [support.location for support in beam_props.supports]
+        args = (beam_props.length, beam_props.support1, beam_props.support2, f1, f2, f3, f4, supports)
+        if raw_format == "svg":
+            # Microseconds of string building; cheaper inline than a trip to a worker process
+            return render_beam_svg(*args).encode()
+        return await compute_executor.run(render_beam_png, *args)
     
     try:
-        image_base64 = draw_beam(
-            beam_props.length, beam_props.support1, beam_props.support2,
-            f1, f2, f3, f4
-        )
-        return {"image": image_base64}
+        return await _image_response(request, key, render, raw_format)
+    
+    except ExecutorError:
+        raise
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image generation error: {str(e)}")
 
 @app.get("/api/session/{session_id}/plot/{plot_type}")
-async def get_engineering_plot(session_id: str, plot_type: str):
+async def get_engineering_plot(
+    session_id: str,
+    plot_type: str,
+    request: Request,
+    image_format: Optional[str] = Query(None, alias="format", description="png for a raw image/png response"),
+    renderer: str = Query(DEFAULT_PLOT_RENDERER, description=f"Plot renderer: {', '.join(PLOT_RENDERERS)}")
+):
     """Generate engineering diagram plots"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     if not session.beam_properties:
         raise HTTPException(status_code=400, detail="Beam properties must be set first")
     
-    # First calculate the analysis
-    f1 = [[m.magnitude, m.location] for m in session.point_moments]
-    f2 = [[f.magnitude, f.location] for f in session.point_forces]
-    f3 = [[p.magnitude, p.start_location, p.end_location] for p in session.constant_force_profiles]
-    f4 = [[p.magnitude, p.start_location, p.end_location] for p in session.triangular_force_profiles]
+    if plot_type not in PLOT_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid plot type. Use: shear, moment, slope, or deflection")
+    
+    if renderer not in PLOT_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"Invalid renderer. Use: {', '.join(PLOT_RENDERERS)}")
     
     beam_props = session.beam_properties
+    field, title, ylabel = PLOT_TYPES[plot_type]
+    key = _plot_key(session, plot_type, renderer)
     
-    try:
-        V, BM, slope, deflection, _ = calculate_structural_analysis(
-            f1, f2, f3, f4,
-            beam_props.support1, beam_props.support2, beam_props.length,
-            beam_props.modulus_of_elasticity, beam_props.second_moment_of_area
+    async def render() -> bytes:
+        # Reuses the arrays from /calculate when the problem has already been solved
+        solution = await _session_solution(session)
+        return await compute_executor.run(
+            PLOT_RENDERERS[renderer],
+            solution.x, getattr(solution, field), title, PLOT_XLABEL, ylabel,
+            beam_props.support1, beam_props.support2
         )
+    
+    try:
+        return await _image_response(request, key, render, _raw_image_format(request, image_format))
+    
+    except ExecutorError:
+        raise
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Plot generation error: {str(e)}")
+
+@app.get("/api/session/{session_id}/plots")
+async def get_engineering_plots(
+    session_id: str,
+    request: Request,
+    layout: str = Query("separate", description="separate (one image per diagram) or stacked (one image, shared x axis)"),
+    image_format: Optional[str] = Query(None, alias="format", description="png for a raw image/png response (stacked layout)"),
+    renderer: str = Query(DEFAULT_PLOT_RENDERER, description=f"Plot renderer: {', '.join(PLOT_RENDERERS)}")
+):
+    """Generate all four engineering diagrams and their maxima from one solve"""
+    session = await session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if not session.beam_properties:
+        raise HTTPException(status_code=400, detail="Beam properties must be set first")
+    
+    if layout not in PLOT_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"Invalid layout. Use: {', '.join(PLOT_LAYOUTS)}")
+    
+    if renderer not in PLOT_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"Invalid renderer. Use: {', '.join(PLOT_RENDERERS)}")
+    
+    raw_format = _raw_image_format(request, image_format)
+    if raw_format and layout != "stacked":
+        raise HTTPException(status_code=400, detail="Raw PNG responses need layout=stacked")
+    
+    beam_props = session.beam_properties
+    
+    try:
+        solution = await _session_solution(session)
+        panels = {
+            plot_type: (getattr(solution, field), title, ylabel)
+            for plot_type, (field, title, ylabel) in PLOT_TYPES.items()
+        }
         
-        x_coordinates = np.linspace(0, beam_props.length, len(V)).tolist()
+        if layout == "stacked":
+            key = _session_key(session, image="plots", engine=DEFAULT_ENGINE, renderer=renderer)
+            
+            async def render() -> bytes:
+                return await compute_executor.run(
+                    PANEL_RENDERERS[renderer], solution.x, list(panels.values()), PLOT_XLABEL,
+                    beam_props.support1, beam_props.support2
+                )
+            
+            if raw_format:
+                return await _image_response(request, key, render, raw_format)
+            png = image_cache.get(key)
+            if png is None:
+                with span("render"):
+                    png = await render()
+                image_cache.put(key, png)
+            with span("encode"):
+                images = {"image": png_data_url(png)}
         
-        # Generate the requested plot
-        if plot_type == "shear":
-            image_base64 = create_engineering_plot(
-                x_coordinates, V, "Shear Force Diagram", "Beam Length (m)", "Shear Force (N)",
-                beam_props.support1, beam_props.support2
-            )
-        elif plot_type == "moment":
-            image_base64 = create_engineering_plot(
-                x_coordinates, BM, "Bending Moment Diagram", "Beam Length (m)", "Bending Moment (N⋅m)",
-                beam_props.support1, beam_props.support2
-            )
-        elif plot_type == "slope":
-            image_base64 = create_engineering_plot(
-                x_coordinates, slope, "Slope Diagram", "Beam Length (m)", "Slope (rad)",
-                beam_props.support1, beam_props.support2
-            )
-        elif plot_type == "deflection":
-            image_base64 = create_engineering_plot(
-                x_coordinates, deflection, "Deflection Diagram", "Beam Length (m)", "Deflection (m)",
-                beam_props.support1, beam_props.support2
-            )
         else:
-            raise HTTPException(status_code=400, detail="Invalid plot type. Use: shear, moment, slope, or deflection")
+            # Diagrams already rendered by /plot/{plot_type} are reused; the rest render in one task
+            keys = {plot_type: _plot_key(session, plot_type, renderer) for plot_type in panels}
+            pngs = {plot_type: image_cache.get(key) for plot_type, key in keys.items()}
+            missing = [plot_type for plot_type, png in pngs.items() if png is None]
+            if missing:
+                with span("render"):
+                    rendered = await compute_executor.run(
+                        render_plots, renderer, solution.x, [panels[plot_type] for plot_type in missing],
+                        PLOT_XLABEL, beam_props.support1, beam_props.support2
+                    )
+                for plot_type, png in zip(missing, rendered):
+                    image_cache.put(keys[plot_type], png)
+                    pngs[plot_type] = png
+            with span("encode"):
+                images = {"images": {plot_type: png_data_url(png) for plot_type, png in pngs.items()}}
         
-        return {"image": image_base64}
+        return DiagramSet(
+            **images,
+            max_shear_force=float(np.abs(solution.shear_force).max()),
+            max_bending_moment=float(np.abs(solution.bending_moment).max()),
+            max_deflection=float(np.abs(solution.deflection).max()),
+            max_slope=float(np.abs(solution.slope).max()),
+            reaction_forces=solution.reactions.tolist()
+        )
+    
+    except ExecutorError:
+        raise
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Plot generation error: {str(e)}")
 
+@app.post("/api/analyze/batch", response_model=BatchAnalysisResults)
+async def analyze_batch(
+    batch: BatchAnalysisRequest,
+    request: Request,
+    dtype: str = Query("float64", description="Binary responses only: float64 or float32")
+):
+    """Solve many complete beam problems in one stateless request"""
+    if dtype not in DTYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid dtype. Use: {', '.join(DTYPES)}")
+    
+    problems = []
+    for index, problem in enumerate(batch.problems):
+        beam_props = problem.beam_properties
+        loads = (problem.point_moments + problem.point_forces
+                 + problem.constant_force_profiles + problem.triangular_force_profiles)
+        errors = [TWO_SUPPORTS_REQUIRED if beam_props.supports is not None else _beam_properties_error(beam_props)]
+        errors += [_load_error(load, beam_props.length) for load in loads]
+        error = next((error for error in errors if error), None)
+        if error:
+            raise HTTPException(status_code=400, detail=f"Problem {index}: {error}")
+        
+        problems.append(_solver_args(problem))
+    
+    try:
+        with span("solve"):
+            solution = await compute_executor.run(solve_beam_batch, problems, batch.stations)
+        
+        if BINARY_MEDIA_TYPE in request.headers.get("accept", ""):
+            with span("encode"):
+                return Response(
+                    content=pack_batch_results(solution, batch.stations, dtype), media_type=BINARY_MEDIA_TYPE
+                )
+        
+        with span("serialize"):
+            return BatchAnalysisResults(
+                stations=batch.stations,
+                lengths=solution.lengths.tolist(),
+                shear_force=solution.shear_force.tolist(),
+                bending_moment=solution.bending_moment.tolist(),
+                slope=solution.slope.tolist(),
+                deflection=solution.deflection.tolist(),
+                max_shear_force=np.abs(solution.shear_force).max(axis=1).tolist(),
+                max_bending_moment=np.abs(solution.bending_moment).max(axis=1).tolist(),
+                max_deflection=np.abs(solution.deflection).max(axis=1).tolist(),
+                max_slope=np.abs(solution.slope).max(axis=1).tolist(),
+                reaction_forces=solution.reactions.tolist()
+            )
+    
+    except ExecutorError:
+        raise
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Counters of the result caches, the compute executor's queue and the session store"""
+    return {
+        "analysis": analysis_cache.stats(),
+        "images": image_cache.stats(),
+        "executor": compute_executor.stats(),
+        "sessions": await session_manager.stats(),
+    }
+
+async def _metric_families():
+    """Gauges and counters for /metrics, from the session store, the result caches and the executor"""
+    sessions = await session_manager.stats()
+    caches = {"analysis": analysis_cache.stats(), "images": image_cache.stats()}
+    executor = compute_executor.stats()
+    
+    def per_cache(field: str):
+        return [({"cache": name}, stats[field]) for name, stats in caches.items()]
+    
+    return [
+        ("beam_sessions_active", "gauge", "Sessions in the session store", [({}, sessions["sessions"])]),
+        ("beam_sessions_expired_total", "counter", "Sessions expired after their idle TTL", [({}, sessions["expired"])]),
+        ("beam_sessions_evicted_total", "counter", "Sessions evicted beyond the session limit", [({}, sessions["evicted"])]),
+        ("beam_cache_entries", "gauge", "Entries in each result cache", per_cache("entries")),
+        ("beam_cache_bytes", "gauge", "Bytes held by each result cache", per_cache("bytes")),
+        ("beam_cache_max_bytes", "gauge", "Byte limit of each result cache", per_cache("max_bytes")),
+        ("beam_cache_hits_total", "counter", "Result cache hits", per_cache("hits")),
+        ("beam_cache_misses_total", "counter", "Result cache misses", per_cache("misses")),
+        ("beam_cache_evictions_total", "counter", "Result cache evictions", per_cache("evictions")),
+        ("beam_executor_workers", "gauge", "Compute worker processes", [({}, executor["workers"])]),
+        ("beam_executor_queue_depth", "gauge", "Compute tasks queued or running", [({}, executor["pending"])]),
+        ("beam_executor_max_pending", "gauge", "Compute tasks allowed before requests get 429", [({}, executor["max_pending"])]),
+        ("beam_executor_completed_total", "counter", "Compute tasks completed", [({}, executor["completed"])]),
+        ("beam_executor_rejected_total", "counter", "Compute tasks rejected with 429", [({}, executor["rejected"])]),
+        ("beam_executor_timeouts_total", "counter", "Compute tasks that timed out with 504", [({}, executor["timeouts"])]),
+        ("beam_startup_seconds", "gauge", "Startup of this server process by phase: import, warmup and ready",
+         [({"phase": phase}, seconds) for phase, seconds in startup_seconds.items()]),
+    ]
+
+@app.get("/metrics")
+async def get_metrics():
+    """Request and stage timing histograms, sessions, caches and the executor queue in Prometheus text format"""
+    return Response(content=render_metrics(await _metric_families()), media_type=METRICS_MEDIA_TYPE)
+
 @app.delete("/api/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete a session"""
-    success = session_manager.delete_session(session_id)
+    success = await session_manager.delete_session(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
     
     return {"message": "Session deleted successfully"}
 
+# Everything above, plus the interpreter and server start, is the import phase of startup
+_imported = process_age()
+if _imported is not None:
+    startup_seconds["import"] = _imported
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
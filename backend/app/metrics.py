@@ -0,0 +1,226 @@
+import asyncio
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4"  # Starlette adds the charset
+
+# Request header that asks for a Server-Timing header on the response
+SERVER_TIMING_REQUEST_HEADER = b"x-server-timing"
+
+# Endpoint label of requests that matched no route
+UNMATCHED = "unmatched"
+
+# A metric family for render_metrics: (name, type, help, [(labels, value), ...])
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+class Histogram:
+    """Prometheus-style histogram with one series per tuple of label values"""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def series(self) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        """Per label tuple: (cumulative count for each bucket and +Inf, sum)"""
+        with self._lock:
+            snapshot = {labels: (list(counts), total[0]) for labels, (counts, total) in self._series.items()}
+        return {
+            labels: ([sum(counts[:i + 1]) for i in range(len(counts))], total)
+            for labels, (counts, total) in snapshot.items()
+        }
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        for labels, (cumulative, total) in sorted(self.series().items()):
+            base = _labels(self.label_names, labels)
+            for bound, count in zip(bounds, cumulative):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:.9g}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative[-1]}")
+        return lines
+
+request_duration = Histogram(
+    "beam_request_duration_seconds", "Time from request arrival to the end of the response",
+    ("endpoint", "method", "status")
+)
+stage_duration = Histogram(
+    "beam_stage_duration_seconds",
+    "Time per request in each stage: validate (parsing and request model validation), handler (endpoint "
+    "code outside other stages), solve, render, encode (PNG data URLs, packed binary) and serialize "
+    "(response models and JSON)",
+    ("endpoint", "stage")
+)
+
+# Startup of this server process in seconds, by phase, for beam_startup_seconds: import (from
+# process start until the app module is imported), warmup (starting and warming the compute
+# workers) and ready (from process start until the app serves requests)
+startup_seconds: Dict[str, float] = {}
+
+def process_age() -> Optional[float]:
+    """Seconds since this process started, from /proc on Linux, or None where that is not available"""
+    try:
+        with open("/proc/self/stat") as file:
+            started = int(file.read().rsplit(")", 1)[1].split()[19])  # starttime, field 22, in clock ticks
+        with open("/proc/uptime") as file:
+            uptime = float(file.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - started / os.sysconf("SC_CLK_TCK")
+
+class RequestTimer:
+    """Stage durations of one request; a span nested in another only counts toward its own stage"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.endpoint = UNMATCHED
+        self.stages: Dict[str, float] = {}
+        self.returned: Optional[float] = None  # When the endpoint function returned
+        self._children: List[float] = []
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(stage, elapsed - self._children.pop())
+            if self._children:
+                self._children[-1] += elapsed
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, in milliseconds, with the total so far"""
+        entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+
+def current_timer() -> Optional[RequestTimer]:
+    """Timer of the request being handled, None outside MetricsMiddleware"""
+    return _current_timer.get()
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Count the time spent in the block toward a stage of the current request"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.span(stage):
+        yield
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that splits a request into validate, handler and serialize stages
+    validate ends when the endpoint function is called, after FastAPI has parsed and validated the
+    request; serialize runs from the endpoint's return until the response is built.
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(**kwargs):
+                timer = _current_timer.get()
+                if timer is None:
+                    return await call(**kwargs)
+                timer.add("validate", time.perf_counter() - timer.start)
+                with timer.span("handler"):
+                    result = await call(**kwargs)
+                timer.returned = time.perf_counter()
+                return result
+
+            self.dependant.call = timed_call
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def timed_handler(request):
+            timer = _current_timer.get()
+            if timer is not None:
+                timer.endpoint = path
+            response = await handler(request)
+            if timer is not None and timer.returned is not None:
+                timer.add("serialize", time.perf_counter() - timer.returned)
+            return response
+
+        return timed_handler
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request into request_duration and stage_duration
+    A request with an X-Server-Timing header gets its stage breakdown back in a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        wants_header = any(name == SERVER_TIMING_REQUEST_HEADER for name, _ in scope["headers"])
+        status = 500
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if wants_header:
+                    headers = list(message.get("headers", [])) + [(b"server-timing", timer.server_timing().encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _current_timer.reset(token)
+            request_duration.observe((timer.endpoint, scope["method"], str(status)), time.perf_counter() - timer.start)
+            for stage, seconds in timer.stages.items():
+                stage_duration.observe((timer.endpoint, stage), seconds)
+
+def render_metrics(families: List[MetricFamily]) -> str:
+    """Prometheus text exposition of the timing histograms followed by the given families"""
+    lines = request_duration.expose() + stage_duration.expose()
+    for name, kind, description, samples in families:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        for labels, value in samples:
+            label_text = f"{{{_labels(labels.keys(), labels.values())}}}" if labels else ""
+            lines.append(f"{name}{label_text} {value}")
+    return "\n".join(lines) + "\n"
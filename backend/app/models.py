@@ -1,7 +1,14 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Union
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import Any, Dict, List, Optional, Union
 from enum import Enum
 
+from .calculations import DEFAULT_STATIONS
+from .load_store import KIND_FIELDS, LoadStore
+
+# Most values one effect of a response may hold (rows × stations), 16 MB as float64. Bounds the
+# arrays a worker allocates and the size of the JSON response.
+MAX_RESULT_VALUES = 2_000_000
+
 class LoadType(str, Enum):
     POINT_MOMENT = "Point Moment"
     POINT_FORCE = "Point Force"
@@ -11,27 +18,59 @@ class LoadType(str, Enum):
 class PointMoment(BaseModel):
     magnitude: float = Field(..., description="Moment magnitude in N-m")
     location: float = Field(..., ge=0, description="Location along beam in meters")
+    group: str = Field(default="default", description="Load group used by load combinations, e.g. D or L")
+    load_id: Optional[str] = Field(default=None, description="Assigned by the server when the load is added")
 
 class PointForce(BaseModel):
     magnitude: float = Field(..., description="Force magnitude in N")
     location: float = Field(..., ge=0, description="Location along beam in meters")
+    group: str = Field(default="default", description="Load group used by load combinations, e.g. D or L")
+    load_id: Optional[str] = Field(default=None, description="Assigned by the server when the load is added")
 
 class ConstantForceProfile(BaseModel):
     magnitude: float = Field(..., description="Distributed load magnitude in N/m")
     start_location: float = Field(..., ge=0, description="Start location in meters")
     end_location: float = Field(..., ge=0, description="End location in meters")
+    group: str = Field(default="default", description="Load group used by load combinations, e.g. D or L")
+    load_id: Optional[str] = Field(default=None, description="Assigned by the server when the load is added")
 
 class TriangularForceProfile(BaseModel):
     magnitude: float = Field(..., description="Peak load magnitude in N")
     start_location: float = Field(..., ge=0, description="Start location in meters")
     end_location: float = Field(..., ge=0, description="End location in meters")
+    group: str = Field(default="default", description="Load group used by load combinations, e.g. D or L")
+    load_id: Optional[str] = Field(default=None, description="Assigned by the server when the load is added")
+
+class SupportType(str, Enum):
+    PINNED = "pinned"
+    ROLLER = "roller"
+    FIXED = "fixed"
+
+class Support(BaseModel):
+    location: float = Field(..., ge=0, description="Support location in meters")
+    type: SupportType = Field(default=SupportType.PINNED, description="pinned and roller restrain deflection, fixed also restrains slope")
 
 class BeamProperties(BaseModel):
     length: float = Field(..., gt=0, description="Beam length in meters")
-    support1: float = Field(..., ge=0, description="First support location in meters")
-    support2: float = Field(..., ge=0, description="Second support location in meters")
+    support1: Optional[float] = Field(default=None, ge=0, description="First support location in meters")
+    support2: Optional[float] = Field(default=None, ge=0, description="Second support location in meters")
+    supports: Optional[List[Support]] = Field(
+        default=None, min_length=1, max_length=10000,
+        description="Any number of supports, solved with the finite element engine; replaces support1 and support2"
+    )
     modulus_of_elasticity: float = Field(default=1.0, gt=0, description="Modulus of elasticity in Pa")
     second_moment_of_area: float = Field(default=1.0, gt=0, description="Second moment of area in m^4")
+    
+    @model_validator(mode="after")
+    def _support_list(self) -> "BeamProperties":
+        # With a supports list, support1 and support2 become its first and last support (for the schematic and plots)
+        if self.supports is None:
+            if self.support1 is None or self.support2 is None:
+                raise ValueError("Set support1 and support2, or a supports list")
+        else:
+            self.supports = sorted(self.supports, key=lambda support: support.location)
+            self.support1, self.support2 = self.supports[0].location, self.supports[-1].location
+        return self
 
 class LoadRequest(BaseModel):
     load_type: LoadType
@@ -40,10 +79,41 @@ class LoadRequest(BaseModel):
 class BeamSession(BaseModel):
     session_id: str
     beam_properties: Optional[BeamProperties] = None
-    point_moments: List[PointMoment] = []
-    point_forces: List[PointForce] = []
-    constant_force_profiles: List[ConstantForceProfile] = []
-    triangular_force_profiles: List[TriangularForceProfile] = []
+    loads: LoadStore = Field(default_factory=LoadStore)
+    
+    # Running sum of every load's response (calculations.BeamSolution), None until first calculated,
+    # and the analysis key of the beam and loads it holds
+    _accumulated_solution: Optional[Any] = PrivateAttr(default=None)
+    _accumulated_key: Optional[str] = PrivateAttr(default=None)
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _legacy_loads(cls, data: Any) -> Any:
+        # Sessions stored before the load store kept a list of load models per type
+        if isinstance(data, dict) and any(field in data for field in KIND_FIELDS):
+            data = dict(data)
+            data["loads"] = LoadStore.from_records({field: data.pop(field, []) for field in KIND_FIELDS})
+        return data
+    
+    @property
+    def accumulated_solution(self) -> Optional[Any]:
+        return self._accumulated_solution
+    
+    @accumulated_solution.setter
+    def accumulated_solution(self, solution: Optional[Any]) -> None:
+        self._accumulated_solution = solution
+    
+    @property
+    def accumulated_key(self) -> Optional[str]:
+        return self._accumulated_key
+    
+    @accumulated_key.setter
+    def accumulated_key(self, key: Optional[str]) -> None:
+        self._accumulated_key = key
+
+class Peak(BaseModel):
+    location: float = Field(..., description="Location of the largest magnitude in meters")
+    value: float = Field(..., description="Signed value at that location")
 
 class AnalysisResults(BaseModel):
     shear_force: List[float]
@@ -55,8 +125,137 @@ class AnalysisResults(BaseModel):
     max_bending_moment: float
     max_deflection: float
     max_slope: float
+    reaction_forces: List[float]  # One per support, in support order
+    reaction_moments: Optional[List[float]] = None  # One per support for a supports list, zero unless fixed
+    peaks: Optional[Dict[str, Peak]] = None  # Exact peaks, reported for the adaptive grid
+
+class DiagramSet(BaseModel):
+    """All four diagrams from one solve: images keyed by plot type, or one stacked image"""
+    images: Optional[Dict[str, str]] = None
+    image: Optional[str] = None
+    max_shear_force: float
+    max_bending_moment: float
+    max_deflection: float
+    max_slope: float
     reaction_forces: List[float]
 
+class BeamProblem(BaseModel):
+    beam_properties: BeamProperties
+    point_moments: List[PointMoment] = []
+    point_forces: List[PointForce] = []
+    constant_force_profiles: List[ConstantForceProfile] = []
+    triangular_force_profiles: List[TriangularForceProfile] = []
+
+class BatchAnalysisRequest(BaseModel):
+    problems: List[BeamProblem] = Field(..., min_length=1, max_length=1000, description="Complete beam problems to solve")
+    stations: int = Field(default=1001, ge=2, le=20001, description="Stations per beam, evenly spaced from 0 to length")
+    
+    @model_validator(mode="after")
+    def _size(self) -> "BatchAnalysisRequest":
+        if len(self.problems) * self.stations > MAX_RESULT_VALUES:
+            raise ValueError(f"problems × stations must be at most {MAX_RESULT_VALUES}")
+        return self
+
+class BatchAnalysisResults(BaseModel):
+    """Columnar results: every field holds one entry per problem, in request order"""
+    stations: int
+    lengths: List[float]
+    shear_force: List[List[float]]
+    bending_moment: List[List[float]]
+    slope: List[List[float]]
+    deflection: List[List[float]]
+    max_shear_force: List[float]
+    max_bending_moment: List[float]
+    max_deflection: List[float]
+    max_slope: List[float]
+    reaction_forces: List[List[float]]
+
+class LoadCombination(BaseModel):
+    name: str = Field(..., description="Combination name, e.g. 1.2D + 1.6L")
+    factors: Dict[str, float] = Field(..., description="Factor per load group; groups not listed are left out")
+
+class CombinationRequest(BaseModel):
+    combinations: List[LoadCombination] = Field(..., min_length=1, max_length=1000)
+    include_diagrams: bool = Field(default=False, description="Return every combination's diagrams, not only the envelope")
+    
+    @model_validator(mode="after")
+    def _size(self) -> "CombinationRequest":
+        # Each combination is solved on the DEFAULT_STATIONS grid
+        if len(self.combinations) * DEFAULT_STATIONS > MAX_RESULT_VALUES:
+            raise ValueError(f"combinations × {DEFAULT_STATIONS} stations must be at most {MAX_RESULT_VALUES}")
+        return self
+
+class DiagramEnvelope(BaseModel):
+    max: List[float]
+    min: List[float]
+
+class CombinationResults(BaseModel):
+    """Per-combination maxima and reactions (in request order) plus the station-wise envelope"""
+    combinations: List[str]
+    x_coordinates: List[float]
+    max_shear_force: List[float]
+    max_bending_moment: List[float]
+    max_deflection: List[float]
+    max_slope: List[float]
+    reaction_forces: List[List[float]]
+    envelope: Dict[str, DiagramEnvelope]
+    diagrams: Optional[Dict[str, List[List[float]]]] = None
+
+class InfluenceLineRequest(BaseModel):
+    sections: List[float] = Field(..., min_length=1, max_length=1000, description="Section locations in meters")
+    stations: int = Field(default=1001, ge=2, le=20001, description="Unit load positions, evenly spaced from 0 to length")
+    
+    @model_validator(mode="after")
+    def _size(self) -> "InfluenceLineRequest":
+        if len(self.sections) * self.stations > MAX_RESULT_VALUES:
+            raise ValueError(f"sections × stations must be at most {MAX_RESULT_VALUES}")
+        return self
+
+class InfluenceLineResults(BaseModel):
+    """Effects of a unit upward force at each position; shear and moment have one row per section"""
+    sections: List[float]
+    positions: List[float]
+    reaction_forces: List[List[float]]  # [R1 line, R2 line]
+    shear_force: List[List[float]]
+    bending_moment: List[List[float]]
+
+class Axle(BaseModel):
+    magnitude: float = Field(..., description="Axle force in N, signed like point forces (negative is downward)")
+    offset: float = Field(default=0.0, ge=0, description="Distance behind the lead axle in meters")
+
+# Evenly spaced sections of a moving load request that lists none
+DEFAULT_MOVING_LOAD_SECTIONS = 101
+
+class MovingLoadRequest(BaseModel):
+    axles: List[Axle] = Field(..., min_length=1, max_length=100)
+    sections: Optional[List[float]] = Field(
+        default=None, min_length=1, max_length=1000,
+        description=f"Section locations in meters, defaults to {DEFAULT_MOVING_LOAD_SECTIONS} evenly spaced sections"
+    )
+    positions: int = Field(default=2001, ge=2, le=100001, description="Lead axle positions, evenly spaced until the train has crossed")
+    include_history: bool = Field(default=False, description="Return every effect at every lead axle position")
+    
+    @model_validator(mode="after")
+    def _size(self) -> "MovingLoadRequest":
+        # The sweep holds every effect at every position, with or without the history
+        sections = DEFAULT_MOVING_LOAD_SECTIONS if self.sections is None else len(self.sections)
+        if sections * self.positions > MAX_RESULT_VALUES:
+            raise ValueError(f"sections × positions must be at most {MAX_RESULT_VALUES}")
+        return self
+
+class GoverningEffect(BaseModel):
+    """Extremes per row (reaction or section) and the lead axle positions that produce them"""
+    max: List[float]
+    max_position: List[float]
+    min: List[float]
+    min_position: List[float]
+
+class MovingLoadResults(BaseModel):
+    sections: List[float]
+    envelope: Dict[str, GoverningEffect]  # reaction_forces (R1, R2), shear_force and bending_moment per section
+    lead_positions: Optional[List[float]] = None
+    history: Optional[Dict[str, List[List[float]]]] = None
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
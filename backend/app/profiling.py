@@ -0,0 +1,308 @@
+import asyncio
+import cProfile
+import importlib
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import current_timer
+
+# Profiler modes: deterministic cProfile, or a stack sampler with low overhead
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_SUFFIXES = {"cprofile": ".prof", "sample": ".folded"}
+
+# Request header that asks for a profile of one request, e.g. X-Beam-Profile: sample
+PROFILE_REQUEST_HEADER = b"x-beam-profile"
+
+class StackSampler:
+    """Samples the stack of one thread every interval seconds, counting collapsed stacks"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Counts in the collapsed-stack format read by flamegraph.pl and speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+def profiled_call(mode: str, interval: float, fn: Callable, *args: Any) -> Tuple[Any, bytes, float]:
+    """
+    Run fn(*args) under a profiler, in a worker process
+    Returns (result, profile, seconds): marshalled pstats data for cprofile (the format of
+    Profile.dump_stats), collapsed stacks for sample.
+    """
+    start = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn, *args)
+        profiler.create_stats()
+        profile = marshal.dumps(profiler.stats)
+    else:
+        with StackSampler(threading.get_ident(), interval) as sampler:
+            result = fn(*args)
+        profile = sampler.collapsed().encode()
+    return result, profile, time.perf_counter() - start
+
+def replay_tasks(mode: str, interval: float, tasks: List[Tuple[Callable, tuple]]) -> List[Tuple[bytes, float]]:
+    """Profile each (fn, args) task again, in a worker process, returning (profile, seconds) per task"""
+    return [profiled_call(mode, interval, fn, *args)[1:] for fn, args in tasks]
+
+def _snapshot(value: Any) -> Any:
+    # Arrays are copied so that later in-place updates (e.g. to a session's accumulated results)
+    # don't change what is saved; everything else in task arguments is left unchanged
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_snapshot(item) for item in value)
+    return value
+
+def _encode(value: Any) -> Any:
+    """Task arguments as JSON, with arrays as {"ndarray": values, "dtype": dtype}"""
+    if isinstance(value, np.ndarray):
+        return {"ndarray": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and "ndarray" in value:
+        return np.array(value["ndarray"], dtype=value["dtype"])
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+def encode_task(fn: Callable, args: tuple) -> Dict[str, Any]:
+    """A task as {"function": "module:name", "args": [...], "kwargs": {...}}"""
+    kwargs = {}
+    if isinstance(fn, partial):
+        fn, args, kwargs = fn.func, fn.args + tuple(args), fn.keywords
+    return {"function": f"{fn.__module__}:{fn.__qualname__}", "args": _encode(args), "kwargs": _encode(kwargs)}
+
+def decode_task(task: Dict[str, Any]) -> Tuple[Callable, tuple]:
+    """Inverse of encode_task, importing the function"""
+    module, name = task["function"].split(":")
+    fn = getattr(importlib.import_module(module), name)
+    kwargs = {key: _decode(value) for key, value in task["kwargs"].items()}
+    return (partial(fn, **kwargs) if kwargs else fn), tuple(_decode(arg) for arg in task["args"])
+
+class Capture:
+    """The compute tasks of one request, with their profiles when the request asked for one"""
+
+    def __init__(self, mode: Optional[str]):
+        # Sortable by time, so the oldest captures can be pruned by name
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        self.id = f"{stamp}.{int(now * 1000) % 1000:03d}-{uuid.uuid4().hex[:8]}"
+        self.mode = mode
+        self.tasks: List[Tuple[Callable, tuple]] = []
+        self.profiles: List[Tuple[bytes, float]] = []
+
+_current_capture: ContextVar[Optional[Capture]] = ContextVar("profile_capture", default=None)
+
+class RequestProfiler:
+    """
+    Opt-in profiler for the solve and render tasks that requests run on the compute executor
+    With slow_ms > 0, a request that takes longer has its tasks replayed under cProfile. With
+    allow_header, a request with an X-Beam-Profile: cprofile|sample header runs its tasks under that
+    profiler. Each capture is saved to directory as <id>.json: the request, its stage timings, the
+    beam problem of its session and every task with its arguments, next to one profile file per
+    task. Only the newest keep captures are kept.
+    """
+
+    def __init__(self, directory: str, slow_ms: float = 0.0, allow_header: bool = False,
+                 interval: float = 0.001, keep: int = 100,
+                 problem: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None):
+        self.directory = directory
+        self.slow_ms = slow_ms
+        self.allow_header = allow_header
+        self.interval = interval
+        self.keep = keep
+        self.problem = problem  # Beam problem of a session, by session ID
+        self.captured = 0
+
+    async def run_task(self, executor, fn: Callable, args: tuple) -> Any:
+        """ComputeExecutor.run for a request being profiled"""
+        capture = _current_capture.get()
+        if capture is None:
+            return await executor.wait(executor.submit(fn, *args))
+        capture.tasks.append((fn, _snapshot(args)))
+        if capture.mode is None:
+            return await executor.wait(executor.submit(fn, *args))
+        result, profile, seconds = await executor.wait(
+            executor.submit(profiled_call, capture.mode, self.interval, fn, *args)
+        )
+        capture.profiles.append((profile, seconds))
+        return result
+
+    def requested_mode(self, scope) -> Optional[str]:
+        if not self.allow_header:
+            return None
+        value = next((value for name, value in scope["headers"] if name == PROFILE_REQUEST_HEADER), None)
+        if value is None:
+            return None
+        mode = value.decode("latin-1").strip().lower()
+        return mode if mode in PROFILE_MODES else "cprofile"
+
+    async def finish(self, executor, capture: Capture, scope, status: int, seconds: float) -> None:
+        """Save a requested capture, or replay and save the tasks of a slow request"""
+        trigger = "header" if capture.mode else "slow"
+        if capture.mode is None:
+            if not self.slow_ms or seconds * 1000 < self.slow_ms or not capture.tasks:
+                return
+            capture.mode = "cprofile"
+            try:
+                capture.profiles = await executor.wait(
+                    executor.submit(replay_tasks, capture.mode, self.interval, capture.tasks)
+                )
+            except Exception:
+                # A busy or failing replay loses this profile, never the request
+                return
+
+        timer = current_timer()
+        session_id = scope.get("path_params", {}).get("session_id")
+        record = {
+            "id": capture.id,
+            "trigger": trigger,
+            "mode": capture.mode,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "seconds": seconds,
+            "stages": dict(timer.stages) if timer else None,
+            "problem": await self.problem(session_id) if self.problem and session_id else None,
+            "tasks": [
+                {**encode_task(fn, args), "seconds": task_seconds,
+                 "profile": f"{capture.id}-{index}{PROFILE_SUFFIXES[capture.mode]}"}
+                for index, ((fn, args), (_, task_seconds)) in enumerate(zip(capture.tasks, capture.profiles))
+            ],
+        }
+        await asyncio.to_thread(self._save, record, [profile for profile, _ in capture.profiles])
+        self.captured += 1
+
+    def _save(self, record: Dict[str, Any], profiles: List[bytes]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        for task, profile in zip(record["tasks"], profiles):
+            with open(os.path.join(self.directory, task["profile"]), "wb") as file:
+                file.write(profile)
+        with open(os.path.join(self.directory, f"{record['id']}.json"), "w") as file:
+            json.dump(record, file)
+
+        # Drop the oldest captures beyond keep; IDs start with their timestamp
+        captures = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+        for old in captures[:max(0, len(captures) - self.keep)]:
+            for name in os.listdir(self.directory):
+                if name.startswith(old):
+                    os.remove(os.path.join(self.directory, name))
+
+class ProfilingMiddleware:
+    """ASGI middleware that opens a Capture per HTTP request and hands it to the profiler at the end"""
+
+    def __init__(self, app, profiler: RequestProfiler, executor):
+        self.app = app
+        self.profiler = profiler
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        capture = Capture(self.profiler.requested_mode(scope))
+        token = _current_capture.set(capture)
+        start = time.perf_counter()
+        status = 500
+
+        async def capture_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if capture.mode:
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"x-beam-profile-id", capture.id.encode())
+                    ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture_send)
+        finally:
+            _current_capture.reset(token)
+        await self.profiler.finish(self.executor, capture, scope, status, time.perf_counter() - start)
+
+def create_profiler(problem: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None) -> Optional[RequestProfiler]:
+    """
+    Profiler configured by the environment, None (no profiling code runs at all) when disabled
+    BEAM_PROFILE_SLOW_MS: replay and save requests slower than this (default 0, off)
+    BEAM_PROFILE_HEADER: 1 to honor X-Beam-Profile request headers (default off)
+    BEAM_PROFILE_DIR: where captures are saved (default profiles)
+    BEAM_PROFILE_INTERVAL_MS: stack sampling interval (default 1)
+    BEAM_PROFILE_KEEP: newest captures kept (default 100)
+    """
+    slow_ms = float(os.environ.get("BEAM_PROFILE_SLOW_MS", "0"))
+    allow_header = os.environ.get("BEAM_PROFILE_HEADER", "0") == "1"
+    if not slow_ms and not allow_header:
+        return None
+    return RequestProfiler(
+        os.environ.get("BEAM_PROFILE_DIR", "profiles"), slow_ms, allow_header,
+        interval=float(os.environ.get("BEAM_PROFILE_INTERVAL_MS", "1")) / 1000,
+        keep=int(os.environ.get("BEAM_PROFILE_KEEP", "100")),
+        problem=problem,
+    )
+
+def replay(path: str, mode: str = "cprofile", limit: int = 25) -> None:
+    """Run the tasks of a saved capture again in this process and print their profiles"""
+    with open(path) as file:
+        record = json.load(file)
+    print(f"{record['method']} {record['path']}: {record['seconds'] * 1000:.1f} ms ({record['trigger']})")
+    for task in record["tasks"]:
+        fn, args = decode_task(task)
+        print(f"\n{task['function']} (took {task['seconds'] * 1000:.1f} ms when captured)")
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.runcall(fn, *args)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(limit)
+        else:
+            with StackSampler(threading.get_ident(), 0.001) as sampler:
+                fn(*args)
+            print(sampler.collapsed(), end="")
+
+if __name__ == "__main__":
+    # python -m app.profiling profiles/<id>.json [cprofile|sample]
+    replay(sys.argv[1], *sys.argv[2:3])
@@ -0,0 +1,161 @@
+import json
+import struct
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+# Packed columnar layout for analysis results:
+#   magic b"BEAM" | uint16 version | uint16 reserved | uint32 header length
+#   | JSON header, space-padded to 8 bytes | column buffers, each 8-byte aligned
+# Column buffers are little-endian float32 or float64, built straight from the arrays.
+# The header lists each column's name, byte offset (from the start of the buffers) and
+# count. Evenly spaced x coordinates are sent as {"start", "stop", "count"} instead of a column.
+BINARY_MEDIA_TYPE = "application/octet-stream"
+MAGIC = b"BEAM"
+VERSION = 1
+DTYPES = {"float64": "<f8", "float32": "<f4"}
+
+_PREFIX = struct.Struct("<4sHHI")
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+def pack_columns(columns: Dict[str, np.ndarray], metadata: Dict[str, Any], dtype: str = "float64") -> bytes:
+    """Pack named 1-D arrays and JSON metadata into the binary columnar layout"""
+    code = DTYPES[dtype]
+    buffers = []
+    layout = []
+    offset = 0
+    for name, values in columns.items():
+        data = np.ascontiguousarray(values, dtype=code).tobytes()
+        layout.append({"name": name, "offset": offset, "count": len(values)})
+        buffers.append(data + b"\0" * _padding(len(data)))
+        offset += len(buffers[-1])
+
+    header = json.dumps({"dtype": code, "columns": layout, **metadata}, separators=(",", ":")).encode()
+    header += b" " * _padding(_PREFIX.size + len(header))
+    return _PREFIX.pack(MAGIC, VERSION, 0, len(header)) + header + b"".join(buffers)
+
+def unpack_columns(data: bytes) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Inverse of pack_columns, returning read-only arrays that view the input bytes"""
+    magic, version, _, header_length = _PREFIX.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a beam analysis binary payload")
+    header = json.loads(data[_PREFIX.size:_PREFIX.size + header_length])
+    start = _PREFIX.size + header_length
+    dtype = np.dtype(header.pop("dtype"))
+    columns = {
+        column["name"]: np.frombuffer(data, dtype=dtype, count=column["count"], offset=start + column["offset"])
+        for column in header.pop("columns")
+    }
+    return columns, header
+
+# Streams are a sequence of frames, each a pack_columns payload behind its uint64 byte length
+_FRAME_LENGTH = struct.Struct("<Q")
+
+def pack_frame(columns: Dict[str, np.ndarray], metadata: Dict[str, Any], dtype: str = "float64") -> bytes:
+    """One self-delimiting frame of a binary stream"""
+    payload = pack_columns(columns, metadata, dtype)
+    return _FRAME_LENGTH.pack(len(payload)) + payload
+
+def unpack_frames(data: bytes) -> Iterator[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """Decode every frame of a binary stream into (columns, metadata)"""
+    offset = 0
+    while offset < len(data):
+        (length,) = _FRAME_LENGTH.unpack_from(data, offset)
+        offset += _FRAME_LENGTH.size
+        yield unpack_columns(data[offset:offset + length])
+        offset += length
+
+def uniform_spacing(x: np.ndarray) -> Optional[Dict[str, float]]:
+    """(start, stop, count) metadata when x is np.linspace(start, stop, count), None otherwise"""
+    if len(x) < 2:
+        return None
+    expected = np.linspace(x[0], x[-1], len(x))
+    if not np.array_equal(x, expected):
+        return None
+    return {"start": float(x[0]), "stop": float(x[-1]), "count": len(x)}
+
+def pack_analysis_results(solution, peaks: Optional[Dict[str, Tuple[float, float]]] = None,
+                          dtype: str = "float64", reaction_moments: Optional[np.ndarray] = None) -> bytes:
+    """Pack a calculations.BeamSolution (and optional exact peaks or reaction moments) into the binary columnar layout"""
+    spacing = uniform_spacing(solution.x)
+    columns = {} if spacing else {"x_coordinates": solution.x}
+    columns.update({
+        "shear_force": solution.shear_force,
+        "bending_moment": solution.bending_moment,
+        "slope": solution.slope,
+        "deflection": solution.deflection,
+    })
+    metadata = {
+        "x": spacing,
+        "max_shear_force": float(np.abs(solution.shear_force).max()),
+        "max_bending_moment": float(np.abs(solution.bending_moment).max()),
+        "max_deflection": float(np.abs(solution.deflection).max()),
+        "max_slope": float(np.abs(solution.slope).max()),
+        "reaction_forces": solution.reactions.tolist(),
+        "reaction_moments": None if reaction_moments is None else reaction_moments.tolist(),
+        "peaks": {
+            field: {"location": location, "value": value} for field, (location, value) in peaks.items()
+        } if peaks else None,
+    }
+    return pack_columns(columns, metadata, dtype)
+
+BATCH_FIELDS = ("shear_force", "bending_moment", "slope", "deflection")
+
+def pack_batch_results(solution, stations: int, dtype: str = "float64") -> bytes:
+    """
+    Pack a calculations.BatchSolution into the binary columnar layout
+    2-D fields are sent row by row as one column (problems × stations, reactions problems × 2).
+    """
+    columns = {"lengths": solution.lengths}
+    for field in BATCH_FIELDS:
+        values = getattr(solution, field)
+        columns[field] = values.ravel()
+        columns[f"max_{field}"] = np.abs(values).max(axis=1)
+    columns["reaction_forces"] = solution.reactions.ravel()
+    return pack_columns(columns, {"problems": len(solution.lengths), "stations": stations}, dtype)
+
+def unpack_batch_results(data: bytes) -> Dict[str, Any]:
+    """Decode pack_batch_results output into the BatchAnalysisResults fields, as arrays"""
+    columns, metadata = unpack_columns(data)
+    problems = metadata["problems"]
+    for field in BATCH_FIELDS:
+        columns[field] = columns[field].reshape(problems, metadata["stations"])
+    columns["reaction_forces"] = columns["reaction_forces"].reshape(problems, 2)
+    return {**columns, **metadata}
+
+# Streamed result formats and their media types
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "binary": BINARY_MEDIA_TYPE}
+STREAM_FIELDS = ("shear_force", "bending_moment", "slope", "deflection")
+
+def stream_results(chunks, stations: int, stream_format: str = "ndjson", dtype: str = "float64") -> Iterator[bytes]:
+    """
+    Encode calculations.solve_beam_chunks output as it is produced
+    A header record (stations, reaction_forces), one record per chunk with the index of its first
+    station and its columns, then a record with the maxima: NDJSON lines, or binary frames.
+    """
+    def record(columns: Dict[str, np.ndarray], metadata: Dict[str, Any]) -> bytes:
+        if stream_format == "binary":
+            return pack_frame(columns, metadata, dtype)
+        return (json.dumps({**metadata, **{name: values.tolist() for name, values in columns.items()}}) + "\n").encode()
+
+    maxima = dict.fromkeys(STREAM_FIELDS, 0.0)
+    first = 0
+    for chunk in chunks:
+        if first == 0:
+            yield record({}, {"stations": stations, "reaction_forces": chunk.reactions.tolist()})
+        columns = {"x_coordinates": chunk.x, **{field: getattr(chunk, field) for field in STREAM_FIELDS}}
+        for field in STREAM_FIELDS:
+            maxima[field] = max(maxima[field], float(np.abs(columns[field]).max()))
+        yield record(columns, {"first": first})
+        first += len(chunk.x)
+    yield record({}, {f"max_{field}": value for field, value in maxima.items()})
+
+def unpack_analysis_results(data: bytes) -> Dict[str, Any]:
+    """Decode pack_analysis_results output into the AnalysisResults fields, with arrays for the diagrams"""
+    columns, metadata = unpack_columns(data)
+    spacing = metadata.pop("x")
+    if spacing:
+        columns["x_coordinates"] = np.linspace(spacing["start"], spacing["stop"], spacing["count"])
+    return {**columns, **metadata}
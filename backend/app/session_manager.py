@@ -1,46 +1,68 @@
+import asyncio
 import uuid
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 from .models import BeamSession, BeamProperties
+from .session_store import SessionStore, create_session_store
+
+T = TypeVar("T")
 
 class SessionManager:
-    def __init__(self):
-        self.sessions: Dict[str, BeamSession] = {}
+    """
+    Session operations for the async handlers
+    Calls to a store that blocks on I/O (SQLite waits up to its busy timeout for the write lock)
+    run in a worker thread, so that a contended write never stalls the event loop. The memory store
+    is called directly: its sessions are live objects that only the event loop may change.
+    """
+    
+    def __init__(self, store: Optional[SessionStore] = None):
+        self.store = store if store is not None else create_session_store()
+    
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
     
-    def create_session(self) -> str:
+    async def create_session(self) -> str:
         """Create a new session and return session ID"""
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = BeamSession(session_id=session_id)
+        await self._call(self.store.put, BeamSession(session_id=session_id))
         return session_id
     
-    def get_session(self, session_id: str) -> Optional[BeamSession]:
+    async def get_session(self, session_id: str) -> Optional[BeamSession]:
         """Get session by ID"""
-        return self.sessions.get(session_id)
+        return await self._call(self.store.get, session_id)
     
-    def update_beam_properties(self, session_id: str, beam_properties: BeamProperties) -> bool:
+    async def update_session(self, session_id: str, change: Callable[[BeamSession], T]) -> Optional[Tuple[BeamSession, T]]:
+        """
+        Change a session and store it in one atomic step, see SessionStore.update
+        Returns (session, change's return value), or None if the session doesn't exist.
+        """
+        return await self._call(self.store.update, session_id, change)
+    
+    async def update_beam_properties(self, session_id: str, beam_properties: BeamProperties) -> bool:
         """Update beam properties for a session"""
-        session = self.get_session(session_id)
-        if session:
+        def update(session: BeamSession) -> None:
             session.beam_properties = beam_properties
-            return True
-        return False
+            # Every load's response depends on the beam, so the next calculation starts from scratch
+            session.accumulated_solution = None
+        
+        return await self.update_session(session_id, update) is not None
     
-    def clear_loads(self, session_id: str) -> bool:
+    async def clear_loads(self, session_id: str) -> bool:
         """Clear all loads for a session"""
-        session = self.get_session(session_id)
-        if session:
-            session.point_moments.clear()
-            session.point_forces.clear()
-            session.constant_force_profiles.clear()
-            session.triangular_force_profiles.clear()
-            return True
-        return False
-    
-    def delete_session(self, session_id: str) -> bool:
+        def clear(session: BeamSession) -> None:
+            session.loads.clear()
+            session.accumulated_solution = None
+        
+        return await self.update_session(session_id, clear) is not None
+    
+    async def delete_session(self, session_id: str) -> bool:
         """Delete a session"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        return await self._call(self.store.delete, session_id)
+    
+    async def stats(self) -> Dict[str, int]:
+        """Counters of the session store"""
+        return await self._call(self.store.stats)
 
 # Global session manager instance
 session_manager = SessionManager()
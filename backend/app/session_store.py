@@ -0,0 +1,236 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, TypeVar
+
+from .models import BeamSession
+
+T = TypeVar("T")
+
+class SessionStore(ABC):
+    """
+    Storage backend for sessions, bounded by an idle TTL and a maximum number of sessions
+    Sessions idle for longer than ttl seconds expire; beyond max_sessions the least
+    recently used session is evicted. get() counts as use.
+    """
+
+    # Whether calls may wait on I/O or locks, so that async callers should make them from a thread
+    blocking = False
+
+    def __init__(self, max_sessions: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self.expired = 0
+        self.evicted = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[BeamSession]:
+        ...
+
+    @abstractmethod
+    def put(self, session: BeamSession) -> None:
+        """Store a new or modified session"""
+
+    @abstractmethod
+    def update(self, session_id: str, change: Callable[[BeamSession], T]) -> Optional[tuple[BeamSession, T]]:
+        """
+        Apply change to a session and store it, as one step that no other update can interleave with
+        Returns the changed session and change's return value, or None if the session doesn't exist.
+        change must not await; if it raises, the session is not stored.
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self),
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+class MemorySessionStore(SessionStore):
+    """Sessions kept as live objects in this process, in least recently used order"""
+
+    def __init__(self, max_sessions: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_sessions, ttl, clock)
+        self._sessions: "OrderedDict[str, tuple[BeamSession, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        # Oldest entries come first, so stop at the first one still alive
+        while self._sessions:
+            session_id, (_, accessed) = next(iter(self._sessions.items()))
+            if now - accessed <= self.ttl:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def get(self, session_id: str) -> Optional[BeamSession]:
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def put(self, session: BeamSession) -> None:
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            self._sessions[session.session_id] = (session, now)
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+
+    def update(self, session_id: str, change: Callable[[BeamSession], T]) -> Optional[tuple[BeamSession, T]]:
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            result = change(entry[0])
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+            return entry[0], result
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions serialized to JSON in a SQLite database in WAL mode, shared by every worker process
+    Each get() returns a fresh copy, so changes go through update(), which reads, changes and writes
+    a session inside one write transaction: concurrent updates from any worker are applied one after
+    the other instead of overwriting each other. The accumulated results of a session are not
+    stored; they are rebuilt from the analysis cache.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_sessions: int, ttl: float, clock: Callable[[], float] = time.time):
+        super().__init__(max_sessions, ttl, clock)
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers in other workers proceed during writes
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, session_id: str) -> Optional[BeamSession]:
+        now = self.clock()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT data FROM sessions WHERE session_id = ? AND accessed >= ?", (session_id, now - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute("UPDATE sessions SET accessed = ? WHERE session_id = ?", (now, session_id))
+        return BeamSession.model_validate_json(row[0])
+
+    def _write(self, connection: sqlite3.Connection, session: BeamSession, now: float) -> None:
+        # Inside a write transaction: store the session, then expire and evict others
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, data, accessed) VALUES (?, ?, ?)",
+            (session.session_id, session.model_dump_json(), now)
+        )
+        self.expired += connection.execute(
+            "DELETE FROM sessions WHERE accessed < ?", (now - self.ttl,)
+        ).rowcount
+        self.evicted += connection.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            "SELECT session_id FROM sessions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,)
+        ).rowcount
+
+    def put(self, session: BeamSession) -> None:
+        now = self.clock()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._write(connection, session, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def update(self, session_id: str, change: Callable[[BeamSession], T]) -> Optional[tuple[BeamSession, T]]:
+        now = self.clock()
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the database write lock before the read, so no other worker can
+        # write the session between this read and the write below
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND accessed >= ?", (session_id, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                connection.execute("ROLLBACK")
+                return None
+            session = BeamSession.model_validate_json(row[0])
+            result = change(session)
+            self._write(connection, session, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return session, result
+
+    def delete(self, session_id: str) -> bool:
+        cursor = self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE accessed >= ?", (self.clock() - self.ttl,)
+        ).fetchone()[0]
+
+def create_session_store() -> SessionStore:
+    """
+    Session store configured by the environment
+    BEAM_SESSION_STORE: memory (default, one process) or sqlite (shared by all workers)
+    BEAM_SESSION_DB: SQLite database path (default sessions.db)
+    BEAM_SESSION_TTL: idle seconds before a session expires (default 3600)
+    BEAM_MAX_SESSIONS: most sessions kept (default 10000)
+    """
+    backend = os.environ.get("BEAM_SESSION_STORE", "memory")
+    ttl = float(os.environ.get("BEAM_SESSION_TTL", "3600"))
+    max_sessions = int(os.environ.get("BEAM_MAX_SESSIONS", "10000"))
+    if backend == "memory":
+        return MemorySessionStore(max_sessions, ttl)
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.environ.get("BEAM_SESSION_DB", "sessions.db"), max_sessions, ttl)
+    raise ValueError(f"Unknown BEAM_SESSION_STORE: {backend}")
@@ -1,18 +1,36 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 import io
 import base64
-from typing import List, Tuple
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+def png_data_url(png: bytes) -> str:
+    """Wrap PNG bytes in a base64 data URL"""
+    image_base64 = base64.b64encode(png).decode()
+    return f"data:image/png;base64,{image_base64}"
 
 def draw_beam(length: float, support1: float, support2: float, 
               f1: List[List[float]], f2: List[List[float]], 
-              f3: List[List[float]], f4: List[List[float]]) -> str:
+              f3: List[List[float]], f4: List[List[float]],
+              supports: Optional[List[float]] = None) -> str:
     """
     Draw beam schematic and return as base64 encoded image
     """
+    return png_data_url(render_beam_png(length, support1, support2, f1, f2, f3, f4, supports))
+
+def render_beam_png(length: float, support1: float, support2: float, 
+                    f1: List[List[float]], f2: List[List[float]], 
+                    f3: List[List[float]], f4: List[List[float]],
+                    supports: Optional[List[float]] = None) -> bytes:
+    """
+    Draw beam schematic and return the PNG bytes
+    supports, when given, holds every support location and is drawn instead of support1 and support2.
+    """
     image = Image.new("RGB", (400, 400), "pink")
     draw = ImageDraw.Draw(image)
     
@@ -21,7 +39,7 @@ def draw_beam(length: float, support1: float, support2: float,
     draw.rectangle(rectangle_coords, outline="black", fill=(246, 167, 89), width=2)
     
     # Draw the supports
-    X = [support1 * 300 / length + 50, support2 * 300 / length + 50]
+    X = [location * 300 / length + 50 for location in (supports if supports is not None else [support1, support2])]
     y = 210
     side = 30
     for x in X:
@@ -102,37 +120,344 @@ def draw_beam(length: float, support1: float, support2: float,
             draw.line([load_end_location + 0.5, 190, load_end_location + 15 * np.cos(np.pi/4), 155 + 15 * np.sin(np.pi/4)], fill='black', width=3)
             draw.line([load_end_location + 0.5, 190, load_end_location - 15 * np.cos(np.pi/4), 155 + 15 * np.sin(np.pi/4)], fill='black', width=3)
     
-    # Convert to base64
     buffer = io.BytesIO()
     image.save(buffer, format='PNG')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-    
-    return f"data:image/png;base64,{image_base64}"
+    return buffer.getvalue()
+
+# Reusable SVG symbols, drawn around (0, 0) and placed with <use>
+BEAM_SVG_DEFS = (
+    "<defs>"
+    "<path id='support' d='M0 0L-15 25.98L15 25.98Z' fill='rgb(174,94,14)' stroke='#000' stroke-width='2'/>"
+    "<path id='head-down' d='M-10.6 -10.6L0 0L10.6 -10.6' fill='none' stroke='#000' stroke-width='3'/>"
+    "<path id='head-up' d='M-10.6 10.6L0 0L10.6 10.6' fill='none' stroke='#000' stroke-width='3'/>"
+    "<g id='force-down'><path d='M0 -35V0' stroke='#000' stroke-width='3'/><use href='#head-down'/></g>"
+    "<g id='force-up'><path d='M0 0V35' stroke='#000' stroke-width='3'/><use href='#head-up'/></g>"
+    "<g id='moment-ccw' fill='none' stroke='#000' stroke-width='3'>"
+    "<path d='M-16.07 -19.15A25 25 0 1 1 -16.07 19.15'/><path d='M-6.07 -13.15L-16.07 -19.15V-29.15'/></g>"
+    "<g id='moment-cw' fill='none' stroke='#000' stroke-width='3'>"
+    "<path d='M-16.07 -19.15A25 25 0 1 1 -16.07 19.15'/><path d='M-16.07 29.15V19.15L-6.07 13.15'/></g>"
+    "</defs>"
+)
+
+def render_beam_svg(length: float, support1: float, support2: float,
+                    f1: List[List[float]], f2: List[List[float]],
+                    f3: List[List[float]], f4: List[List[float]],
+                    supports: Optional[List[float]] = None) -> str:
+    """
+    Draw beam schematic as compact SVG with the same layout as render_beam_png
+    Supports, arrows and moment arcs are defined once and placed with <use>.
+    """
+    def px(location: float) -> str:
+        return f"{location * 300 / length + 50:.1f}"
+
+    def label(x: str, y: int, value: float) -> str:
+        return f"<text x='{x}' y='{y}'>{round(abs(value), 2)}</text>"
+
+    parts = [
+        "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 400 400' width='400' height='400'>",
+        BEAM_SVG_DEFS,
+        "<rect width='400' height='400' fill='pink'/>",
+        "<rect x='50' y='190' width='300' height='20' fill='rgb(246,167,89)' stroke='#000' stroke-width='2'/>",
+        "".join(
+            f"<use href='#support' x='{px(location)}' y='210'/>"
+            for location in (supports if supports is not None else [support1, support2])
+        ),
+        "<g font-family='sans-serif' font-size='11' dominant-baseline='hanging'>",
+    ]
+
+    for magnitude, location in f1:
+        x = px(location)
+        parts.append(f"<use href='#moment-{'cw' if magnitude < 0 else 'ccw'}' x='{x}' y='200'/>{label(x, 150, magnitude)}")
+
+    for magnitude, location in f2:
+        x = px(location)
+        symbol = "<use href='#force-down' x='{}' y='190'/>" if magnitude < 0 else "<use href='#force-up' x='{}' y='155'/>"
+        parts.append(symbol.format(x) + label(x, 130, magnitude))
+
+    for magnitude, start, end in f3:
+        x0, x1 = px(start), px(end)
+        head = "<use href='#head-down' x='{}' y='190'/>" if magnitude < 0 else "<use href='#head-up' x='{}' y='155'/>"
+        parts.append(
+            f"<rect x='{x0}' y='155' width='{float(x1) - float(x0):.1f}' height='35' fill='rgb(163,163,163)' stroke='#000' stroke-width='2'/>"
+            + head.format(x0) + head.format(x1)
+            + label(f"{(float(x0) + float(x1)) / 2:.1f}", 130, magnitude)
+        )
+
+    for magnitude, start, end in f4:
+        x0, x1 = px(start), px(end)
+        head = "<use href='#head-down' x='{}' y='190'/>" if magnitude < 0 else "<use href='#head-up' x='{}' y='135'/>"
+        parts.append(
+            f"<path d='M{x0} 190L{x1} 135V190Z' fill='rgb(163,163,163)' stroke='#000' stroke-width='2'/>"
+            + head.format(x1) + label(x1, 115, magnitude)
+        )
+
+    parts.append("</g></svg>")
+    return "".join(parts)
 
 def create_engineering_plot(x_data: List[float], y_data: List[float],
                           title: str, xlabel: str, ylabel: str,
-                          support1: float, support2: float) -> str:
+                          support1: float, support2: float,
+                          renderer: str = "fast") -> str:
     """
     Create engineering diagram (shear force, bending moment, etc.) and return as base64
     """
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_data, y_data, 'b-', linewidth=2)
-    plt.title(title, fontsize=14, fontweight='bold')
-    plt.xlabel(xlabel, fontsize=12)
-    plt.ylabel(ylabel, fontsize=12)
-    plt.axhline(0, color='red', linestyle='-', alpha=0.7)
-    plt.axvline(support1, color='green', linestyle='--', alpha=0.7, label='Support 1')
-    plt.axvline(support2, color='black', linestyle='--', alpha=0.7, label='Support 2')
-    plt.grid(True, alpha=0.3)
-    plt.legend()
-    plt.tight_layout()
-
-    # Convert to base64
+    render = PLOT_RENDERERS[renderer]
+    return png_data_url(render(x_data, y_data, title, xlabel, ylabel, support1, support2))
+
+def render_engineering_plot_png(x_data: List[float], y_data: List[float],
+                                title: str, xlabel: str, ylabel: str,
+                                support1: float, support2: float) -> bytes:
+    """
+    Create engineering diagram (shear force, bending moment, etc.) with matplotlib and return the PNG bytes
+    High-fidelity path; uses a per-thread Figure and Agg canvas instead of the global pyplot state.
+    """
+    figure = _plot_figure()
+    ax = figure.add_subplot()
+    ax.plot(x_data, y_data, 'b-', linewidth=2)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.axhline(0, color='red', linestyle='-', alpha=0.7)
+    ax.axvline(support1, color='green', linestyle='--', alpha=0.7, label='Support 1')
+    ax.axvline(support2, color='black', linestyle='--', alpha=0.7, label='Support 2')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
     buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-    plt.close()  # Important: close the figure to free memory
+    figure.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    figure.clear()
 
-    return f"data:image/png;base64,{image_base64}"
+    return buffer.getvalue()
+
+def _figure(figsize: Tuple[float, float]) -> "Figure":
+    """
+    A new figure attached to an Agg canvas
+    matplotlib is most of the rendering stack's import time, so it is only imported here, by the
+    first matplotlib render, rather than with this module.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    figure = Figure(figsize=figsize, layout="tight")
+    FigureCanvasAgg(figure)
+    return figure
+
+_figures = threading.local()
+
+def _plot_figure() -> "Figure":
+    """This thread's reusable 10x6 inch figure"""
+    figure = getattr(_figures, "figure", None)
+    if figure is None:
+        figure = _figures.figure = _figure((10, 6))
+    return figure
+
+# Fast renderer layout: image size and plot area margins (left, top, right, bottom) in pixels
+PLOT_SIZE = (1000, 600)
+PLOT_MARGINS = (100, 50, 30, 70)
+PANEL_HEIGHT = 250  # plot area height of each panel in a stacked image
+PLOT_COLORS = {
+    "background": (255, 255, 255),
+    "grid": (235, 235, 235),
+    "axes": (0, 0, 0),
+    "curve": (0, 0, 255),
+    "zero": (255, 77, 77),
+    "support1": (77, 166, 77),
+    "support2": (77, 77, 77),
+}
+
+@lru_cache(maxsize=None)
+def _font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """DejaVu Sans at the given size, or PIL's built-in bitmap font when it is not installed"""
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+def nice_ticks(low: float, high: float, count: int = 6) -> np.ndarray:
+    """About count evenly spaced ticks between low and high, at steps of 1, 2 or 5 times a power of ten"""
+    raw = (high - low) / count
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    ticks = np.arange(np.ceil(low / step), np.floor(high / step) + 1) * step
+    return ticks + 0.0  # no negative zero labels
+
+def _decimate(px: np.ndarray, py: np.ndarray, columns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a polyline to at most four points per pixel column (first, min, max, last),
+    which draws the same picture as the full line
+    """
+    if len(px) <= 4 * columns:
+        return px, py
+    column = np.floor(px).astype(int)
+    starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+    ends = np.r_[starts[1:], len(px)] - 1
+    points = np.stack([
+        py[starts], np.minimum.reduceat(py, starts), np.maximum.reduceat(py, starts), py[ends]
+    ], axis=1)
+    return np.repeat(column[starts], 4).astype(float), points.ravel()
+
+def _dashed_vertical(draw: ImageDraw.ImageDraw, x: float, top: float, bottom: float, fill, dash: int = 8) -> None:
+    for y in np.arange(top, bottom, 2 * dash):
+        draw.line([x, y, x, min(y + dash, bottom)], fill=fill, width=2)
+
+def _x_range(x: np.ndarray, support1: float, support2: float) -> Tuple[float, float]:
+    """Padded x axis range that keeps the whole beam and both supports in view"""
+    low, high = min(x.min(), support1, support2), max(x.max(), support1, support2)
+    pad = 0.05 * (high - low)
+    return low - pad, high + pad
+
+def _draw_panel(image: Image.Image, box: Tuple[int, int, int, int], x: np.ndarray, y: np.ndarray,
+                x_range: Tuple[float, float], title: str, ylabel: str,
+                support1: float, support2: float, tick_labels: bool = True, legend: bool = True) -> None:
+    """Draw one diagram into the plot area box = (left, top, right, bottom) of image, with its title above"""
+    draw = ImageDraw.Draw(image)
+    tick_font, label_font, title_font = _font(12), _font(14), _font(16, bold=True)
+    left, top, x1, y1 = box
+
+    # Padded y range; the zero line is always in view
+    x_low, x_high = x_range
+    y_low, y_high = min(y.min(), 0.0), max(y.max(), 0.0)
+    if y_high - y_low < 1e-300:
+        y_low, y_high = -1.0, 1.0
+    y_pad = 0.05 * (y_high - y_low)
+    y_low, y_high = y_low - y_pad, y_high + y_pad
+
+    def to_px(values):
+        return left + (values - x_low) * (x1 - left) / (x_high - x_low)
+
+    def to_py(values):
+        return y1 - (values - y_low) * (y1 - top) / (y_high - y_low)
+
+    # Grid and tick labels
+    for tick in nice_ticks(x_low, x_high):
+        px = to_px(tick)
+        draw.line([px, top, px, y1], fill=PLOT_COLORS["grid"], width=1)
+        draw.line([px, y1, px, y1 + 5], fill=PLOT_COLORS["axes"], width=1)
+        if tick_labels:
+            draw.text((px, y1 + 8), f"{tick:.4g}", fill=PLOT_COLORS["axes"], font=tick_font, anchor="mt")
+    for tick in nice_ticks(y_low, y_high):
+        py = to_py(tick)
+        draw.line([left, py, x1, py], fill=PLOT_COLORS["grid"], width=1)
+        draw.line([left - 5, py, left, py], fill=PLOT_COLORS["axes"], width=1)
+        draw.text((left - 8, py), f"{tick:.4g}", fill=PLOT_COLORS["axes"], font=tick_font, anchor="rm")
+
+    # Zero line, supports and the diagram itself
+    draw.line([left, to_py(0.0), x1, to_py(0.0)], fill=PLOT_COLORS["zero"], width=2)
+    _dashed_vertical(draw, to_px(support1), top, y1, PLOT_COLORS["support1"])
+    _dashed_vertical(draw, to_px(support2), top, y1, PLOT_COLORS["support2"])
+    px, py = _decimate(to_px(x), to_py(y), x1 - left)
+    draw.line(np.column_stack([px, py]).ravel().tolist(), fill=PLOT_COLORS["curve"], width=2, joint="curve")
+    draw.rectangle([left, top, x1, y1], outline=PLOT_COLORS["axes"], width=1)
+
+    # Title and rotated y axis label
+    draw.text(((left + x1) / 2, top - 25), title, fill=PLOT_COLORS["axes"], font=title_font, anchor="mm")
+    label = Image.new("L", (int(draw.textlength(ylabel, font=label_font)) + 4, 20), 0)
+    ImageDraw.Draw(label).text((2, 10), ylabel, fill=255, font=label_font, anchor="lm")
+    label = label.rotate(90, expand=True)
+    image.paste(PLOT_COLORS["axes"], (left - 80 - label.width // 2, (top + y1 - label.height) // 2), label)
+
+    if not legend:
+        return
+
+    # Legend in the corner that hides the fewest points of the curve
+    corners = [(x1 - 130, top + 10), (left + 10, top + 10), (x1 - 130, y1 - 60), (left + 10, y1 - 60)]
+    legend_x, legend_y = min(corners, key=lambda corner: np.count_nonzero(
+        (px >= corner[0]) & (px <= corner[0] + 120) & (py >= corner[1]) & (py <= corner[1] + 50)
+    ))
+    draw.rectangle([legend_x, legend_y, legend_x + 120, legend_y + 50], fill=PLOT_COLORS["background"], outline=PLOT_COLORS["grid"])
+    for row, (name, color) in enumerate((("Support 1", "support1"), ("Support 2", "support2"))):
+        row_y = legend_y + 15 + 20 * row
+        draw.line([legend_x + 8, row_y, legend_x + 20, row_y], fill=PLOT_COLORS[color], width=2)
+        draw.line([legend_x + 26, row_y, legend_x + 38, row_y], fill=PLOT_COLORS[color], width=2)
+        draw.text((legend_x + 46, row_y), name, fill=PLOT_COLORS["axes"], font=tick_font, anchor="lm")
+
+def _encode_png(image: Image.Image) -> bytes:
+    # A few flat colors plus antialiased text: a small palette encodes several times faster than RGB
+    buffer = io.BytesIO()
+    image.quantize(64, method=Image.Quantize.FASTOCTREE).save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+def render_plot_png(x_data: List[float], y_data: List[float],
+                    title: str, xlabel: str, ylabel: str,
+                    support1: float, support2: float) -> bytes:
+    """
+    Create engineering diagram (shear force, bending moment, etc.) with PIL and return the PNG bytes
+    Same content as render_engineering_plot_png (curve, zero line, support lines, grid, labels,
+    legend) at a fraction of the cost; safe to call from several threads at once.
+    """
+    x = np.asarray(x_data, dtype=float)
+    width, height = PLOT_SIZE
+    left, top, right, bottom = PLOT_MARGINS
+
+    image = Image.new("RGB", PLOT_SIZE, PLOT_COLORS["background"])
+    _draw_panel(
+        image, (left, top, width - right, height - bottom), x, np.asarray(y_data, dtype=float),
+        _x_range(x, support1, support2), title, ylabel, support1, support2
+    )
+    ImageDraw.Draw(image).text(
+        ((left + width - right) / 2, height - 20), xlabel, fill=PLOT_COLORS["axes"], font=_font(14), anchor="mm"
+    )
+    return _encode_png(image)
+
+def render_plot_panels_png(x_data: List[float], panels: List[Tuple[List[float], str, str]],
+                           xlabel: str, support1: float, support2: float) -> bytes:
+    """
+    Stack several diagrams, given as (y_data, title, ylabel), in one PIL image with a shared x axis
+    """
+    x = np.asarray(x_data, dtype=float)
+    width = PLOT_SIZE[0]
+    left, top, right, bottom = PLOT_MARGINS
+    x_range = _x_range(x, support1, support2)
+
+    image = Image.new("RGB", (width, len(panels) * (top + PANEL_HEIGHT) + bottom), PLOT_COLORS["background"])
+    for index, (y_data, title, ylabel) in enumerate(panels):
+        panel_top = index * (top + PANEL_HEIGHT) + top
+        last = index == len(panels) - 1
+        _draw_panel(
+            image, (left, panel_top, width - right, panel_top + PANEL_HEIGHT), x, np.asarray(y_data, dtype=float),
+            x_range, title, ylabel, support1, support2, tick_labels=last, legend=index == 0
+        )
+    ImageDraw.Draw(image).text(
+        ((left + width - right) / 2, image.height - 20), xlabel, fill=PLOT_COLORS["axes"], font=_font(14), anchor="mm"
+    )
+    return _encode_png(image)
+
+def render_engineering_panels_png(x_data: List[float], panels: List[Tuple[List[float], str, str]],
+                                  xlabel: str, support1: float, support2: float) -> bytes:
+    """
+    Stack several diagrams, given as (y_data, title, ylabel), in one matplotlib figure with a shared x axis
+    """
+    figure = _figure((10, 3 * len(panels)))
+    axes = figure.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+    for ax, (y_data, title, ylabel) in zip(axes, panels):
+        ax.plot(x_data, y_data, 'b-', linewidth=2)
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_ylabel(ylabel, fontsize=12)
+        ax.axhline(0, color='red', linestyle='-', alpha=0.7)
+        ax.axvline(support1, color='green', linestyle='--', alpha=0.7, label='Support 1')
+        ax.axvline(support2, color='black', linestyle='--', alpha=0.7, label='Support 2')
+        ax.grid(True, alpha=0.3)
+    axes[0].legend()
+    axes[-1].set_xlabel(xlabel, fontsize=12)
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    return buffer.getvalue()
+
+# Plot renderers by name: fast (PIL, the default) and matplotlib (high fidelity)
+PLOT_RENDERERS = {
+    "fast": render_plot_png,
+    "matplotlib": render_engineering_plot_png,
+}
+DEFAULT_PLOT_RENDERER = "fast"
+
+# Stacked multi-panel renderers, by the same names
+PANEL_RENDERERS = {
+    "fast": render_plot_panels_png,
+    "matplotlib": render_engineering_panels_png,
+}
+
+def render_plots(renderer: str, x_data: List[float], panels: List[Tuple[List[float], str, str]],
+                 xlabel: str, support1: float, support2: float) -> List[bytes]:
+    """Render several diagrams, given as (y_data, title, ylabel), as separate PNG images in one call"""
+    render = PLOT_RENDERERS[renderer]
+    return [render(x_data, y_data, title, xlabel, ylabel, support1, support2) for y_data, title, ylabel in panels]
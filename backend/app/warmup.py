@@ -0,0 +1,26 @@
+from .calculations import solve_beam, ENGINES
+from .fem import solve_beam_fe
+from .visualization import render_beam_png, render_beam_svg, render_plots, PANEL_RENDERERS, PLOT_RENDERERS
+
+# A small beam with every load type, solved and drawn once by warm_up
+WARMUP_LOADS = ([[300.0, 3.0]], [[-1000.0, 5.0]], [[-200.0, 1.0, 4.0]], [[300.0, 6.0, 9.0]])
+WARMUP_BEAM = (1.0, 9.0, 10.0)  # support1, support2, length
+
+def warm_up() -> None:
+    """
+    Solve and render a small beam once with every engine and renderer in this process
+    Runs as the initializer of each compute worker when BEAM_WARMUP is set, so that the imports
+    (matplotlib, scipy), font loading and first calls happen at startup instead of in the first
+    requests.
+    """
+    a, b, length = WARMUP_BEAM
+    for engine in ENGINES:
+        solution = solve_beam(*WARMUP_LOADS, a, b, length, engine=engine)
+    solve_beam_fe(*WARMUP_LOADS, [(a, "pinned"), (5.0, "pinned"), (b, "roller")], length)
+
+    render_beam_png(length, a, b, *WARMUP_LOADS)
+    render_beam_svg(length, a, b, *WARMUP_LOADS)
+    panels = [(solution.shear_force, "Shear Force", "V"), (solution.bending_moment, "Bending Moment", "M")]
+    for renderer in PLOT_RENDERERS:
+        render_plots(renderer, solution.x, panels[:1], "x", a, b)
+        PANEL_RENDERERS[renderer](solution.x, panels, "x", a, b)
@@ -0,0 +1,108 @@
+"""End-to-end benchmarks that replay the frontend's requests against the app in-process"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.cache import analysis_cache, image_cache
+
+BEAM_PROPERTIES = {"length": 10.0, "support1": 1.0, "support2": 9.0}
+LOADS = [
+    ("Point Moment", {"magnitude": 300, "location": 3.0}),
+    ("Point Force", {"magnitude": -1000, "location": 5.0}),
+    ("Constant Force Profile", {"magnitude": -200, "start_location": 1.0, "end_location": 4.0}),
+    ("Triangular Force Profile", {"magnitude": 300, "start_location": 6.0, "end_location": 9.0}),
+]
+PLOT_TYPES = ["shear", "moment", "slope", "deflection"]
+
+@pytest.fixture(scope="module")
+def client():
+    # Entering the client runs the lifespan, which shuts the compute workers down afterwards
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="module")
+def session_id(client):
+    session_id = client.post("/api/session/create").json()["session_id"]
+    client.post(f"/api/session/{session_id}/beam-properties", json=BEAM_PROPERTIES)
+    for load_type, load_data in LOADS:
+        client.post(f"/api/session/{session_id}/loads/add", json={"load_type": load_type, "load_data": load_data})
+    return session_id
+
+def clear_caches():
+    analysis_cache.clear()
+    image_cache.clear()
+
+def calculate_and_plot(client, session_id):
+    """Calculate, then fetch the beam schematic and each of the four diagrams"""
+    assert client.post(f"/api/session/{session_id}/calculate").status_code == 200
+    assert client.get(f"/api/session/{session_id}/beam-image").status_code == 200
+    for plot_type in PLOT_TYPES:
+        assert client.get(f"/api/session/{session_id}/plot/{plot_type}").status_code == 200
+
+def calculate_and_plots(client, session_id):
+    """Calculate, then fetch the SVG schematic and all four diagrams in one /plots request"""
+    assert client.post(f"/api/session/{session_id}/calculate").status_code == 200
+    assert client.get(f"/api/session/{session_id}/beam-image", params={"format": "svg"}).status_code == 200
+    assert client.get(f"/api/session/{session_id}/plots").status_code == 200
+
+@pytest.mark.benchmark(group="frontend sequence")
+@pytest.mark.parametrize("sequence", [calculate_and_plot, calculate_and_plots], ids=["four plots", "plots"])
+def test_cold_sequence(benchmark, client, session_id, sequence):
+    # Every round starts from empty result caches, as after a change to the beam or its loads
+    benchmark.pedantic(sequence, args=(client, session_id), setup=clear_caches, rounds=10, warmup_rounds=1)
+
+@pytest.mark.benchmark(group="frontend sequence")
+@pytest.mark.parametrize("sequence", [calculate_and_plot, calculate_and_plots], ids=["four plots", "plots"])
+def test_cached_sequence(benchmark, client, session_id, sequence):
+    sequence(client, session_id)
+    benchmark(sequence, client, session_id)
+
+@pytest.mark.benchmark(group="frontend sequence")
+def test_edit_sequence(benchmark, client):
+    # A new session per round: create, set the beam, add the loads, then calculate and plot
+    def edit_and_plot():
+        session_id = client.post("/api/session/create").json()["session_id"]
+        client.post(f"/api/session/{session_id}/beam-properties", json=BEAM_PROPERTIES)
+        for load_type, load_data in LOADS:
+            client.post(f"/api/session/{session_id}/loads/add", json={"load_type": load_type, "load_data": load_data})
+        calculate_and_plots(client, session_id)
+        client.delete(f"/api/session/{session_id}")
+
+    benchmark.pedantic(edit_and_plot, setup=clear_caches, rounds=10, warmup_rounds=1)
+
+@pytest.fixture(scope="module")
+def large_session_id(client):
+    # 5000 point forces and 1000 profiles, imported in one request
+    rows = ["load_type,magnitude,location,start_location,end_location"]
+    rows += [f"Point Force,{-i % 97},{i * 9.99 / 5000:.5f},," for i in range(5000)]
+    rows += [f"Constant Force Profile,{-i % 13},,{i * 0.009:.4f},{i * 0.009 + 1:.4f}" for i in range(1000)]
+    session_id = client.post("/api/session/create").json()["session_id"]
+    client.post(f"/api/session/{session_id}/beam-properties", json=BEAM_PROPERTIES)
+    response = client.post(f"/api/session/{session_id}/loads/import", content="\n".join(rows).encode(),
+                           headers={"Content-Type": "text/csv"})
+    assert response.json()["imported"] == 6000
+    return session_id
+
+@pytest.mark.benchmark(group="large session")
+def test_large_session_calculate(benchmark, client, large_session_id):
+    # Key, solve and serialize 6000 loads from the session's load store; setting the beam again
+    # drops the accumulated results, so every round is a full solve
+    def reset():
+        clear_caches()
+        client.post(f"/api/session/{large_session_id}/beam-properties", json=BEAM_PROPERTIES)
+
+    def calculate():
+        assert client.post(f"/api/session/{large_session_id}/calculate").status_code == 200
+
+    benchmark.pedantic(calculate, setup=reset, rounds=5, warmup_rounds=1)
+
+@pytest.mark.benchmark(group="large session")
+def test_large_session_add_load(benchmark, client, large_session_id):
+    # One sorted insert into 5000 point forces, applied to the accumulated results
+    client.post(f"/api/session/{large_session_id}/calculate")
+    load = {"load_type": "Point Force", "load_data": {"magnitude": -1.0, "location": 4.321}}
+    benchmark(client.post, f"/api/session/{large_session_id}/loads/add", json=load)
@@ -0,0 +1,101 @@
+"""Benchmarks of the calculation engine: full analyses, fine grids and the numerical integrators"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.calculations import (
+    calculate_structural_analysis, solve_beam_batch, solve_beam_chunks, solve_beam_adaptive,
+    moving_load_sweep, integral, moment_calculation, gauss_legendre, square, ENGINES,
+    integrate_slope_and_deflection, INTEGRATION_RULES, KERNEL_BACKENDS
+)
+from app import fem
+
+LOAD_COUNTS = [1, 10, 100, 1000]
+GRID_SIZES = [1001, 10001, 100001]
+
+@pytest.mark.benchmark(group="calculate_structural_analysis")
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("count", LOAD_COUNTS)
+def test_structural_analysis(benchmark, make_loads, count, engine):
+    loads = make_loads(count)
+
+    def fresh_inputs():
+        # calculate_structural_analysis sorts and extends its load lists in place
+        return tuple([row[:] for row in rows] for rows in loads) + (1.0, 9.0, 10.0), {"engine": engine}
+
+    benchmark.pedantic(calculate_structural_analysis, setup=fresh_inputs, rounds=20)
+
+@pytest.mark.benchmark(group="kernel backends")
+@pytest.mark.parametrize("backend", list(KERNEL_BACKENDS))
+@pytest.mark.parametrize("stations", GRID_SIZES[:2])
+def test_kernel_backend(benchmark, make_loads, stations, backend):
+    f1, f2, f3, f4 = (sorted(rows, key=lambda x: x[1]) for rows in make_loads(100))
+    l = np.linspace(0.0, 10.0, stations)
+    kernels = KERNEL_BACKENDS[backend]
+
+    def walk():
+        kernels.shear_force(f2, f3, f4, l, l[1] - l[0])
+        kernels.bending_moment(f1, f2, f3, f4, l, l[1] - l[0])
+
+    benchmark(walk)
+
+@pytest.mark.benchmark(group="grid size")
+@pytest.mark.parametrize("stations", GRID_SIZES)
+def test_batch_grid(benchmark, make_loads, stations):
+    problem = make_loads(100) + (1.0, 9.0, 10.0, 1.0, 1.0)
+    benchmark(solve_beam_batch, [problem], stations)
+
+@pytest.mark.benchmark(group="grid size")
+@pytest.mark.parametrize("stations", GRID_SIZES)
+def test_chunked_grid(benchmark, make_loads, stations):
+    loads = make_loads(100)
+    benchmark(lambda: sum(len(chunk.x) for chunk in solve_beam_chunks(*loads, 1.0, 9.0, 10.0, stations=stations)))
+
+@pytest.mark.benchmark(group="grid size")
+def test_adaptive_grid(benchmark, make_loads):
+    benchmark(solve_beam_adaptive, *make_loads(100), 1.0, 9.0, 10.0)
+
+@pytest.mark.benchmark(group="finite elements")
+@pytest.mark.parametrize("banded", [True, False], ids=["banded", "block thomas"])
+@pytest.mark.parametrize("spans", [10, 100, 1000])
+def test_fe_nodes(benchmark, spans, banded):
+    if banded and fem.solveh_banded is None:
+        pytest.skip("scipy is not installed")
+    restrained = np.zeros((spans + 1, 2), dtype=bool)
+    restrained[:, 0] = True
+    benchmark(fem.solve_nodes, np.full(spans, 5.0), restrained, np.ones((spans + 1, 2)), banded)
+
+@pytest.mark.benchmark(group="finite elements")
+@pytest.mark.parametrize("spans", [10, 100])
+def test_fe_beam(benchmark, make_loads, spans):
+    length = 5.0 * spans
+    supports = [(5.0 * i, "fixed" if i == 0 else "roller") for i in range(spans + 1)]
+    loads = make_loads(100, length)
+    benchmark(fem.solve_beam_fe, *loads, supports, length)
+
+@pytest.mark.benchmark(group="moving load")
+def test_moving_load_sweep(benchmark):
+    benchmark(moving_load_sweep, 1.0, 9.0, 10.0, [i / 10 for i in range(101)],
+              [-50.0, -100.0, -100.0], [0.0, 1.5, 3.0], 5001)
+
+@pytest.mark.benchmark(group="slope and deflection")
+@pytest.mark.parametrize("rule", INTEGRATION_RULES)
+def test_slope_and_deflection(benchmark, rule):
+    # 100 stacked bending moment diagrams of 10001 stations each
+    BM = np.sin(np.linspace(0, np.pi, 10001)) * np.linspace(1, 2, 100)[:, None]
+    ones = np.ones(100)
+    benchmark(integrate_slope_and_deflection, BM, ones / 1000, ones, 9 * ones, ones, rule)
+
+@pytest.mark.benchmark(group="integration")
+def test_integral(benchmark):
+    benchmark(integral, square, 0.0, 10.0)
+
+@pytest.mark.benchmark(group="integration")
+def test_moment_calculation(benchmark):
+    benchmark(moment_calculation, square, 1.0, 2.0, 8.0)
+
+@pytest.mark.benchmark(group="integration")
+def test_gauss_legendre(benchmark):
+    benchmark(gauss_legendre, square, 0.0, 10.0)
@@ -0,0 +1,51 @@
+"""Benchmarks of the beam schematic and the engineering diagrams"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.calculations import solve_beam
+from app.visualization import (
+    draw_beam, render_beam_svg, create_engineering_plot, render_plots, PLOT_RENDERERS, PANEL_RENDERERS
+)
+
+LOADS = ([[300, 3.0]], [[-1000, 5.0]], [[-200, 1.0, 4.0]], [[300, 6.0, 9.0]])
+
+@pytest.fixture(scope="module")
+def solution():
+    return solve_beam(*LOADS, 1.0, 9.0, 10.0)
+
+def panels(solution):
+    """The four diagrams as (y_data, title, ylabel)"""
+    return [
+        (solution.shear_force, "Shear Force Diagram", "Shear Force (N)"),
+        (solution.bending_moment, "Bending Moment Diagram", "Bending Moment (N-m)"),
+        (solution.slope, "Slope Diagram", "Slope (rad)"),
+        (solution.deflection, "Deflection Diagram", "Deflection (m)"),
+    ]
+
+@pytest.mark.benchmark(group="beam schematic")
+def test_draw_beam(benchmark):
+    benchmark(draw_beam, 10.0, 1.0, 9.0, *LOADS)
+
+@pytest.mark.benchmark(group="beam schematic")
+def test_beam_svg(benchmark):
+    benchmark(render_beam_svg, 10.0, 1.0, 9.0, *LOADS)
+
+@pytest.mark.benchmark(group="create_engineering_plot")
+@pytest.mark.parametrize("renderer", PLOT_RENDERERS)
+def test_engineering_plot(benchmark, solution, renderer):
+    benchmark(
+        create_engineering_plot, solution.x.tolist(), solution.bending_moment.tolist(),
+        "Bending Moment Diagram", "Beam Length (m)", "Bending Moment (N-m)", 1.0, 9.0, renderer
+    )
+
+@pytest.mark.benchmark(group="four diagrams")
+@pytest.mark.parametrize("renderer", PLOT_RENDERERS)
+def test_separate_plots(benchmark, solution, renderer):
+    benchmark(render_plots, renderer, solution.x, panels(solution), "Beam Length (m)", 1.0, 9.0)
+
+@pytest.mark.benchmark(group="four diagrams")
+@pytest.mark.parametrize("renderer", PANEL_RENDERERS)
+def test_stacked_plots(benchmark, solution, renderer):
+    benchmark(PANEL_RENDERERS[renderer], solution.x, panels(solution), "Beam Length (m)", 1.0, 9.0)
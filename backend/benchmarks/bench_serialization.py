@@ -0,0 +1,59 @@
+"""Benchmarks of result encoding: JSON responses, the packed binary layout and streams"""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.encoders import jsonable_encoder
+
+from app.calculations import solve_beam, solve_beam_chunks
+from app.models import AnalysisResults
+from app.serialization import pack_analysis_results, stream_results
+
+@pytest.fixture(scope="module")
+def solution():
+    f1, f2, f3, f4 = [[300, 3.0]], [[-1000, 5.0]], [[-200, 1.0, 4.0]], [[300, 6.0, 9.0]]
+    return solve_beam(f1, f2, f3, f4, 1.0, 9.0, 10.0)
+
+def analysis_results(solution) -> AnalysisResults:
+    """The /calculate response model for a solution"""
+    return AnalysisResults(
+        shear_force=solution.shear_force.tolist(),
+        bending_moment=solution.bending_moment.tolist(),
+        slope=solution.slope.tolist(),
+        deflection=solution.deflection.tolist(),
+        x_coordinates=solution.x.tolist(),
+        max_shear_force=float(np.abs(solution.shear_force).max()),
+        max_bending_moment=float(np.abs(solution.bending_moment).max()),
+        max_deflection=float(np.abs(solution.deflection).max()),
+        max_slope=float(np.abs(solution.slope).max()),
+        reaction_forces=solution.reactions.tolist()
+    )
+
+@pytest.mark.benchmark(group="encode AnalysisResults")
+def test_response_encoding(benchmark, solution):
+    # What FastAPI does with a returned model: jsonable_encoder, then json.dumps
+    benchmark(lambda: json.dumps(jsonable_encoder(analysis_results(solution))).encode())
+
+@pytest.mark.benchmark(group="encode AnalysisResults")
+def test_model_dump_json(benchmark, solution):
+    benchmark(lambda: analysis_results(solution).model_dump_json())
+
+@pytest.mark.benchmark(group="encode AnalysisResults")
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_binary_encoding(benchmark, solution, dtype):
+    benchmark(pack_analysis_results, solution, None, dtype)
+
+@pytest.mark.benchmark(group="stream")
+@pytest.mark.parametrize("stream_format", ["ndjson", "binary"])
+def test_stream_encoding(benchmark, stream_format):
+    f1, f2, f3, f4 = [[300, 3.0]], [[-1000, 5.0]], [[-200, 1.0, 4.0]], [[300, 6.0, 9.0]]
+
+    def stream():
+        chunks = solve_beam_chunks(f1, f2, f3, f4, 1.0, 9.0, 10.0, stations=100001)
+        return sum(len(record) for record in stream_results(chunks, 100001, stream_format))
+
+    benchmark(stream)
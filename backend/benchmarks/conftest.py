@@ -0,0 +1,42 @@
+"""
+Shared setup for the benchmark suite (pytest-benchmark)
+Run from backend/ with: python -m pytest benchmarks
+Every run is saved under backend/.benchmarks so that runs can be compared between commits.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+def random_loads(count: int, length: float = 10.0, seed: int = 0) -> Tuple[List[List[float]], ...]:
+    """count loads (f1, f2, f3, f4) spread evenly over the four load types, the same for a given seed"""
+    rng = np.random.default_rng(seed)
+    magnitudes = rng.uniform(-1000.0, 1000.0, count).tolist()
+    starts = rng.uniform(0.0, 0.8 * length, count).tolist()
+    ends = (np.array(starts) + rng.uniform(0.05, 0.2 * length, count)).tolist()
+    rows = [
+        [magnitudes[i], starts[i]] if i % 4 < 2 else [magnitudes[i], starts[i], ends[i]]
+        for i in range(count)
+    ]
+    return tuple(rows[kind::4] for kind in range(4))
+
+@pytest.fixture
+def make_loads():
+    """random_loads, for benchmarks that build loads of several sizes"""
+    return random_loads
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Save every benchmark run (as if --benchmark-autosave was passed) unless a name was given with
+    # --benchmark-save. Runs of the regular tests, which don't use benchmarks/pytest.ini, save nothing.
+    in_suite = config.inipath is not None and config.inipath.parent == Path(__file__).parent
+    if in_suite and config.pluginmanager.hasplugin("benchmark") and not config.getoption("benchmark_save"):
+        from pytest_benchmark.utils import get_tag
+        # The same commit/branch/time tag that --benchmark-autosave names its files by
+        config.option.benchmark_autosave = config.option.benchmark_autosave or get_tag()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Production server: several uvicorn worker processes, no reload, optional warm-up
+"""
+import argparse
+import os
+
+import uvicorn
+
+from app.executor import available_cores
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Beam Analysis API with multiple worker processes")
+    parser.add_argument("--host", default=os.environ.get("BEAM_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("BEAM_PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("BEAM_SERVER_WORKERS", "0")) or available_cores(),
+        help="uvicorn worker processes (BEAM_SERVER_WORKERS, default: available cores)"
+    )
+    parser.add_argument(
+        "--warmup", action="store_true", default=os.environ.get("BEAM_WARMUP", "") not in ("", "0"),
+        help="start and warm every compute worker before serving (BEAM_WARMUP)"
+    )
+    parser.add_argument("--log-level", default=os.environ.get("BEAM_LOG_LEVEL", "info"))
+    args = parser.parse_args()
+
+    # Worker processes inherit this environment. Each runs its own compute pool, so the cores are
+    # shared out between them, and sessions must live in the shared SQLite store.
+    os.environ.setdefault("BEAM_WORKERS", str(max(1, available_cores() // args.workers)))
+    if args.workers > 1:
+        os.environ.setdefault("BEAM_SESSION_STORE", "sqlite")
+    if args.warmup:
+        os.environ["BEAM_WARMUP"] = "1"
+
+    # The app is given as an import string: this process only supervises the workers, and the
+    # compute processes spawned by each worker re-import this script, not the app
+    uvicorn.run(
+        "app.main:app", host=args.host, port=args.port, workers=args.workers,
+        log_level=args.log_level, access_log=False
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,950 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the API endpoints work correctly
+This can be run independently to exercise the FastAPI application in-process
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import io
+import json
+import pstats
+import sqlite3
+import subprocess
+import tempfile
+import time
+import uuid
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import httpx
+from fastapi.testclient import TestClient
+from PIL import Image
+from app.main import app, _session_problem
+from app.cache import analysis_cache, image_cache
+from app.executor import ComputeExecutor, ExecutorSaturated, TaskTimeout, compute_executor
+from app.metrics import Histogram
+from app.profiling import ProfilingMiddleware, RequestProfiler, decode_task
+from app.models import BeamSession
+from app.load_store import LoadStore
+from app.load_io import read_load_table, LoadTableTooLarge, MAX_IMPORT_ROWS
+from app.calculations import solve_beam, DEFAULT_KERNEL_BACKEND
+from app.warmup import warm_up
+from app.session_manager import session_manager
+from app.session_store import MemorySessionStore, SQLiteSessionStore
+from app.visualization import render_plot_png, render_engineering_plot_png
+from app.serialization import unpack_analysis_results, unpack_batch_results, unpack_frames
+
+client = TestClient(app)
+
+def create_session(beam_properties, loads):
+    """Create a session with beam properties and loads, return its ID"""
+    session_id = client.post("/api/session/create").json()["session_id"]
+    client.post(f"/api/session/{session_id}/beam-properties", json=beam_properties)
+    for load_type, load_data in loads:
+        response = client.post(
+            f"/api/session/{session_id}/loads/add",
+            json={"load_type": load_type, "load_data": load_data}
+        )
+        assert response.status_code == 200, response.text
+    return session_id
+
+def test_analysis_cache():
+    """Test that identical problems share one cached solve across sessions"""
+    print("Testing analysis cache...")
+
+    analysis_cache.clear()
+    beam = {"length": 10.0, "support1": 2.0, "support2": 8.0}
+    loads = [
+        ("Point Force", {"magnitude": -1000, "location": 5.0}),
+        ("Constant Force Profile", {"magnitude": -200, "start_location": 1.0, "end_location": 4.0}),
+    ]
+    first = create_session(beam, loads)
+    second = create_session(beam, list(reversed(loads)))
+
+    before = analysis_cache.stats()
+    results = client.post(f"/api/session/{first}/calculate").json()
+    for plot_type in ("shear", "moment", "slope", "deflection"):
+        assert client.get(f"/api/session/{first}/plot/{plot_type}").status_code == 200
+    assert client.post(f"/api/session/{second}/calculate").json() == results
+    after = client.get("/api/cache/stats").json()["analysis"]
+
+    # One solve for the whole results page (plots reuse the session's results),
+    # and the reordered session reuses it through the cache
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    print("✓ Cache reused across plots and sessions!")
+    return True
+
+def test_image_etag():
+    """Test raw PNG responses and ETag revalidation for cached images"""
+    print("\nTesting image ETags...")
+
+    session_id = create_session(
+        {"length": 6.0, "support1": 0.0, "support2": 5.0},
+        [("Point Moment", {"magnitude": 300, "location": 3.0})]
+    )
+
+    for path in ("beam-image", "plot/moment"):
+        url = f"/api/session/{session_id}/{path}"
+        response = client.get(url, params={"format": "png"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content.startswith(b"\x89PNG")
+
+        tag = response.headers["etag"]
+        revalidated = client.get(url, headers={"Accept": "image/png", "If-None-Match": tag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+        # The frontend keeps receiving base64 data URLs by default
+        assert client.get(url).json()["image"].startswith("data:image/png;base64,")
+
+    assert client.get(f"/api/session/{session_id}/plot/torsion").status_code == 400
+
+    print("✓ Images revalidate with 304!")
+    return True
+
+def test_batch_analysis():
+    """Test the batch endpoint against per-session calculations"""
+    print("\nTesting batch analysis...")
+
+    beam = {"length": 10.0, "support1": 2.0, "support2": 8.0, "modulus_of_elasticity": 200e9, "second_moment_of_area": 1e-4}
+    problems = [
+        {"beam_properties": beam, "point_forces": [{"magnitude": -1000 * i, "location": 5.0}]}
+        for i in range(1, 4)
+    ]
+    problems.append({
+        "beam_properties": {"length": 12.0, "support1": 3.0, "support2": 9.0},
+        "point_moments": [{"magnitude": 500, "location": 6.0}],
+        "triangular_force_profiles": [{"magnitude": 300, "start_location": 7.0, "end_location": 10.0}],
+    })
+
+    response = client.post("/api/analyze/batch", json={"problems": problems})
+    assert response.status_code == 200, response.text
+    batch = response.json()
+    assert batch["lengths"] == [10.0, 10.0, 10.0, 12.0]
+
+    for index, problem in enumerate(problems):
+        loads = [("Point Force", load) for load in problem.get("point_forces", [])]
+        loads += [("Point Moment", load) for load in problem.get("point_moments", [])]
+        loads += [("Triangular Force Profile", load) for load in problem.get("triangular_force_profiles", [])]
+        session_id = create_session(problem["beam_properties"], loads)
+        single = client.post(f"/api/session/{session_id}/calculate").json()
+        for field in ("shear_force", "bending_moment", "slope", "deflection", "reaction_forces"):
+            assert np.allclose(batch[field][index], single[field], rtol=1e-9, atol=1e-12), field
+
+    invalid = {"beam_properties": beam, "point_forces": [{"magnitude": 1, "location": 11.0}]}
+    response = client.post("/api/analyze/batch", json={"problems": [problems[0], invalid]})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Problem 1:")
+
+    # The packed binary layout carries the same results
+    response = client.post("/api/analyze/batch", json={"problems": problems}, headers={"Accept": "application/octet-stream"})
+    packed = unpack_batch_results(response.content)
+    assert packed["problems"] == 4 and packed["bending_moment"].shape == (4, 1001)
+    for field in ("lengths", "shear_force", "slope", "max_deflection", "reaction_forces"):
+        assert np.array_equal(packed[field], batch[field]), field
+
+    # The total size is bounded, not only problems and stations on their own
+    response = client.post("/api/analyze/batch", json={"problems": [problems[0]] * 1000, "stations": 20001})
+    assert response.status_code == 422
+
+    print("✓ Batch results match individual sessions!")
+    return True
+
+def test_load_combinations():
+    """Test superposed load combinations against factored direct solves"""
+    print("\nTesting load combinations...")
+
+    beam = {"length": 10.0, "support1": 1.0, "support2": 9.0}
+    dead = ("Constant Force Profile", {"magnitude": -200, "start_location": 0.0, "end_location": 10.0, "group": "D"})
+    live = ("Point Force", {"magnitude": -1000, "location": 4.0, "group": "L"})
+    wind = ("Point Moment", {"magnitude": 300, "location": 6.0, "group": "W"})
+    session_id = create_session(beam, [dead, live, wind])
+
+    combinations = [
+        {"name": "1.4D", "factors": {"D": 1.4}},
+        {"name": "1.2D + 1.6L", "factors": {"D": 1.2, "L": 1.6}},
+        {"name": "1.2D + L + W", "factors": {"D": 1.2, "L": 1.0, "W": 1.0}},
+    ]
+    response = client.post(
+        f"/api/session/{session_id}/combinations",
+        json={"combinations": combinations, "include_diagrams": True}
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()
+
+    def factored(load, factor):
+        load_type, load_data = load
+        return load_type, {**load_data, "magnitude": load_data["magnitude"] * factor}
+
+    direct = []
+    for loads in ([factored(dead, 1.4)],
+                  [factored(dead, 1.2), factored(live, 1.6)],
+                  [factored(dead, 1.2), live, wind]):
+        direct.append(client.post(f"/api/session/{create_session(beam, loads)}/calculate").json())
+
+    for index, expected in enumerate(direct):
+        assert np.allclose(results["diagrams"]["bending_moment"][index], expected["bending_moment"])
+        assert np.allclose(results["reaction_forces"][index], expected["reaction_forces"])
+        assert np.isclose(results["max_deflection"][index], expected["max_deflection"])
+
+    moments = np.array([expected["bending_moment"] for expected in direct])
+    assert np.allclose(results["envelope"]["bending_moment"]["max"], moments.max(axis=0))
+    assert np.allclose(results["envelope"]["bending_moment"]["min"], moments.min(axis=0))
+
+    too_many = {"combinations": [{"name": str(index), "factors": {"D": 1.0}} for index in range(1001)]}
+    assert client.post(f"/api/session/{session_id}/combinations", json=too_many).status_code == 422
+
+    print("✓ Combinations match factored solves!")
+    return True
+
+def test_incremental_loads():
+    """Test incremental load edits against full recalculation"""
+    print("\nTesting incremental load edits...")
+
+    beam = {"length": 12.0, "support1": 3.0, "support2": 9.0}
+    session_id = create_session(beam, [("Point Moment", {"magnitude": 500, "location": 6.0})])
+    client.post(f"/api/session/{session_id}/calculate")
+
+    load_ids = []
+    for load_type, load_data in (
+        ("Point Force", {"magnitude": 800, "location": 4.0}),
+        ("Constant Force Profile", {"magnitude": 200, "start_location": 1.0, "end_location": 3.0}),
+        ("Triangular Force Profile", {"magnitude": 300, "start_location": 7.0, "end_location": 10.0}),
+    ):
+        response = client.post(
+            f"/api/session/{session_id}/loads/add",
+            json={"load_type": load_type, "load_data": load_data}
+        )
+        load_ids.append(response.json()["load_id"])
+
+    assert client.delete(f"/api/session/{session_id}/loads/{load_ids[1]}").status_code == 200
+    assert client.delete(f"/api/session/{session_id}/loads/{load_ids[1]}").status_code == 404
+    incremental = client.post(f"/api/session/{session_id}/calculate").json()
+
+    fresh_id = create_session(beam, [
+        ("Point Moment", {"magnitude": 500, "location": 6.0}),
+        ("Point Force", {"magnitude": 800, "location": 4.0}),
+        ("Triangular Force Profile", {"magnitude": 300, "start_location": 7.0, "end_location": 10.0}),
+    ])
+    fresh = client.post(f"/api/session/{fresh_id}/calculate", params={"engine": "vectorized"}).json()
+    for field in ("shear_force", "bending_moment", "slope", "deflection", "reaction_forces"):
+        assert np.allclose(incremental[field], fresh[field], rtol=1e-9, atol=1e-9), field
+
+    # A load whose response can't be solved (busy executor) is not stored, and results stay right
+    url = f"/api/session/{session_id}/loads/add"
+    new_load = {"load_type": "Point Force", "load_data": {"magnitude": -1234.5, "location": 5.0}}
+    max_pending = compute_executor.max_pending
+    compute_executor.max_pending = 0
+    try:
+        assert client.post(url, json=new_load).status_code == 429
+    finally:
+        compute_executor.max_pending = max_pending
+    assert len(client.get(f"/api/session/{session_id}/loads").json()["point_forces"]) == 1
+    after = client.post(f"/api/session/{session_id}/calculate").json()
+    assert np.allclose(after["bending_moment"], fresh["bending_moment"], rtol=1e-9, atol=1e-9)
+
+    # A calculation while an add is being solved sees the loads as they were, and the next one the new load
+    async def add_during_calculation():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_client:
+            added, during = await asyncio.gather(
+                async_client.post(url, json=new_load), async_client.post(f"/api/session/{session_id}/calculate")
+            )
+            return added, during.json(), (await async_client.post(f"/api/session/{session_id}/calculate")).json()
+
+    added, during, after = asyncio.run(add_during_calculation())
+    assert added.status_code == 200
+    assert np.allclose(during["bending_moment"], fresh["bending_moment"], rtol=1e-9, atol=1e-9)
+    fresh_id = create_session(beam, [
+        ("Point Moment", {"magnitude": 500, "location": 6.0}),
+        ("Point Force", {"magnitude": 800, "location": 4.0}),
+        ("Point Force", new_load["load_data"]),
+        ("Triangular Force Profile", {"magnitude": 300, "start_location": 7.0, "end_location": 10.0}),
+    ])
+    fresh = client.post(f"/api/session/{fresh_id}/calculate", params={"engine": "vectorized"}).json()
+    for field in ("shear_force", "bending_moment", "slope", "deflection", "reaction_forces"):
+        assert np.allclose(after[field], fresh[field], rtol=1e-9, atol=1e-9), field
+
+    print("✓ Incremental results match a full solve!")
+    return True
+
+def test_binary_results():
+    """Test the packed binary response against the JSON response"""
+    print("\nTesting binary results...")
+
+    session_id = create_session(
+        {"length": 8.0, "support1": 1.0, "support2": 7.0},
+        [("Constant Force Profile", {"magnitude": 500, "start_location": 2.0, "end_location": 6.0})]
+    )
+    url = f"/api/session/{session_id}/calculate"
+    binary = {"Accept": "application/octet-stream"}
+
+    for params in ({}, {"grid": "adaptive"}):
+        expected = client.post(url, params=params).json()
+        for dtype, tolerance in (("float64", 0), ("float32", 1e-6)):
+            response = client.post(url, params={**params, "dtype": dtype}, headers=binary)
+            assert response.headers["content-type"] == "application/octet-stream"
+            results = unpack_analysis_results(response.content)
+            for field in ("x_coordinates", "shear_force", "bending_moment", "slope", "deflection"):
+                assert np.allclose(results[field], expected[field], rtol=tolerance, atol=0), field
+            assert results["reaction_forces"] == expected["reaction_forces"]
+            assert results["peaks"] == expected["peaks"]
+
+    # Columns travel without JSON float formatting
+    assert len(client.post(url, headers=binary).content) < len(client.post(url).content) / 2
+
+    print("✓ Binary results match JSON!")
+    return True
+
+def test_compute_executor():
+    """Test executor timeouts, backpressure and the 429 response"""
+    print("\nTesting compute executor...")
+
+    executor = ComputeExecutor(workers=1, max_pending=1, timeout=30)
+
+    async def exercise():
+        assert await executor.run(abs, -2) == 2  # starts the worker
+        executor.timeout = 0.2
+        try:
+            await executor.run(time.sleep, 1.0)
+            assert False, "expected a timeout"
+        except TaskTimeout:
+            pass
+        # The timed out task still occupies the only slot until it finishes
+        try:
+            await executor.run(abs, -3)
+            assert False, "expected backpressure"
+        except ExecutorSaturated:
+            pass
+        await asyncio.sleep(1.0)
+        executor.timeout = 30
+        assert await executor.run(abs, -4) == 4
+
+    try:
+        asyncio.run(exercise())
+        assert executor.stats()["timeouts"] == 1 and executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
+
+    session_id = create_session(
+        {"length": 9.0, "support1": 0.0, "support2": 9.0 - 1e-3},
+        [("Point Force", {"magnitude": 123.0, "location": 4.5})]
+    )
+    max_pending = compute_executor.max_pending
+    compute_executor.max_pending = 0
+    try:
+        response = client.post(f"/api/session/{session_id}/calculate")
+    finally:
+        compute_executor.max_pending = max_pending
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert client.post(f"/api/session/{session_id}/calculate").status_code == 200
+
+    print("✓ Executor applies timeouts and backpressure!")
+    return True
+
+def test_session_stores():
+    """Test TTL and LRU limits of both session stores, and the API on the shared store"""
+    print("\nTesting session stores...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        now = [0.0]
+        for store in (MemorySessionStore(3, ttl=10, clock=lambda: now[0]),
+                      SQLiteSessionStore(path, 3, ttl=10, clock=lambda: now[0])):
+            now[0] = 0.0
+            for name in "abcd":
+                now[0] += 1
+                store.put(BeamSession(session_id=name))
+            assert store.get("a") is None and len(store) == 3  # least recently used
+            now[0] += 1
+            assert store.get("b") is not None  # b is used, so c is evicted next
+            store.put(BeamSession(session_id="e"))
+            assert store.get("c") is None and store.get("b") is not None
+            now[0] += 9.5
+            assert store.get("d") is None and store.get("e") is not None  # d idle too long
+            assert store.stats()["evicted"] == 2 and store.delete("e") and not store.delete("e")
+
+        # Updates from several workers at once are applied one after the other, none is lost
+        workers = [SQLiteSessionStore(path, 100, ttl=60) for _ in range(2)]
+        workers[0].put(BeamSession(session_id="shared"))
+
+        def add_loads(worker):
+            for index in range(20):
+                workers[worker].update(
+                    "shared", lambda session: session.loads.add(1, [1.0, float(index)], "default", uuid.uuid4().hex)
+                )
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(add_loads, [0, 1, 0, 1]))
+        assert len(workers[1].get("shared").loads) == 80
+        assert workers[0].update("missing", lambda session: None) is None
+
+        # Workers share sessions through the database file
+        store = session_manager.store
+        session_manager.store = SQLiteSessionStore(path, 100, ttl=60)
+        try:
+            session_id = create_session(
+                {"length": 10.0, "support1": 0.0, "support2": 10.0 - 1e-3},
+                [("Point Force", {"magnitude": 1000, "location": 5.0}),
+                 ("Point Moment", {"magnitude": 200, "location": 2.0})]
+            )
+            other_worker = SQLiteSessionStore(path, 100, ttl=60).get(session_id)
+            assert len(other_worker.loads.values[1]) == 1 and other_worker.beam_properties.length == 10.0
+
+            results = client.post(f"/api/session/{session_id}/calculate").json()
+            load_id = client.get(f"/api/session/{session_id}/loads").json()["point_moments"][0]["load_id"]
+            assert client.delete(f"/api/session/{session_id}/loads/{load_id}").status_code == 200
+            assert client.get(f"/api/session/{session_id}/loads").json()["point_moments"] == []
+            removed = client.post(f"/api/session/{session_id}/calculate").json()
+            assert not np.allclose(removed["bending_moment"], results["bending_moment"])
+            # A session read waiting on another worker's write lock leaves the event loop free
+            async def contended():
+                blocker = sqlite3.connect(path, isolation_level=None)
+                blocker.execute("BEGIN IMMEDIATE")
+                read = asyncio.create_task(session_manager.get_session(session_id))
+                await asyncio.sleep(0.2)
+                assert not read.done()
+                blocker.execute("COMMIT")
+                blocker.close()
+                return await read
+
+            assert asyncio.run(contended()).session_id == session_id
+
+            assert client.delete(f"/api/session/{session_id}").status_code == 200
+            assert client.get(f"/api/session/{session_id}/loads").status_code == 404
+        finally:
+            session_manager.store = store
+
+    print("✓ Session stores expire, evict and share sessions!")
+    return True
+
+def test_load_store():
+    """Test the columnar load store: sorted inserts, snapshots, removal and session serialization"""
+    print("\nTesting load store...")
+
+    store = LoadStore()
+    for index, location in enumerate([5.0, 1.0, 9.0, 1.0]):
+        store.add(1, [-100.0 * (index + 1), location], "L" if index % 2 else "D", f"{index:032d}")
+    forces = store.rows()[1]
+    assert forces is store.values[1] and not forces.flags.writeable
+    assert forces.tolist() == [[-200.0, 1.0], [-400.0, 1.0], [-100.0, 5.0], [-300.0, 9.0]]
+
+    # Edits replace the arrays, so rows handed out earlier are a snapshot
+    store.extend(1, np.array([[50.0, 7.0], [60.0, 0.5]]), ["D", "W"], ["a" * 32, "b" * 32])
+    assert len(forces) == 4 and store.values[1][:, 1].tolist() == [0.5, 1.0, 1.0, 5.0, 7.0, 9.0]
+    kind, row, group = store.remove(f"{2:032d}")
+    assert (kind, row.tolist(), group) == (1, [-300.0, 9.0], "D") and store.remove(f"{2:032d}") is None
+    assert store.group_labels() == ["W", "L", "L", "D", "D"]
+    assert store.records(1)[0] == {"magnitude": 60.0, "location": 0.5, "group": "W", "load_id": "b" * 32}
+
+    # Sessions are stored as the columnar dict; sessions stored as load model lists still load
+    session = BeamSession(session_id="s", loads=store)
+    restored = BeamSession.model_validate_json(session.model_dump_json())
+    assert restored.loads.records(1) == store.records(1) and restored.loads.values[1].dtype == np.float64
+    legacy = BeamSession.model_validate({"session_id": "s", "constant_force_profiles": [
+        {"magnitude": -5.0, "start_location": 4.0, "end_location": 6.0, "load_id": "c" * 32},
+        {"magnitude": -2.0, "start_location": 1.0, "end_location": 3.0, "group": "L", "load_id": "d" * 32},
+    ]})
+    assert legacy.loads.values[2].tolist() == [[-2.0, 1.0, 3.0], [-5.0, 4.0, 6.0]]
+    assert legacy.loads.group_labels() == ["L", "default"]
+
+    # A few dozen bytes per load
+    many = LoadStore()
+    many.extend(1, np.column_stack([np.ones(10000), np.linspace(0, 9, 10000)]), ["D"] * 10000, ["e" * 32] * 10000)
+    assert many.nbytes <= 10000 * (16 + 32 + 4)
+
+    # The API lists loads in location order and solves the same as unsorted lists
+    beam = {"length": 10.0, "support1": 1.0, "support2": 9.0}
+    loads = [("Point Force", {"magnitude": -1000, "location": 7.0}),
+             ("Point Force", {"magnitude": 500, "location": 2.0, "group": "L"}),
+             ("Triangular Force Profile", {"magnitude": 300, "start_location": 6.0, "end_location": 9.0}),
+             ("Triangular Force Profile", {"magnitude": -100, "start_location": 0.0, "end_location": 3.0})]
+    session_id = create_session(beam, loads)
+    listed = client.get(f"/api/session/{session_id}/loads").json()
+    assert [load["location"] for load in listed["point_forces"]] == [2.0, 7.0]
+    assert listed["point_forces"][0]["group"] == "L" and len(listed["point_forces"][0]["load_id"]) == 32
+    assert [load["start_location"] for load in listed["triangular_force_profiles"]] == [0.0, 6.0]
+    results = client.post(f"/api/session/{session_id}/calculate").json()
+    solution = solve_beam([], [[-1000, 7.0], [500, 2.0]], [], [[300, 6.0, 9.0], [-100, 0.0, 3.0]], 1.0, 9.0, 10.0)
+    assert np.allclose(results["bending_moment"], solution.bending_moment, rtol=1e-12, atol=1e-9)
+
+    print("✓ Loads are stored as sorted columns!")
+    return True
+
+def test_plot_renderers():
+    """Test the fast plot renderer against the matplotlib fallback"""
+    print("\nTesting plot renderers...")
+
+    x = np.linspace(0, 10, 1001)
+    moment = -1000 * np.minimum(x, 10 - x)
+    arguments = (x, moment, "Bending Moment Diagram", "Beam Length (m)", "Bending Moment (N⋅m)", 2.0, 8.0)
+
+    timings = {}
+    for render in (render_plot_png, render_engineering_plot_png):
+        render(*arguments)
+        start = time.perf_counter()
+        png = render(*arguments)
+        timings[render] = time.perf_counter() - start
+        assert png.startswith(b"\x89PNG")
+    assert timings[render_plot_png] < timings[render_engineering_plot_png] / 3
+
+    image = Image.open(io.BytesIO(render_plot_png(*arguments))).convert("RGB")
+    assert image.size == (1000, 600)
+    colors = {color for _, color in image.getcolors(1 << 16)}
+    assert (0, 0, 255) in colors and (255, 77, 77) in colors  # curve and zero line
+
+    # Plots rendered concurrently are identical to serial ones
+    with ThreadPoolExecutor(4) as pool:
+        renders = list(pool.map(lambda _: render_plot_png(*arguments), range(8)))
+    assert all(png == renders[0] for png in renders)
+
+    session_id = create_session(
+        {"length": 6.0, "support1": 1.0, "support2": 5.0},
+        [("Point Force", {"magnitude": 500, "location": 3.0})]
+    )
+    url = f"/api/session/{session_id}/plot/shear"
+    fast = client.get(url, params={"format": "png"})
+    fallback = client.get(url, params={"format": "png", "renderer": "matplotlib"})
+    assert fast.status_code == fallback.status_code == 200
+    assert fast.headers["etag"] != fallback.headers["etag"]
+    assert client.get(url, params={"renderer": "svg"}).status_code == 400
+
+    print("✓ Fast renderer matches the fallback's content!")
+    return True
+
+def test_combined_plots():
+    """Test that /plots returns all four diagrams and the maxima from one solve"""
+    print("\nTesting combined plots...")
+
+    session_id = create_session(
+        {"length": 7.0, "support1": 0.5, "support2": 6.5},
+        [("Triangular Force Profile", {"magnitude": -400, "start_location": 1.0, "end_location": 5.0})]
+    )
+    analysis_before, images_before = analysis_cache.stats(), image_cache.stats()
+    response = client.get(f"/api/session/{session_id}/plots")
+    assert response.status_code == 200, response.text
+    plots = response.json()
+    assert sorted(plots["images"]) == ["deflection", "moment", "shear", "slope"]
+    assert all(image.startswith("data:image/png;base64,") for image in plots["images"].values())
+    assert analysis_cache.stats()["misses"] - analysis_before["misses"] == 1
+
+    results = client.post(f"/api/session/{session_id}/calculate").json()
+    for field in ("max_shear_force", "max_bending_moment", "max_deflection", "max_slope", "reaction_forces"):
+        assert plots[field] == results[field], field
+
+    # The single-plot endpoint reuses the images rendered for /plots
+    assert client.get(f"/api/session/{session_id}/plot/moment").json()["image"] == plots["images"]["moment"]
+    assert image_cache.stats()["misses"] - images_before["misses"] == 4
+
+    url = f"/api/session/{session_id}/plots"
+    stacked = client.get(url, params={"layout": "stacked", "format": "png"})
+    assert stacked.headers["content-type"] == "image/png"
+    assert Image.open(io.BytesIO(stacked.content)).size == (1000, 1270)
+    assert client.get(url, params={"layout": "stacked"}, headers={
+        "Accept": "image/png", "If-None-Match": stacked.headers["etag"]
+    }).status_code == 304
+    assert client.get(url, params={"layout": "stacked"}).json()["image"].startswith("data:image/png;base64,")
+    assert client.get(url, params={"format": "png"}).status_code == 400
+    assert client.get(url, params={"layout": "grid"}).status_code == 400
+
+    print("✓ All four diagrams come from one solve!")
+    return True
+
+def test_beam_svg():
+    """Test the vector beam schematic"""
+    print("\nTesting SVG beam schematic...")
+
+    loads = [("Point Moment", {"magnitude": -300, "location": 3.0})]
+    loads += [("Point Force", {"magnitude": (-1) ** i * 100 * i, "location": 0.05 * i}) for i in range(1, 150)]
+    loads += [
+        ("Constant Force Profile", {"magnitude": 200, "start_location": 1.0, "end_location": 4.0}),
+        ("Triangular Force Profile", {"magnitude": -300, "start_location": 6.0, "end_location": 9.0}),
+    ]
+    session_id = create_session({"length": 10.0, "support1": 1.0, "support2": 9.0}, loads)
+    url = f"/api/session/{session_id}/beam-image"
+
+    response = client.get(url, params={"format": "svg"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("image/svg+xml")
+    root = ElementTree.fromstring(response.content)
+    svg = "{http://www.w3.org/2000/svg}"
+    placed = len(root.findall(f".//{svg}use")) - len(root.findall(f"{svg}defs//{svg}use"))
+    assert placed == 2 + 1 + 149 + 2 + 1  # supports, moment, forces, profile ends, triangle end
+    assert len(response.content) < 20 * 1024
+
+    # SVG and PNG are cached separately and both revalidate
+    tag = response.headers["etag"]
+    assert client.get(url, headers={"Accept": "image/svg+xml", "If-None-Match": tag}).status_code == 304
+    assert client.get(url, params={"format": "png"}).headers["etag"] != tag
+    assert client.get(url).json()["image"].startswith("data:image/png;base64,")
+
+    print("✓ SVG schematic is compact and reuses symbols!")
+    return True
+
+def test_bulk_loads():
+    """Test bulk CSV/NDJSON import with rejected rows, and export round trips"""
+    print("\nTesting bulk load import/export...")
+
+    beam = {"length": 10.0, "support1": 1.0, "support2": 9.0}
+    session_id = create_session(beam, [("Point Moment", {"magnitude": 100, "location": 5.0})])
+    client.post(f"/api/session/{session_id}/calculate")  # later imports update the accumulated results
+
+    rows = ["load_type,magnitude,location,start_location,end_location,group"]
+    rows += [f"Point Force,{-10 * i},{i * 0.0199:.4f},,,L" for i in range(500)]
+    rows += [
+        "Constant Force Profile,-200,,0,10,D",
+        "triangular force profile,300,,6,9,",
+        "",
+        "Point Force,100,10.0,,,",         # line 505: at the free end
+        "Spring,1,2,,,",                   # line 506: unknown type
+        "Point Moment,abc,2,,,",           # line 507: not a number
+        "Constant Force Profile,5,,4,3,",  # line 508: reversed range
+        "Triangular Force Profile,5,,2,,", # line 509: missing end
+    ]
+    url = f"/api/session/{session_id}/loads/import"
+    response = client.post(url, content="\n".join(rows).encode(), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["imported"] == 502 and len(summary["load_ids"]) == 502
+    assert [error["line"] for error in summary["errors"]] == [505, 506, 507, 508, 509]
+    assert summary["errors"][0]["error"] == "Load location must be within beam length"
+
+    strict = client.post(url, params={"strict": True}, content="\n".join(rows).encode(), headers={"Content-Type": "text/csv"})
+    assert strict.status_code == 400 and strict.json()["detail"]["rejected"] == 5
+    assert len(client.get(f"/api/session/{session_id}/loads").json()["point_forces"]) == 500
+
+    # Export as NDJSON, import into a fresh session and compare
+    exported = client.get(f"/api/session/{session_id}/loads/export", params={"format": "ndjson"})
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    copy_id = create_session(beam, [])
+    response = client.post(
+        f"/api/session/{copy_id}/loads/import", params={"format": "ndjson"}, content=exported.content
+    )
+    assert response.json()["imported"] == 503 and response.json()["rejected"] == 0
+
+    accumulated = client.post(f"/api/session/{session_id}/calculate").json()
+    fresh = client.post(f"/api/session/{copy_id}/calculate").json()
+    for field in ("shear_force", "bending_moment", "slope", "deflection", "reaction_forces"):
+        # Rounding is relative to the largest value, not to the near-zero deflection at the supports
+        scale = max(1.0, np.abs(fresh[field]).max())
+        assert np.allclose(accumulated[field], fresh[field], rtol=1e-9, atol=1e-9 * scale), field
+
+    def csv_rows(export_id):
+        text = client.get(f"/api/session/{export_id}/loads/export").text
+        return [line.rsplit(",", 1)[0] for line in text.splitlines()[1:]]  # without load_id
+
+    assert csv_rows(session_id) == csv_rows(copy_id)
+
+    # Quoted fields may span lines and chunks; line numbers count physical lines
+    quoted = b'load_type,magnitude,location,group\nPoint Force,-5,3,"first\r\nsecond"\nSpring,1,2,\n'
+    chunks = [quoted[:40], quoted[40:52], quoted[52:]]
+    quoted_id = create_session(beam, [])
+    response = client.post(f"/api/session/{quoted_id}/loads/import", content=iter(chunks), headers={"Content-Type": "text/csv"})
+    assert response.json()["imported"] == 1 and [error["line"] for error in response.json()["errors"]] == [4]
+    assert client.get(f"/api/session/{quoted_id}/loads").json()["point_forces"][0]["group"] == "first\r\nsecond"
+
+    # Over-long rows and bodies get 413 without being buffered, and leave the session unchanged
+    endless = [b"load_type,magnitude,location\nPoint Force,1,"] + [b"1" * 8192] * 16
+    response = client.post(url, content=iter(endless), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 413 and "rows are limited" in response.json()["detail"]
+    assert len(client.get(f"/api/session/{session_id}/loads").json()["point_forces"]) == 500
+
+    async def body():
+        for _ in range(10):
+            yield b'{"load_type": "Point Force", "magnitude": 1, "location": 1}\n' * 10
+
+    try:
+        asyncio.run(read_load_table(body(), "ndjson", MAX_IMPORT_ROWS, max_bytes=4096))
+        assert False, "body over the limit was read"
+    except LoadTableTooLarge as e:
+        assert "4096 bytes" in str(e)
+
+    print("✓ Bulk import appends valid rows and reports the rest!")
+    return True
+
+def test_streamed_results():
+    """Test NDJSON and binary result streams against /calculate"""
+    print("\nTesting streamed results...")
+
+    session_id = create_session(
+        {"length": 10.0, "support1": 1.0, "support2": 9.0},
+        [("Point Force", {"magnitude": -1000, "location": 5.0}),
+         ("Triangular Force Profile", {"magnitude": 300, "start_location": 6.0, "end_location": 9.0})]
+    )
+    url = f"/api/session/{session_id}/calculate/stream"
+    params = {"stations": 1001, "chunk": 100}
+
+    response = client.post(url, params=params)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    header, chunks, maxima = records[0], records[1:-1], records[-1]
+    assert header["stations"] == 1001 and len(chunks) == 11
+    assert [chunk["first"] for chunk in chunks] == list(range(0, 1001, 100))
+
+    expected = client.post(f"/api/session/{session_id}/calculate").json()
+    assert np.allclose(header["reaction_forces"], expected["reaction_forces"])
+    streamed = {field: np.concatenate([chunk[field] for chunk in chunks]) for field in chunks[0] if field != "first"}
+    for field in ("x_coordinates", "shear_force", "bending_moment"):
+        assert np.allclose(streamed[field], expected[field], rtol=1e-9, atol=1e-9), field
+    # /calculate integrates numerically; the stream is exact
+    for field in ("slope", "deflection"):
+        assert np.allclose(streamed[field], expected[field], rtol=0, atol=1e-2 * expected[f"max_{field}"]), field
+    assert np.isclose(maxima["max_bending_moment"], expected["max_bending_moment"])
+
+    frames = list(unpack_frames(client.post(url, params={**params, "format": "binary"}).content))
+    assert len(frames) == 13
+    for columns, metadata in frames[1:-1]:
+        first = metadata["first"]
+        assert np.array_equal(columns["deflection"], streamed["deflection"][first:first + len(columns["deflection"])])
+    assert frames[-1][1] == maxima
+
+    print("✓ Streams match the in-memory results!")
+    return True
+
+def test_moving_load():
+    """Test the influence line and moving load endpoints"""
+    print("\nTesting moving loads...")
+
+    session_id = create_session({"length": 10.0, "support1": 0.0, "support2": 9.999}, [])
+    lines = client.post(f"/api/session/{session_id}/influence-lines", json={"sections": [2.5, 5.0], "stations": 101}).json()
+    assert len(lines["positions"]) == 101 and len(lines["bending_moment"]) == 2
+    assert np.allclose(np.add(*lines["reaction_forces"]), -1.0)
+    # A unit upward force at midspan hogs the span
+    assert np.isclose(lines["bending_moment"][1][50], -5.0 * 4.999 / 9.999)
+
+    url = f"/api/session/{session_id}/moving-load"
+    axles = [{"magnitude": -100.0}, {"magnitude": -100.0, "offset": 2.0}]
+    result = client.post(url, json={"axles": axles, "sections": [5.0], "positions": 1201, "include_history": True}).json()
+    moment = result["envelope"]["bending_moment"]
+    # Two equal axles 2 m apart: the largest midspan moment has one axle at midspan
+    assert np.isclose(moment["max"][0], 100.0 * 5.0 * 4.999 / 9.999 + 100.0 * 3.0 * 4.999 / 9.999)
+    assert np.isclose(moment["max_position"][0], 5.0) or np.isclose(moment["max_position"][0], 7.0)
+    assert len(result["lead_positions"]) == 1201 and len(result["history"]["reaction_forces"]) == 2
+    assert np.isclose(result["envelope"]["reaction_forces"]["max"][0], 200.0 * 1 - 100.0 * 2.0 / 9.999, rtol=1e-3)
+
+    default = client.post(url, json={"axles": axles}).json()
+    assert len(default["sections"]) == 101 and default["history"] is None
+    assert client.post(url, json={"axles": axles, "sections": [11.0]}).status_code == 400
+
+    # Requests are bounded by their total size, not only field by field
+    too_many = {"sections": np.linspace(0, 10, 1000).tolist(), "stations": 20001}
+    assert client.post(f"/api/session/{session_id}/influence-lines", json=too_many).status_code == 422
+    assert client.post(url, json={"axles": axles, "positions": 100001}).status_code == 422
+
+    print("✓ Moving load envelopes are correct!")
+    return True
+
+def test_metrics():
+    """Test Server-Timing breakdowns and the /metrics exposition"""
+    print("\nTesting metrics...")
+
+    histogram = Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(("solve",), value)
+    assert histogram.series() == {("solve",): ([2, 3, 4], 2.65)}
+    assert 'test_seconds_bucket{stage="solve",le="+Inf"} 4' in histogram.expose()
+
+    session_id = create_session(
+        {"length": 10.0, "support1": 1.0, "support2": 9.0},
+        [("Point Force", {"magnitude": -1234.5, "location": 4.5})]
+    )
+    url = f"/api/session/{session_id}/calculate"
+    assert "server-timing" not in client.post(url).headers
+    analysis_cache.clear()
+    session_manager.store.get(session_id).accumulated_solution = None
+    timing = client.post(url, headers={"X-Server-Timing": "1"}).headers["server-timing"]
+    stages = dict(entry.split(";dur=") for entry in timing.split(", "))
+    assert {"validate", "handler", "solve", "serialize", "total"} <= set(stages)
+    assert sum(float(value) for stage, value in stages.items() if stage != "total") <= float(stages["total"])
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    endpoint = 'endpoint="/api/session/{session_id}/calculate"'
+    assert any(line.startswith("beam_request_duration_seconds_count{" + endpoint + ',method="POST",status="200"}') for line in lines)
+    assert any(line.startswith("beam_stage_duration_seconds_count{" + endpoint + ',stage="solve"}') for line in lines)
+    assert f"beam_sessions_active {len(session_manager.store)}" in lines
+    assert any(line.startswith('beam_cache_hits_total{cache="analysis"}') for line in lines)
+    assert "# TYPE beam_executor_queue_depth gauge" in lines
+
+    print("✓ Metrics record every stage!")
+    return True
+
+def test_profiling():
+    """Test on-demand and slow-request profile captures and their replay"""
+    print("\nTesting profiling...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = RequestProfiler(directory, allow_header=True, problem=_session_problem)
+        profiled = TestClient(ProfilingMiddleware(app, profiler=profiler, executor=compute_executor))
+        compute_executor.profiler = profiler
+        try:
+            session_id = create_session(
+                {"length": 10.0, "support1": 1.0, "support2": 9.0},
+                [("Point Force", {"magnitude": -2345.6, "location": 4.5})]
+            )
+            url = f"/api/session/{session_id}/calculate"
+
+            # Nothing is captured without the header or a slow request
+            assert "x-beam-profile-id" not in profiled.post(url).headers
+            assert profiler.captured == 0
+
+            analysis_cache.clear()
+            session_manager.store.get(session_id).accumulated_solution = None
+            response = profiled.post(url, headers={"X-Beam-Profile": "cprofile"})
+            with open(os.path.join(directory, response.headers["x-beam-profile-id"] + ".json")) as file:
+                record = json.load(file)
+            assert record["trigger"] == "header" and record["path"] == url and record["status"] == 200
+            assert record["problem"]["point_forces"][0]["magnitude"] == -2345.6
+            task = record["tasks"][0]
+            assert task["function"] == "app.calculations:solve_beam"
+            stats = pstats.Stats(os.path.join(directory, task["profile"]))
+            assert any(name == "evaluate_beam" for _, _, name in stats.stats)
+
+            # The saved task replays to the same results
+            fn, args = decode_task(task)
+            assert np.allclose(fn(*args).bending_moment, response.json()["bending_moment"])
+
+            response = profiled.get(f"/api/session/{session_id}/plots", headers={"X-Beam-Profile": "sample"})
+            sampled = response.headers["x-beam-profile-id"]
+            assert os.path.exists(os.path.join(directory, f"{sampled}-0.folded"))
+
+            # Slow requests are replayed under cProfile after the response
+            profiler.allow_header, profiler.slow_ms = False, 1e-6
+            image_cache.clear()
+            before = set(os.listdir(directory))
+            assert "x-beam-profile-id" not in profiled.get(f"/api/session/{session_id}/plot/moment").headers
+            [capture] = [name for name in set(os.listdir(directory)) - before if name.endswith(".json")]
+            with open(os.path.join(directory, capture)) as file:
+                slow = json.load(file)
+            assert slow["trigger"] == "slow" and slow["mode"] == "cprofile"
+            assert slow["tasks"][0]["function"] == "app.visualization:render_plot_png"
+            assert profiler.captured == 3
+        finally:
+            compute_executor.profiler = None
+
+    print("✓ Profiles are captured and replayable!")
+    return True
+
+def test_support_list():
+    """Test continuous, cantilever and fixed-end beams described by a supports list"""
+    print("\nTesting supports lists...")
+    
+    supports = [{"location": 10.0, "type": "roller"}, {"location": 0.0}, {"location": 5.0, "type": "roller"}]
+    session_id = create_session(
+        {"length": 10.0, "supports": supports},
+        [("Constant Force Profile", {"magnitude": -1.0, "start_location": 0.0, "end_location": 10.0})]
+    )
+    result = client.post(f"/api/session/{session_id}/calculate").json()
+    assert np.allclose(result["reaction_forces"], [15 / 8, 50 / 8, 15 / 8])
+    assert result["reaction_moments"] == [0.0, 0.0, 0.0]
+    assert np.isclose(result["max_bending_moment"], 25 / 8)
+    
+    # Loads added later are part of the next solve; the schematic shows all three supports
+    client.post(f"/api/session/{session_id}/loads/add", json={"load_type": "Point Force", "load_data": {"magnitude": -8.0, "location": 2.5}})
+    result = client.post(f"/api/session/{session_id}/calculate").json()
+    assert np.isclose(sum(result["reaction_forces"]), 18.0)
+    svg = client.get(f"/api/session/{session_id}/beam-image", params={"format": "svg"}).text
+    assert svg.count("href='#support'") == 3
+    assert client.get(f"/api/session/{session_id}/plots").status_code == 200
+    
+    # Binary responses carry the reaction moments of a cantilever
+    cantilever = create_session({"length": 4.0, "supports": [{"location": 0.0, "type": "fixed"}]}, [("Point Force", {"magnitude": -5.0, "location": 3.0})])
+    unpacked = unpack_analysis_results(client.post(
+        f"/api/session/{cantilever}/calculate", headers={"Accept": "application/octet-stream"}
+    ).content)
+    assert np.allclose(unpacked["reaction_forces"], [5.0]) and np.allclose(unpacked["reaction_moments"], [15.0])
+    
+    # Two-support analyses and unstable or invalid support lists are rejected
+    assert client.post(f"/api/session/{session_id}/calculate", params={"grid": "adaptive"}).status_code == 400
+    assert client.post(f"/api/session/{session_id}/influence-lines", json={"sections": [2.5]}).status_code == 400
+    assert client.post(f"/api/session/{session_id}/combinations", json={"combinations": [{"name": "D", "factors": {"default": 1.0}}]}).status_code == 400
+    url = f"/api/session/{session_id}/beam-properties"
+    assert client.post(url, json={"length": 10.0, "supports": [{"location": 3.0}]}).status_code == 400
+    assert client.post(url, json={"length": 10.0, "supports": [{"location": 3.0}, {"location": 11.0}]}).status_code == 400
+    assert client.post(url, json={"length": 10.0, "support1": 3.0}).status_code == 422
+    
+    print("✓ Supports lists are solved by the finite element engine!")
+    return True
+
+def test_startup():
+    """Test the lazy rendering stack, worker warm-up and the startup metric"""
+    print("\nTesting startup...")
+
+    # Importing the app leaves matplotlib to the first matplotlib render
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('matplotlib' in sys.modules)"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    assert loaded.stdout.strip() == "False"
+
+    # A kernel backend that isn't installed falls back to the default instead of failing the import
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import app.main; from app.calculations import kernel_backend as k; print(k())"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+        env=dict(os.environ, BEAM_KERNEL_BACKEND="fortran")
+    )
+    assert loaded.stdout.strip() == DEFAULT_KERNEL_BACKEND and "fortran" in loaded.stderr
+
+    # Every worker starts, and runs the warm-up, before start() returns
+    executor = ComputeExecutor(workers=2, max_pending=8, timeout=120, initializer=warm_up)
+    try:
+        pids = asyncio.run(executor.start())
+        assert len(pids) == 2 and os.getpid() not in pids
+    finally:
+        executor.shutdown()
+
+    with TestClient(app) as started:
+        metrics = started.get("/metrics").text
+    assert 'beam_startup_seconds{phase="import"}' in metrics and 'beam_startup_seconds{phase="ready"}' in metrics
+
+    print("✓ Workers warm up and startup is reported!")
+    return True
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Beam Analysis API Tests")
+    print("=" * 50)
+
+    tests = [
+        test_analysis_cache,
+        test_image_etag,
+        test_batch_analysis,
+        test_load_combinations,
+        test_incremental_loads,
+        test_binary_results,
+        test_compute_executor,
+        test_session_stores,
+        test_load_store,
+        test_plot_renderers,
+        test_combined_plots,
+        test_beam_svg,
+        test_bulk_loads,
+        test_streamed_results,
+        test_moving_load,
+        test_metrics,
+        test_profiling,
+        test_support_list,
+        test_startup,
+    ]
+
+    tests_passed = 0
+    total_tests = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                tests_passed += 1
+        except AssertionError as e:
+            print(f"✗ Assertion failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Test Results: {tests_passed}/{total_tests} tests passed")
+    print("=" * 50)
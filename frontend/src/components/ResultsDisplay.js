@@ -26,33 +26,10 @@ const ResultsDisplay = ({ beamProperties, loads }) => {
     setPlots({});
 
     try {
-      // Calculate analysis
-      const analysisResults = await api.calculateAnalysis();
-      setResults(analysisResults);
-
-      // Generate all plots
-      const plotTypes = ['shear', 'moment', 'slope', 'deflection'];
-      const plotPromises = plotTypes.map(async (type) => {
-        try {
-          const plotImage = await api.getEngineeringPlot(type);
-          return { type, image: plotImage };
-        } catch (err) {
-          console.error(`Error generating ${type} plot:`, err);
-          return { type, error: err.message };
-        }
-      });
-
-      const plotResults = await Promise.all(plotPromises);
-      const plotsData = {};
-      plotResults.forEach(({ type, image, error }) => {
-        if (image) {
-          plotsData[type] = image;
-        } else if (error) {
-          plotsData[type] = { error };
-        }
-      });
-      
-      setPlots(plotsData);
+      // One request solves once and returns all four diagrams with the maxima
+      const diagrams = await api.getEngineeringPlots();
+      setResults(diagrams);
+      setPlots(diagrams.images);
     } catch (err) {
       setError(err.response?.data?.detail || 'Error performing analysis');
     } finally {
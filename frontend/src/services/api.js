@@ -76,6 +76,44 @@ class BeamAnalysisAPI {
     }
   }
 
+  async importLoads(text, format = 'csv') {
+    if (!this.sessionId) {
+      throw new Error('No active session');
+    }
+
+    try {
+      const response = await this.axiosInstance.post(
+        `/session/${this.sessionId}/loads/import`,
+        text,
+        {
+          params: { format },
+          headers: { 'Content-Type': format === 'csv' ? 'text/csv' : 'application/x-ndjson' },
+        }
+      );
+      return response.data;
+    } catch (error) {
+      console.error('Error importing loads:', error);
+      throw error;
+    }
+  }
+
+  async exportLoads(format = 'csv') {
+    if (!this.sessionId) {
+      throw new Error('No active session');
+    }
+
+    try {
+      const response = await this.axiosInstance.get(`/session/${this.sessionId}/loads/export`, {
+        params: { format },
+        responseType: 'text',
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error exporting loads:', error);
+      throw error;
+    }
+  }
+
   async clearLoads() {
     if (!this.sessionId) {
       throw new Error('No active session');
@@ -110,8 +148,12 @@ class BeamAnalysisAPI {
     }
 
     try {
-      const response = await this.axiosInstance.get(`/session/${this.sessionId}/beam-image`);
-      return response.data.image;
+      // Vector schematic: a few KB of SVG that scales to any size
+      const response = await this.axiosInstance.get(`/session/${this.sessionId}/beam-image`, {
+        params: { format: 'svg' },
+        responseType: 'text',
+      });
+      return `data:image/svg+xml;charset=utf-8,${encodeURIComponent(response.data)}`;
     } catch (error) {
       console.error('Error getting beam image:', error);
       throw error;
@@ -132,6 +174,20 @@ class BeamAnalysisAPI {
     }
   }
 
+  async getEngineeringPlots() {
+    if (!this.sessionId) {
+      throw new Error('No active session');
+    }
+
+    try {
+      const response = await this.axiosInstance.get(`/session/${this.sessionId}/plots`);
+      return response.data;
+    } catch (error) {
+      console.error('Error getting engineering plots:', error);
+      throw error;
+    }
+  }
+
   async deleteSession() {
     if (!this.sessionId) {
       return;